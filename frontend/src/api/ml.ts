@@ -199,10 +199,46 @@ export async function fetchSampleEmbeddings(
   return response.json();
 }
 
+export interface TrainingJob {
+  job_id: string;
+  kind: string;
+  status: 'queued' | 'running' | 'succeeded' | 'failed' | 'cancelled';
+  stage: string | null;
+  epoch: number;
+  num_epochs: number | null;
+  losses: number[];
+  result: Record<string, unknown> | null;
+  error: string | null;
+}
+
+/**
+ * Poll a training job until it finishes; rejects if it fails or is cancelled.
+ */
+export async function waitForJob(
+  job: TrainingJob,
+  intervalMs: number = 2000
+): Promise<TrainingJob> {
+  while (job.status === 'queued' || job.status === 'running') {
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+
+    const response = await fetch(`${ML_API_URL}/v1/jobs/${job.job_id}`);
+    if (!response.ok) {
+      throw new Error(`Failed to fetch training job: ${response.statusText}`);
+    }
+    job = await response.json();
+  }
+
+  if (job.status !== 'succeeded') {
+    throw new Error(`Training ${job.status}${job.error ? `: ${job.error}` : ''}`);
+  }
+
+  return job;
+}
+
 export async function trainLightGCN(
   lookbackDays: number = 30,
   numEpochs: number = 100
-): Promise<unknown> {
+): Promise<TrainingJob> {
   const response = await fetch(`${ML_API_URL}/v1/train`, {
     method: 'POST',
     headers: { 'Content-Type': 'application/json' },
@@ -216,13 +252,13 @@ export async function trainLightGCN(
     throw new Error(`Training failed: ${response.statusText}`);
   }
 
-  return response.json();
+  return waitForJob(await response.json());
 }
 
 export async function trainHGT(
   lookbackDays: number = 30,
   numEpochs: number = 100
-): Promise<unknown> {
+): Promise<TrainingJob> {
   const response = await fetch(`${ML_API_URL}/v1/hgt/train`, {
     method: 'POST',
     headers: { 'Content-Type': 'application/json' },
@@ -236,6 +272,6 @@ export async function trainHGT(
     throw new Error(`HGT training failed: ${response.statusText}`);
   }
 
-  return response.json();
+  return waitForJob(await response.json());
 }
 
@@ -1,39 +1,58 @@
 """FastAPI routes for ML service."""
 
-from typing import Optional, Literal
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+import asyncio
+import json
+import threading
+from typing import Callable, Iterator, Optional, Literal
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 import structlog
 import torch
 import numpy as np
 
 from app.config import get_settings
-from app.services.graph_builder import GraphBuilder, GraphData
-from app.services.trainer import LightGCNTrainer
+from app.services.graph_store import IncrementalGraphStore
+from app.services.trainer import LightGCNTrainer, load_inference as load_lightgcn_inference
 from app.services.embedding_service import EmbeddingService
-from app.services.tgn_trainer import TGNTrainer, TemporalGraphBuilder
+from app.services.serving_index import ServingIndex
+from app.services.topn_store import TopNStore
+from app.services.tgn_trainer import load_inference as load_tgn_inference
 from app.services.session_service import SessionService
 from app.services.hgt_builder import HeteroGraphBuilder
-from app.services.hgt_trainer import HGTTrainer
+from app.services.hgt_trainer import HGTTrainer, load_inference as load_hgt_inference
+from app.services.job_registry import JobConflictError, JobRegistry
+from app.jobs import train as training_jobs
 
 logger = structlog.get_logger()
 router = APIRouter()
 
+# Serializes /rebuild refreshes of the shared graph store, which now run
+# off the event loop
+_rebuild_lock = threading.Lock()
+
 # Global state for model and graph
 _state = {
     "graph_data": None,
+    "graph_store": None,
     "trainer": None,
+    "lightgcn_inference": None,  # Restored from the saved artifact
+    "lightgcn_mappings": None,  # (user_id_to_idx, game_slug_to_idx)
     "embedding_service": None,
+    "serving_index": None,
+    "topn_store": None,
     "device": None,
-    "is_training": False,
+    "job_registry": None,
     # TGN-specific state
-    "tgn_trainer": None,
     "session_service": None,
     "tgn_mappings": None,  # (user_id_to_idx, game_slug_to_idx)
     # HGT-specific state
     "hgt_trainer": None,
     "hgt_graph": None,
-    "hgt_inference": None
+    "hgt_inference": None,
+    # Boot-time restore: model -> "loaded", "missing" or "failed"
+    "models": {},
+    "warm_started": False
 }
 
 
@@ -44,6 +63,13 @@ def get_device() -> torch.device:
     return _state["device"]
 
 
+def get_graph_store() -> IncrementalGraphStore:
+    """Get incremental graph store singleton."""
+    if _state["graph_store"] is None:
+        _state["graph_store"] = IncrementalGraphStore()
+    return _state["graph_store"]
+
+
 def get_embedding_service() -> EmbeddingService:
     """Get embedding service singleton."""
     if _state["embedding_service"] is None:
@@ -51,6 +77,115 @@ def get_embedding_service() -> EmbeddingService:
     return _state["embedding_service"]
 
 
+def get_serving_index() -> ServingIndex:
+    """Get in-process serving index singleton."""
+    if _state["serving_index"] is None:
+        _state["serving_index"] = ServingIndex(get_embedding_service())
+    return _state["serving_index"]
+
+
+def get_topn_store() -> TopNStore:
+    """Get precomputed top-N store singleton."""
+    if _state["topn_store"] is None:
+        _state["topn_store"] = TopNStore()
+    return _state["topn_store"]
+
+
+def get_job_registry() -> JobRegistry:
+    """Get or create training job registry."""
+    if _state["job_registry"] is None:
+        _state["job_registry"] = JobRegistry()
+    return _state["job_registry"]
+
+
+def _submit_training(kind: str, target: Callable[..., dict], params: dict, on_success: Callable[[dict], dict]) -> dict:
+    """Queue a training job, or fail with 409 if one of this kind is active."""
+    try:
+        job = get_job_registry().submit(kind, target, params, on_success=on_success)
+    except JobConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return job.to_dict()
+
+
+def _restore_lightgcn(device: torch.device) -> bool:
+    restored = load_lightgcn_inference(device=device)
+    if restored is None:
+        return False
+    
+    inference, user_id_to_idx, game_slug_to_idx = restored
+    _state["lightgcn_inference"] = inference
+    _state["lightgcn_mappings"] = (user_id_to_idx, game_slug_to_idx)
+    return True
+
+
+def _restore_hgt(device: torch.device) -> bool:
+    inference = load_hgt_inference(device=device)
+    if inference is None:
+        return False
+    
+    _state["hgt_graph"] = inference.graph_data
+    _state["hgt_inference"] = inference
+    return True
+
+
+def _restore_tgn(device: torch.device) -> bool:
+    restored = load_tgn_inference(device=device)
+    if restored is None:
+        return False
+    
+    inference, user_id_to_idx, game_slug_to_idx = restored
+    _state["tgn_mappings"] = (user_id_to_idx, game_slug_to_idx)
+    
+    get_session_service().set_model(inference, user_id_to_idx, game_slug_to_idx)
+    return True
+
+
+_RESTORERS = {
+    "lightgcn": _restore_lightgcn,
+    "hgt": _restore_hgt,
+    "tgn": _restore_tgn
+}
+
+
+def warm_start() -> dict:
+    """Restore the latest saved models into this worker (runs at startup).
+    
+    Each model is loaded from its artifact's inference bundle (see
+    app.services.model_artifacts), ID mappings and final embeddings
+    included, without touching PostgreSQL; then the LightGCN serving index
+    is loaded so the first /recommend is not a cold one. /ready reports
+    ready once this has finished and no saved model failed to load.
+    
+    Returns:
+        Outcome per model: "loaded", "missing" (nothing saved yet) or "failed"
+    """
+    settings = get_settings()
+    device = get_device()
+    
+    for model in filter(None, (name.strip() for name in settings.warm_start_models.split(","))):
+        try:
+            _state["models"][model] = "loaded" if _RESTORERS[model](device) else "missing"
+        except Exception as e:
+            logger.error("Failed to restore model", model=model, error=str(e))
+            _state["models"][model] = "failed"
+    
+    if settings.serving_index_enabled:
+        try:
+            get_serving_index().ensure_loaded()
+        except Exception as e:
+            logger.warning("Failed to warm serving index", error=str(e))
+    
+    _state["warm_started"] = True
+    logger.info("Warm start complete", **_state["models"])
+    return dict(_state["models"])
+
+
+def is_ready() -> bool:
+    """Whether warm start has finished (or is disabled) and every saved model is resident."""
+    warm_started = _state["warm_started"] or not get_settings().warm_start
+    return warm_started and "failed" not in _state["models"].values()
+
+
 # Request/Response Models
 
 class TrainRequest(BaseModel):
@@ -59,13 +194,28 @@ class TrainRequest(BaseModel):
     num_epochs: int = Field(default=100, description="Number of training epochs")
     batch_size: int = Field(default=1024, description="Training batch size")
     force_rebuild: bool = Field(default=False, description="Force rebuild graph even if exists")
+    train_mode: Optional[Literal["minibatch", "full_batch"]] = Field(
+        default=None,
+        description="LightGCN training mode (defaults to config)"
+    )
 
 
-class TrainResponse(BaseModel):
-    """Response from training."""
-    status: str
-    message: str
-    stats: Optional[dict] = None
+class JobResponse(BaseModel):
+    """A training job and its progress."""
+    job_id: str
+    kind: str
+    status: str = Field(..., description="queued, running, succeeded, failed or cancelled")
+    stage: Optional[str] = None
+    epoch: int = 0
+    num_epochs: Optional[int] = None
+    losses: list[float] = Field(default_factory=list, description="Loss of each finished epoch")
+    cancel_requested: bool = False
+    params: dict
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
 
 
 class RecommendRequest(BaseModel):
@@ -75,6 +225,11 @@ class RecommendRequest(BaseModel):
     exclude_games: Optional[list[str]] = Field(default=None, description="Games to exclude")
 
 
+class CachedRecommendRequest(RecommendRequest):
+    """Request for precomputed recommendations."""
+    model: Literal["lightgcn", "hgt"] = Field(default="lightgcn", description="Model whose table to read")
+
+
 class RecommendResponse(BaseModel):
     """Recommendations response."""
     user_id: str
@@ -82,6 +237,44 @@ class RecommendResponse(BaseModel):
     source: str = "lightgcn"
 
 
+class BatchRecommendUser(BaseModel):
+    """One user of a batch recommendation request."""
+    user_id: str
+    exclude_games: Optional[list[str]] = Field(default=None, description="Games to exclude")
+
+
+class BatchRecommendRequest(BaseModel):
+    """Request for recommendations for many users.
+    
+    Results are streamed as NDJSON, one line per user in request order.
+    """
+    users: list[BatchRecommendUser] = Field(..., min_length=1)
+    limit: int = Field(default=10, ge=1, le=100)
+
+
+def _stream_ndjson(
+    users: list[BatchRecommendUser],
+    score_chunk: Callable[[list[BatchRecommendUser]], list[dict]]
+) -> StreamingResponse:
+    """Stream per-user results as NDJSON, scoring users chunk by chunk.
+    
+    Args:
+        users: Users in request order
+        score_chunk: Returns one result line (dict) per user of a chunk
+        
+    Returns:
+        Streaming NDJSON response
+    """
+    chunk_size = get_settings().batch_recommend_chunk_size
+    
+    def lines() -> Iterator[str]:
+        for start in range(0, len(users), chunk_size):
+            results = score_chunk(users[start:start + chunk_size])
+            yield "".join(json.dumps(result) + "\n" for result in results)
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 class EmbeddingRequest(BaseModel):
     """Request for embedding."""
     id: str = Field(..., description="User ID or game slug")
@@ -129,119 +322,154 @@ async def health_check():
     return {"status": "healthy", "service": "casino-ml-service"}
 
 
+@router.get("/ready")
+async def readiness_check():
+    """Readiness probe: 200 once the saved models are loaded, 503 before.
+    
+    Unlike /health, stays unavailable while warm start is restoring the
+    models, so a new instance gets no traffic until it can serve it.
+    """
+    body = {"ready": is_ready(), "warm_started": _state["warm_started"], "models": _state["models"]}
+    if not body["ready"]:
+        raise HTTPException(status_code=503, detail=body)
+    return body
+
+
 @router.get("/status", response_model=StatusResponse)
 async def get_status():
     """Get service status."""
     embedding_service = get_embedding_service()
     
     graph_loaded = _state["graph_data"] is not None
-    model_loaded = _state["trainer"] is not None
+    model_loaded = _state["trainer"] is not None or _state["lightgcn_inference"] is not None
+    
+    # Without the graph (restored at startup), count the artifact's mappings
+    user_id_to_idx, game_slug_to_idx = _state["lightgcn_mappings"] or ({}, {})
     
     return StatusResponse(
         status="ready" if model_loaded else "not_trained",
         model_loaded=model_loaded,
         graph_loaded=graph_loaded,
-        num_users=_state["graph_data"].num_users if graph_loaded else 0,
-        num_games=_state["graph_data"].num_games if graph_loaded else 0,
+        num_users=_state["graph_data"].num_users if graph_loaded else len(user_id_to_idx),
+        num_games=_state["graph_data"].num_games if graph_loaded else len(game_slug_to_idx),
         num_edges=_state["graph_data"].num_edges if graph_loaded else 0,
         device=str(get_device()),
         collections=embedding_service.get_collection_stats()
     )
 
 
-@router.post("/train", response_model=TrainResponse)
-async def train_model(request: TrainRequest, background_tasks: BackgroundTasks):
+@router.post("/train", response_model=JobResponse, status_code=202)
+async def train_model(request: TrainRequest):
     """Train or retrain the LightGCN model.
     
-    This endpoint:
+    Queues a job that, in a separate process:
     1. Builds the user-game interaction graph from PostgreSQL
     2. Trains the LightGCN model
     3. Stores embeddings in Qdrant
+    
+    Returns the job at once; poll /jobs/{job_id} for progress.
     """
-    if _state["is_training"]:
-        raise HTTPException(status_code=409, detail="Training already in progress")
+    logger.info("Queueing model training", **request.model_dump())
+    return _submit_training("lightgcn", training_jobs.train_lightgcn, request.model_dump(), _load_lightgcn)
+
+
+def _load_lightgcn(result: dict) -> dict:
+    """Serve a LightGCN model trained by a job (runs in the registry)."""
+    graph_data = result.pop("graph_data")
     
-    _state["is_training"] = True
+    trainer = LightGCNTrainer(graph_data, device=get_device())
+    if not trainer.load_model():
+        raise RuntimeError("Trained LightGCN checkpoint could not be loaded")
     
-    try:
-        logger.info("Starting model training", **request.model_dump())
-        
-        # Build graph
-        graph_builder = GraphBuilder()
-        try:
-            graph_data = graph_builder.build_graph(lookback_days=request.lookback_days)
-        finally:
-            graph_builder.close()
-        
-        if graph_data.num_users == 0 or graph_data.num_games == 0:
-            _state["is_training"] = False
-            return TrainResponse(
-                status="error",
-                message="No interaction data found to build graph",
-                stats={"num_users": 0, "num_games": 0}
-            )
-        
-        _state["graph_data"] = graph_data
-        
-        # Create and train model
-        trainer = LightGCNTrainer(graph_data, device=get_device())
-        
-        # Try to load existing model for incremental training
-        if not request.force_rebuild:
-            trainer.load_model()
-        
-        train_stats = trainer.train(
-            num_epochs=request.num_epochs,
-            batch_size=request.batch_size
-        )
-        
-        # Save model
-        trainer.save_model()
-        _state["trainer"] = trainer
-        
-        # Store embeddings in Qdrant
-        embedding_service = get_embedding_service()
-        embedding_service.init_collections()
-        
-        inference = trainer.get_inference()
-        embedding_service.store_all_embeddings(inference, graph_data)
-        
-        logger.info("Training completed successfully")
-        
-        return TrainResponse(
-            status="success",
-            message="Model trained and embeddings stored",
-            stats={
-                "num_users": graph_data.num_users,
-                "num_games": graph_data.num_games,
-                "num_edges": graph_data.num_edges,
-                "final_loss": train_stats["final_loss"],
-                "num_epochs": train_stats["num_epochs"]
-            }
-        )
-        
-    except Exception as e:
-        logger.error("Training failed", error=str(e))
-        raise HTTPException(status_code=500, detail=f"Training failed: {str(e)}")
+    _state["graph_data"] = graph_data
+    _state["trainer"] = trainer
+    _restore_lightgcn(get_device())
+    _state["models"]["lightgcn"] = "loaded"
+    # The job refreshed the persisted graph store; reload it on next use
+    _state["graph_store"] = None
+    get_serving_index().invalidate()
     
-    finally:
-        _state["is_training"] = False
+    logger.info("Training completed successfully")
+    return result["stats"]
 
 
 @router.post("/recommend", response_model=RecommendResponse)
 async def get_recommendations(request: RecommendRequest):
     """Get game recommendations for a user using LightGCN embeddings."""
-    embedding_service = get_embedding_service()
+    recommendations = None
+    
+    if get_settings().serving_index_enabled:
+        recommendations = get_serving_index().recommend(
+            user_id=request.user_id,
+            limit=request.limit,
+            exclude_games=request.exclude_games
+        )
+    
+    # Fall back to searching Qdrant directly
+    if recommendations is None:
+        embedding_service = get_embedding_service()
+        recommendations = embedding_service.get_recommendations(
+            user_id=request.user_id,
+            limit=request.limit,
+            exclude_games=request.exclude_games
+        )
     
-    recommendations = embedding_service.get_recommendations(
+    return RecommendResponse(
         user_id=request.user_id,
+        recommendations=recommendations
+    )
+
+
+@router.post("/recommend/batch")
+async def get_recommendations_batch(request: BatchRecommendRequest):
+    """Get LightGCN recommendations for many users, streamed as NDJSON.
+    
+    Each chunk of users is scored with a single matmul against the
+    in-process game matrix. Lines have the /recommend response shape.
+    """
+    serving_index = get_serving_index()
+    
+    if not serving_index.ensure_loaded():
+        raise HTTPException(status_code=503, detail="No LightGCN embeddings published")
+    
+    def score_chunk(users: list[BatchRecommendUser]) -> list[dict]:
+        recommendations = serving_index.recommend_batch(
+            [user.user_id for user in users],
+            limit=request.limit,
+            exclude_games=[user.exclude_games for user in users]
+        ) or [[] for _ in users]
+        
+        return [
+            {"user_id": user.user_id, "recommendations": recs, "source": "lightgcn"}
+            for user, recs in zip(users, recommendations)
+        ]
+    
+    return _stream_ndjson(request.users, score_chunk)
+
+
+@router.post("/recommend/cached", response_model=RecommendResponse)
+async def get_cached_recommendations(request: CachedRecommendRequest):
+    """Get recommendations from a precomputed top-N table.
+    
+    A binary search and one row read; no model or Qdrant call. Excluded games
+    are dropped from the stored ranking, so fewer than `limit` results may
+    come back when many of a user's top games are excluded.
+    """
+    table = get_topn_store().get_table(request.model)
+    
+    if table is None:
+        raise HTTPException(status_code=503, detail=f"No precomputed {request.model} table")
+    
+    recommendations = table.lookup(
+        request.user_id,
         limit=request.limit,
         exclude_games=request.exclude_games
     )
     
     return RecommendResponse(
         user_id=request.user_id,
-        recommendations=recommendations
+        recommendations=recommendations or [],
+        source=f"{request.model}_cached"
     )
 
 
@@ -312,19 +540,25 @@ async def process_interaction(request: InteractionRequest):
     )
 
 
+def _refresh_graph(full: bool):
+    """Refresh the shared graph store; one rebuild at a time."""
+    with _rebuild_lock:
+        graph_store = get_graph_store()
+        try:
+            return graph_store.refresh(full=full)
+        finally:
+            graph_store.close()
+
+
 @router.post("/rebuild")
-async def rebuild_graph():
+async def rebuild_graph(full: bool = False):
     """Rebuild the interaction graph without full retraining.
     
-    Useful for adding new users/games to the graph.
+    Useful for adding new users/games to the graph. Only events since the
+    previous rebuild are fetched unless `full` is set.
     """
     try:
-        graph_builder = GraphBuilder()
-        try:
-            graph_data = graph_builder.build_graph()
-        finally:
-            graph_builder.close()
-        
+        graph_data = await asyncio.to_thread(_refresh_graph, full)
         _state["graph_data"] = graph_data
         
         return {
@@ -359,6 +593,38 @@ async def get_graph_stats():
     }
 
 
+# ============================================
+# Training Jobs
+# ============================================
+
+@router.get("/jobs", response_model=list[JobResponse])
+async def list_jobs(kind: Optional[Literal["lightgcn", "tgn", "hgt"]] = None):
+    """List training jobs, most recent first."""
+    return [job.to_dict() for job in get_job_registry().list(kind)]
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """Get a training job's status, progress and loss history."""
+    job = get_job_registry().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job.to_dict()
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=JobResponse)
+async def cancel_job(job_id: str):
+    """Cancel a training job.
+
+    A queued job is cancelled at once; a running job stops after its
+    current epoch and keeps serving the previous model.
+    """
+    job = get_job_registry().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job.to_dict()
+
+
 # ============================================
 # TGN (Temporal Graph Network) Endpoints
 # ============================================
@@ -377,18 +643,18 @@ class TGNTrainRequest(BaseModel):
     batch_size: int = Field(default=256, description="Training batch size")
 
 
-class TGNTrainResponse(BaseModel):
-    """Response from TGN training."""
-    status: str
-    message: str
-    stats: Optional[dict] = None
-
-
 class SessionRecommendRequest(BaseModel):
     """Request for session-aware recommendations."""
     user_id: str = Field(..., description="User ID")
     limit: int = Field(default=10, description="Number of recommendations")
     exclude_recent: bool = Field(default=True, description="Exclude recently played games")
+    exclude_played: bool = Field(default=False, description="Exclude games played or rated in the training data")
+
+
+class SessionBatchRecommendRequest(BatchRecommendRequest):
+    """Request for session-aware recommendations for many users."""
+    exclude_recent: bool = Field(default=True, description="Exclude recently played games")
+    exclude_played: bool = Field(default=False, description="Exclude games played or rated in the training data")
 
 
 class SessionRecommendResponse(BaseModel):
@@ -410,12 +676,12 @@ class SessionInteractionRequest(BaseModel):
 
 class SessionInteractionResponse(BaseModel):
     """Response after adding session interaction."""
-    status: str
+    status: str  # success, queued (memory update pending), game_not_found
     session_active: bool
     memory_updated: bool
 
 
-@router.post("/tgn/train", response_model=TGNTrainResponse)
+@router.post("/tgn/train", response_model=JobResponse, status_code=202)
 async def train_tgn_model(request: TGNTrainRequest):
     """Train the TGN (Temporal Graph Network) model.
     
@@ -423,74 +689,26 @@ async def train_tgn_model(request: TGNTrainRequest):
     1. Tracking temporal patterns in user behavior
     2. Maintaining memory of recent interactions
     3. Learning time-aware embeddings
+    
+    Training runs as a job in a separate process; poll /jobs/{job_id}.
     """
-    if _state["is_training"]:
-        raise HTTPException(status_code=409, detail="Training already in progress")
+    logger.info("Queueing TGN training", **request.model_dump())
+    return _submit_training("tgn", training_jobs.train_tgn, request.model_dump(), _load_tgn)
+
+
+def _load_tgn(result: dict) -> dict:
+    """Serve a TGN model trained by a job (runs in the registry).
     
-    _state["is_training"] = True
+    Restored from the saved artifact like at warm start: model, ID tables
+    and played-items index, with no trainer or training edges.
+    """
+    if not _restore_tgn(get_device()):
+        raise RuntimeError("Trained TGN artifact could not be loaded")
     
-    try:
-        logger.info("Starting TGN training", **request.model_dump())
-        
-        # Build temporal edges
-        builder = TemporalGraphBuilder()
-        try:
-            edges, user_id_to_idx, game_slug_to_idx = builder.build_temporal_edges(
-                lookback_days=request.lookback_days
-            )
-        finally:
-            builder.close()
-        
-        if not edges:
-            _state["is_training"] = False
-            return TGNTrainResponse(
-                status="error",
-                message="No temporal edges found",
-                stats={"num_edges": 0}
-            )
-        
-        num_users = len(user_id_to_idx)
-        num_items = len(game_slug_to_idx)
-        
-        # Create and train TGN
-        trainer = TGNTrainer(num_users, num_items, device=get_device())
-        
-        train_stats = trainer.train(
-            edges=edges,
-            num_epochs=request.num_epochs,
-            batch_size=request.batch_size
-        )
-        
-        # Save model
-        trainer.save_model()
-        _state["tgn_trainer"] = trainer
-        _state["tgn_mappings"] = (user_id_to_idx, game_slug_to_idx)
-        
-        # Initialize session service with TGN
-        session_service = get_session_service()
-        session_service.set_tgn(trainer.get_inference())
-        session_service.set_mappings(user_id_to_idx, game_slug_to_idx)
-        
-        logger.info("TGN training completed")
-        
-        return TGNTrainResponse(
-            status="success",
-            message="TGN model trained and session service initialized",
-            stats={
-                "num_users": num_users,
-                "num_games": num_items,
-                "num_edges": len(edges),
-                "final_loss": train_stats["final_loss"],
-                "num_epochs": train_stats["num_epochs"]
-            }
-        )
-        
-    except Exception as e:
-        logger.error("TGN training failed", error=str(e))
-        raise HTTPException(status_code=500, detail=f"TGN training failed: {str(e)}")
+    _state["models"]["tgn"] = "loaded"
     
-    finally:
-        _state["is_training"] = False
+    logger.info("TGN training completed")
+    return result["stats"]
 
 
 @router.post("/tgn/recommend", response_model=SessionRecommendResponse)
@@ -508,11 +726,14 @@ async def get_session_recommendations(request: SessionRecommendRequest):
             detail="TGN not trained. Call /v1/tgn/train first."
         )
     
-    # Get recommendations
-    recs = session_service.get_session_recommendations(
+    # Scoring waits for the memory lock, which the ingest thread holds
+    # while applying a batch; keep that off the event loop
+    recs = await asyncio.to_thread(
+        session_service.get_session_recommendations,
         user_id=request.user_id,
         limit=request.limit,
-        exclude_recent=request.exclude_recent
+        exclude_recent=request.exclude_recent,
+        exclude_played=request.exclude_played
     )
     
     # Get session context
@@ -528,6 +749,45 @@ async def get_session_recommendations(request: SessionRecommendRequest):
     )
 
 
+@router.post("/tgn/recommend/batch")
+async def get_session_recommendations_batch(request: SessionBatchRecommendRequest):
+    """Get session-aware TGN recommendations for many users, streamed as NDJSON.
+    
+    No sessions are created; users without an active session are scored
+    from their TGN memory.
+    """
+    session_service = get_session_service()
+    
+    if session_service.tgn is None:
+        raise HTTPException(
+            status_code=503,
+            detail="TGN not trained. Call /v1/tgn/train first."
+        )
+    
+    def score_chunk(users: list[BatchRecommendUser]) -> list[dict]:
+        recommendations = session_service.get_session_recommendations_batch(
+            [user.user_id for user in users],
+            limit=request.limit,
+            exclude_recent=request.exclude_recent,
+            exclude_played=request.exclude_played,
+            exclude_games=[user.exclude_games for user in users]
+        )
+        
+        return [
+            {
+                "user_id": user.user_id,
+                "recommendations": [
+                    {"game_slug": slug, "score": score}
+                    for slug, score in recs
+                ],
+                "source": "tgn"
+            }
+            for user, recs in zip(users, recommendations)
+        ]
+    
+    return _stream_ndjson(request.users, score_chunk)
+
+
 @router.post("/tgn/interaction", response_model=SessionInteractionResponse)
 async def add_session_interaction(request: SessionInteractionRequest):
     """Add an interaction to the user's session and update TGN memory.
@@ -556,10 +816,19 @@ async def add_session_interaction(request: SessionInteractionRequest):
     
     context = session_service.get_session_context(request.user_id)
     
+    # With ingestion on, the memory update is only queued
+    queued = success and session_service.queues_memory_updates
+    if not success:
+        status = "game_not_found"
+    elif queued:
+        status = "queued"
+    else:
+        status = "success"
+    
     return SessionInteractionResponse(
-        status="success" if success else "game_not_found",
+        status=status,
         session_active=context.get("active", False),
-        memory_updated=success
+        memory_updated=success and not queued
     )
 
 
@@ -591,7 +860,7 @@ async def get_tgn_status():
     stats = session_service.get_stats()
     
     return {
-        "tgn_trained": _state["tgn_trainer"] is not None,
+        "tgn_trained": session_service.tgn is not None,
         "session_service": stats
     }
 
@@ -617,25 +886,18 @@ class HGTTrainRequest(BaseModel):
     cms_url: Optional[str] = Field(default=None)
 
 
-class HGTTrainResponse(BaseModel):
-    """Response from HGT training."""
-    status: str
-    final_loss: float
-    best_loss: float
-    num_epochs: int
-    num_users: int
-    num_games: int
-    num_providers: int
-    num_promotions: int
-    num_edge_types: int
-
-
 class HGTRecommendRequest(BaseModel):
     """Request for HGT recommendations."""
     user_id: str
     limit: int = Field(default=10, ge=1, le=100)
     exclude_games: Optional[list[str]] = Field(default=None)
     provider_filter: Optional[str] = Field(default=None)
+    exclude_played: bool = Field(default=False, description="Exclude games played or rated in the training data")
+
+
+class HGTBatchRecommendRequest(BatchRecommendRequest):
+    """Request for HGT recommendations for many users."""
+    exclude_played: bool = Field(default=False, description="Exclude games played or rated in the training data")
 
 
 class HGTRecommendResponse(BaseModel):
@@ -672,111 +934,32 @@ class HGTProviderGamesResponse(BaseModel):
     personalized: bool
 
 
-@router.post("/hgt/train", response_model=HGTTrainResponse)
-async def train_hgt(request: HGTTrainRequest, background_tasks: BackgroundTasks):
-    """Train HGT model on heterogeneous graph."""
-    if _state["is_training"]:
-        raise HTTPException(status_code=409, detail="Training already in progress")
+@router.post("/hgt/train", response_model=JobResponse, status_code=202)
+async def train_hgt(request: HGTTrainRequest):
+    """Train HGT model on heterogeneous graph.
     
-    _state["is_training"] = True
-    
-    try:
-        logger.info("Building heterogeneous graph for HGT")
-        
-        # Build graph
-        builder = HeteroGraphBuilder(cms_url=request.cms_url)
-        try:
-            graph = builder.build_graph(lookback_days=request.lookback_days)
-        finally:
-            builder.close()
-        
-        _state["hgt_graph"] = graph
-        
-        # Check for minimum data
-        from app.models.hgt import NodeType
-        num_users = graph.num_nodes.get(NodeType.USER, 0)
-        num_games = graph.num_nodes.get(NodeType.GAME, 0)
-        
-        if num_users == 0 or num_games == 0:
-            _state["is_training"] = False
-            return HGTTrainResponse(
-                status="insufficient_data",
-                final_loss=0.0,
-                best_loss=0.0,
-                num_epochs=0,
-                num_users=num_users,
-                num_games=num_games,
-                num_providers=graph.num_nodes.get(NodeType.PROVIDER, 0),
-                num_promotions=graph.num_nodes.get(NodeType.PROMOTION, 0),
-                num_edge_types=len(graph.edge_index)
-            )
-        
-        # Train model
-        trainer = HGTTrainer(graph, device=get_device())
-        stats = trainer.train(
-            num_epochs=request.num_epochs,
-            batch_size=request.batch_size
-        )
-        
-        # Save model
-        trainer.save_model()
-        
-        # Update state
-        _state["hgt_trainer"] = trainer
-        _state["hgt_inference"] = trainer.get_inference()
-        _state["is_training"] = False
-        
-        # Sync to Qdrant in background
-        background_tasks.add_task(_sync_hgt_to_qdrant)
-        
-        return HGTTrainResponse(
-            status="success",
-            final_loss=stats["final_loss"],
-            best_loss=stats["best_loss"],
-            num_epochs=stats["num_epochs"],
-            num_users=num_users,
-            num_games=num_games,
-            num_providers=graph.num_nodes.get(NodeType.PROVIDER, 0),
-            num_promotions=graph.num_nodes.get(NodeType.PROMOTION, 0),
-            num_edge_types=len(graph.edge_index)
-        )
-        
-    except Exception as e:
-        _state["is_training"] = False
-        logger.error("HGT training failed", error=str(e))
-        raise HTTPException(status_code=500, detail=str(e))
+    Training and the Qdrant sync run as a job in a separate process; poll
+    /jobs/{job_id}.
+    """
+    logger.info("Queueing HGT training", **request.model_dump())
+    return _submit_training("hgt", training_jobs.train_hgt, request.model_dump(), _load_hgt)
 
 
-async def _sync_hgt_to_qdrant():
-    """Sync HGT embeddings to Qdrant."""
-    inference = _state.get("hgt_inference")
-    if inference is None:
-        return
+def _load_hgt(result: dict) -> dict:
+    """Serve an HGT model trained by a job (runs in the registry)."""
+    graph = result.pop("graph")
     
-    try:
-        logger.info("Syncing HGT embeddings to Qdrant")
-        
-        embedding_service = get_embedding_service()
-        inference.compute_embeddings()
-        
-        from app.models.hgt import NodeType
-        
-        # Sync user embeddings
-        if NodeType.USER in inference.embeddings:
-            user_embs = inference.embeddings[NodeType.USER].cpu().numpy()
-            for user_id, idx in inference.graph_data.user_id_to_idx.items():
-                embedding_service.store_user_embedding(user_id, user_embs[idx].tolist())
-        
-        # Sync game embeddings
-        if NodeType.GAME in inference.embeddings:
-            game_embs = inference.embeddings[NodeType.GAME].cpu().numpy()
-            for game_slug, idx in inference.graph_data.game_slug_to_idx.items():
-                embedding_service.store_game_embedding(game_slug, game_embs[idx].tolist())
-        
-        logger.info("HGT embeddings synced to Qdrant")
-        
-    except Exception as e:
-        logger.error("Failed to sync HGT embeddings", error=str(e))
+    trainer = HGTTrainer(graph, device=get_device())
+    if not trainer.load_model():
+        raise RuntimeError("Trained HGT checkpoint could not be loaded")
+    
+    _state["hgt_graph"] = graph
+    _state["hgt_trainer"] = trainer
+    _state["hgt_inference"] = trainer.get_inference()
+    _state["models"]["hgt"] = "loaded"
+    
+    logger.info("HGT training completed")
+    return result["stats"]
 
 
 @router.post("/hgt/recommend", response_model=HGTRecommendResponse)
@@ -794,7 +977,8 @@ async def hgt_recommend(request: HGTRecommendRequest):
             user_id=request.user_id,
             top_k=request.limit,
             exclude_games=exclude,
-            provider_filter=request.provider_filter
+            provider_filter=request.provider_filter,
+            exclude_played=request.exclude_played
         )
         
         # Check if cold-start
@@ -815,6 +999,45 @@ async def hgt_recommend(request: HGTRecommendRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/hgt/recommend/batch")
+async def hgt_recommend_batch(request: HGTBatchRecommendRequest):
+    """Get HGT recommendations for many users, streamed as NDJSON.
+    
+    Lines have the /hgt/recommend response shape.
+    """
+    inference = _state.get("hgt_inference")
+    
+    if inference is None:
+        raise HTTPException(status_code=503, detail="HGT model not trained")
+    
+    def score_chunk(users: list[BatchRecommendUser]) -> list[dict]:
+        recommendations = inference.get_recommendations_batch(
+            [user.user_id for user in users],
+            top_k=request.limit,
+            exclude_games=[
+                set(user.exclude_games) if user.exclude_games else None
+                for user in users
+            ],
+            exclude_played=request.exclude_played
+        )
+        
+        lines = []
+        for user, recs in zip(users, recommendations):
+            is_cold_start = user.user_id not in inference.graph_data.user_id_to_idx
+            lines.append({
+                "user_id": user.user_id,
+                "recommendations": [
+                    {"game_slug": slug, "score": score}
+                    for slug, score in recs
+                ],
+                "source": "hgt_cold_start" if is_cold_start else "hgt",
+                "is_cold_start": is_cold_start
+            })
+        return lines
+    
+    return _stream_ndjson(request.users, score_chunk)
+
+
 @router.post("/hgt/similar_games", response_model=HGTSimilarGamesResponse)
 async def hgt_similar_games(request: HGTSimilarGamesRequest):
     """Get games similar to a given game."""
@@ -900,12 +1123,20 @@ async def get_hgt_status():
 
 @router.post("/hgt/load")
 async def load_hgt_model():
-    """Load a previously saved HGT model."""
-    if _state.get("hgt_trainer") is not None:
+    """Load a previously saved HGT model.
+    
+    Restores the saved artifact, graph included; only a legacy checkpoint
+    needs the graph rebuilt from PostgreSQL and the CMS.
+    """
+    if _state.get("hgt_inference") is not None:
         return {"status": "already_loaded"}
     
     try:
-        # Need to rebuild graph first
+        if _restore_hgt(get_device()):
+            _state["models"]["hgt"] = "loaded"
+            return {"status": "loaded"}
+        
+        # Legacy checkpoint: rebuild the graph first
         builder = HeteroGraphBuilder()
         try:
             graph = builder.build_graph(lookback_days=30)
@@ -30,17 +30,55 @@ class Settings(BaseSettings):
     # Qdrant connection
     qdrant_host: str = "qdrant"
     qdrant_port: int = 6333
+    qdrant_grpc_port: int = 6334
+    qdrant_prefer_grpc: bool = False  # Bulk uploads are much cheaper over gRPC
+    
+    # Bulk embedding upload
+    qdrant_upload_batch_size: int = 2048  # Points per upsert request
+    qdrant_upload_parallel: int = 4  # Upserts kept in flight
+    qdrant_upload_wait: bool = False  # Block until each batch is indexed
+    
+    # Versioned collections (collection names above are aliases)
+    qdrant_keep_versions: int = 2  # Versions kept per alias, current one included
+    qdrant_indexing_threshold: int = 20000  # Restored once a bulk load completes
+    qdrant_index_timeout: float = 300.0  # Seconds to wait for indexing before a swap
+    
+    # Embedding quantization in Qdrant
+    qdrant_vector_datatype: str = "float32"  # Stored vectors: "float32" or "float16"
+    qdrant_quantization: str = "none"  # "none" or "int8" (scalar quantization, rescored)
+    qdrant_quantization_quantile: float = 0.99  # Clip outliers when fitting the int8 range
+    qdrant_quantization_always_ram: bool = True  # Pin quantized vectors in RAM
+    qdrant_quantization_oversampling: float = 2.0  # Candidates rescored per result
     
     @property
     def qdrant_url(self) -> str:
         return f"http://{self.qdrant_host}:{self.qdrant_port}"
     
+    # Embedding dimensions (collections are created at each model's size)
+    embedding_dim: int = 64  # Internal dimension of LightGCN, HGT and TGN
+    lightgcn_embedding_dim: int = 0  # Per-model overrides, 0 = embedding_dim
+    hgt_embedding_dim: int = 0
+    tgn_embedding_dim: int = 0
+    lightgcn_publish_dim: int = 0  # Project published vectors to this size, 0 = no projection
+    hgt_publish_dim: int = 0  # (only for consumers that need a fixed size, e.g. 768)
+    
+    def model_embedding_dim(self, model: str) -> int:
+        """Internal embedding dimension of a model ("lightgcn", "hgt" or "tgn")."""
+        return getattr(self, f"{model}_embedding_dim") or self.embedding_dim
+    
+    def model_publish_dim(self, model: str) -> int:
+        """Size of a model's vectors in Qdrant."""
+        return getattr(self, f"{model}_publish_dim") or self.model_embedding_dim(model)
+    
     # LightGCN model settings
-    embedding_dim: int = 768  # Match existing Qdrant vector size
     num_layers: int = 3
     learning_rate: float = 0.001
     batch_size: int = 1024
     num_epochs: int = 100
+    lightgcn_train_mode: str = "minibatch"  # "minibatch" or "full_batch"
+    full_batch_learning_rate: float = 0.05  # One step per epoch needs a larger step
+    bpr_num_negatives: int = 1  # Negative samples per positive
+    bpr_popularity_alpha: float = 0.0  # 0 = uniform negatives, >0 = popularity ** alpha
     
     # Collections
     lightgcn_users_collection: str = "lightgcn_users"
@@ -52,6 +90,7 @@ class Settings(BaseSettings):
     model_path: str = "/app/models/lightgcn_model.pt"
     hgt_model_path: str = "/app/models/hgt_model.pt"
     tgn_model_path: str = "/app/models/tgn_model.pt"
+    graph_store_path: str = "/app/models/graph_store.npz"
     
     # Event weights (match Go service)
     impression_weight: float = 0.2
@@ -64,12 +103,55 @@ class Settings(BaseSettings):
     behavior_half_life_days: int = 7
     rating_half_life_days: int = 90
     
+    # Graph building
+    graph_fetch_chunk_size: int = 100_000  # Rows per server-side cursor fetch
+    graph_pushdown: bool = False  # Aggregate edge weights in PostgreSQL
+    graph_watermark_overlap: float = 300.0  # Seconds re-read below the incremental watermark (late commits)
+    
+    # In-process serving index for /v1/recommend
+    serving_index_enabled: bool = True
+    serving_index_dtype: str = "float32"  # "float32", "float16" or "int8" (per-row scales)
+    serving_user_cache_size: int = 100_000  # Hot user vectors kept in memory
+    serving_user_cache_ttl: float = 300.0  # Seconds before a cached user vector is refetched
+    serving_version_check_interval: float = 10.0  # Seconds between alias version checks
+    batch_recommend_chunk_size: int = 1024  # Users scored per matmul in batch endpoints
+    serving_source: str = "qdrant"  # "qdrant", or "snapshot" to map the published snapshot (multi-worker)
+    
+    # Memory-mapped embedding snapshots, shared by all serving workers
+    snapshot_path: str = "/app/models/snapshots"  # One directory of versions per model
+    snapshot_keep: int = 2  # Versions kept on disk, including the current one
+    
+    # Precomputed top-N tables (python -m app.jobs.precompute_topn)
+    topn_path: str = "/app/models/topn"  # One memory-mapped table per model
+    topn_size: int = 100  # Games stored per user
+    topn_memory_budget_mb: int = 512  # Score blocks in flight, across all workers
+    topn_workers: int = 0  # Worker processes, 0 = one per core
+    topn_after_train: bool = False  # Rebuild a model's table after each training run
+    
+    # Training jobs (each runs in its own process, see /v1/jobs)
+    training_workers: int = 1  # Jobs run at once; others wait in the queue
+    training_job_history: int = 50  # Finished jobs kept in the registry
+    training_cancel_grace_seconds: float = 30.0  # Wait for a cancelled job to stop before killing it
+    
+    # Boot-time restore of the latest saved models (see /v1/ready)
+    warm_start: bool = True  # Load saved artifacts in the background on startup
+    warm_start_models: str = "lightgcn,hgt,tgn"  # Comma-separated models to restore
+    
     # HGT specific settings
     hgt_hidden_dim: int = 256
     hgt_num_layers: int = 2
     hgt_num_heads: int = 8
     hgt_dropout: float = 0.1
     
+    # TGN specific settings
+    tgn_num_threads: int = 0  # Intra-op threads while training, 0 = torch default (one per core)
+    tgn_memory_aggregation: str = "sequential"  # Repeated users in a batch: "sequential", "last" or "mean"
+    
+    # Real-time TGN memory updates from /v1/tgn/interaction
+    tgn_ingest_enabled: bool = True  # Queue events and apply them in micro-batches (false = in the request)
+    tgn_ingest_max_batch: int = 256  # Events per batched memory update
+    tgn_ingest_max_delay_ms: float = 5.0  # Wait after a batch's first event before applying it
+    
     # CMS URL for fetching game metadata
     cms_url: str = "http://cms:3001"
     
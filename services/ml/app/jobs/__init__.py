@@ -0,0 +1 @@
+"""Offline maintenance jobs, run with `python -m app.jobs.<job>`."""
@@ -0,0 +1,216 @@
+"""Benchmark LightGCN training at several embedding dimensions.
+
+Holds out one positive interaction per user, trains LightGCN on the rest
+at each dimension and reports, per dimension, the training time, the size
+of the trainable state (weights, gradients and Adam moments) and of the
+published vectors, and leave-one-out recall@K with played games excluded.
+Uses the interaction graph from the database, or a synthetic power-law
+graph with --synthetic.
+
+Usage:
+    python -m app.jobs.bench_embedding_dim [--dims 64 128 256 768]
+        [--epochs 50] [--k 10] [--synthetic]
+"""
+
+import argparse
+import time
+from typing import Optional, Sequence
+
+import numpy as np
+import torch
+
+from app.services.graph_builder import GraphData
+from app.services.trainer import LightGCNTrainer
+
+# Trainable state per parameter: weight, gradient and two Adam moments
+_STATE_COPIES = 4
+
+
+def synthetic_graph(
+    num_users: int = 5000,
+    num_games: int = 1000,
+    interactions_per_user: int = 20,
+    num_clusters: int = 20,
+    in_cluster: float = 0.8,
+    seed: int = 0
+) -> GraphData:
+    """Build a clustered power-law user-game graph.
+    
+    Each user prefers one cluster of games and picks from it with
+    probability in_cluster; within a pool, games are drawn by a Zipf-like
+    popularity, so there is structure for the model to learn.
+    
+    Args:
+        num_users: Number of users
+        num_games: Number of games
+        interactions_per_user: Mean interactions per user
+        num_clusters: Number of game clusters
+        in_cluster: Probability of picking from the preferred cluster
+        seed: Random seed
+        
+    Returns:
+        GraphData with unit-weight edges in both directions
+    """
+    rng = np.random.default_rng(seed)
+    game_cluster = rng.integers(num_clusters, size=num_games)
+    popularity = 1.0 / np.arange(1, num_games + 1) ** 0.8
+    popularity = popularity[rng.permutation(num_games)]
+    
+    users, games = [], []
+    for user in range(num_users):
+        cluster = rng.integers(num_clusters)
+        count = max(2, rng.poisson(interactions_per_user))
+        own = rng.random(count) < in_cluster
+        for pool, size in ((game_cluster == cluster, own.sum()), (game_cluster != cluster, (~own).sum())):
+            weights = np.where(pool, popularity, 0.0)
+            picks = rng.choice(num_games, size=min(size, pool.sum()), replace=False, p=weights / weights.sum())
+            users.extend([user] * len(picks))
+            games.extend(picks)
+    
+    graph = _graph_from_pairs(np.array(users), np.array(games), np.ones(len(users)), num_users, num_games)
+    graph.user_id_to_idx = {f"user-{i}": i for i in range(num_users)}
+    graph.idx_to_user_id = {i: f"user-{i}" for i in range(num_users)}
+    graph.game_slug_to_idx = {f"game-{i}": i for i in range(num_games)}
+    graph.idx_to_game_slug = {i: f"game-{i}" for i in range(num_games)}
+    return graph
+
+
+def _graph_from_pairs(
+    users: np.ndarray,
+    games: np.ndarray,
+    weights: np.ndarray,
+    num_users: int,
+    num_games: int
+) -> GraphData:
+    """Bipartite GraphData (users first, games offset by num_users)."""
+    src = torch.as_tensor(users, dtype=torch.long)
+    dst = torch.as_tensor(games, dtype=torch.long) + num_users
+    weight = torch.as_tensor(weights, dtype=torch.float)
+    
+    return GraphData(
+        edge_index=torch.stack([torch.cat([src, dst]), torch.cat([dst, src])]),
+        edge_weight=torch.cat([weight, weight]),
+        num_users=num_users,
+        num_games=num_games,
+        num_edges=2 * len(src)
+    )
+
+
+def leave_one_out(graph: GraphData, seed: int = 0) -> tuple[GraphData, np.ndarray, np.ndarray]:
+    """Hold out one positive interaction of each user with at least two.
+    
+    Returns:
+        (train graph, test user indices, held-out game indices)
+    """
+    rng = np.random.default_rng(seed)
+    edge_index = graph.edge_index.cpu().numpy()
+    weights = (
+        graph.edge_weight.cpu().numpy() if graph.edge_weight is not None
+        else np.ones(edge_index.shape[1], dtype=np.float32)
+    )
+    
+    user_to_game = edge_index[0] < graph.num_users
+    users = edge_index[0, user_to_game]
+    games = edge_index[1, user_to_game] - graph.num_users
+    weights = weights[user_to_game]
+    
+    # Shuffle, then take the first positive edge of each user as the test edge
+    order = rng.permutation(len(users))
+    users, games, weights = users[order], games[order], weights[order]
+    positive = np.flatnonzero(weights > 0)
+    
+    test_users, first = np.unique(users[positive], return_index=True)
+    counts = np.bincount(users[positive], minlength=graph.num_users)
+    keep = counts[test_users] >= 2
+    test_edges = positive[first[keep]]
+    
+    train = np.ones(len(users), dtype=bool)
+    train[test_edges] = False
+    
+    train_graph = _graph_from_pairs(users[train], games[train], weights[train], graph.num_users, graph.num_games)
+    return train_graph, users[test_edges], games[test_edges]
+
+
+def benchmark_dims(
+    graph: GraphData,
+    dims: Sequence[int] = (64, 128, 256, 768),
+    num_epochs: Optional[int] = None,
+    k: int = 10,
+    seed: int = 0
+) -> list[dict]:
+    """Train and evaluate LightGCN at each embedding dimension.
+    
+    Args:
+        graph: Full interaction graph
+        dims: Embedding dimensions to compare
+        num_epochs: Training epochs per dimension (defaults to config)
+        k: Cutoff for recall@K
+        seed: Seed for the split and the model initialization
+        
+    Returns:
+        One report row per dimension
+    """
+    train_graph, test_users, test_games = leave_one_out(graph, seed)
+    num_nodes = graph.num_users + graph.num_games
+    
+    reports = []
+    for dim in dims:
+        torch.manual_seed(seed)
+        trainer = LightGCNTrainer(train_graph, device=torch.device("cpu"), embedding_dim=dim)
+        
+        start = time.perf_counter()
+        stats = trainer.train(num_epochs=num_epochs)
+        train_seconds = time.perf_counter() - start
+        
+        inference = trainer.get_inference()
+        recommendations = inference.recommend_batch(test_users.tolist(), top_k=k, exclude_played=True)
+        hits = sum(
+            any(idx == game for idx, _ in recs)
+            for recs, game in zip(recommendations, test_games)
+        )
+        
+        num_params = sum(param.numel() for param in trainer.model.parameters())
+        reports.append({
+            "dim": dim,
+            "train_s": round(train_seconds, 2),
+            "s_per_epoch": round(train_seconds / max(stats["num_epochs"], 1), 3),
+            "train_state_mb": round(num_params * 4 * _STATE_COPIES / 2 ** 20, 2),
+            "vectors_mb": round(num_nodes * dim * 4 / 2 ** 20, 2),
+            f"recall@{k}": round(hits / len(test_users), 4) if len(test_users) else 0.0,
+            "final_loss": round(stats["final_loss"], 4)
+        })
+    
+    return reports
+
+
+def main(argv: Optional[list[str]] = None):
+    """Run the embedding dimension benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--dims", type=int, nargs="+", default=[64, 128, 256, 768])
+    parser.add_argument("--epochs", type=int, default=None, help="Epochs per dimension (default: config)")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--lookback-days", type=int, default=30)
+    parser.add_argument("--synthetic", action="store_true", help="Use a synthetic graph instead of the database")
+    parser.add_argument("--users", type=int, default=5000, help="Synthetic graph users")
+    parser.add_argument("--games", type=int, default=1000, help="Synthetic graph games")
+    args = parser.parse_args(argv)
+    
+    if args.synthetic:
+        graph = synthetic_graph(args.users, args.games, seed=args.seed)
+    else:
+        from app.services.graph_builder import GraphBuilder
+        
+        builder = GraphBuilder()
+        try:
+            graph = builder.build_graph(args.lookback_days)
+        finally:
+            builder.close()
+    
+    print(f"users={graph.num_users}  games={graph.num_games}  edges={graph.num_edges}")
+    for report in benchmark_dims(graph, args.dims, num_epochs=args.epochs, k=args.k, seed=args.seed):
+        print("  ".join(f"{key}={value}" for key, value in report.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""Compact Qdrant embedding collections onto stable point IDs.
+
+Points used to be stored under abs(hash(key)) % 2**63, which is salted per
+process, so every restart wrote a fresh copy of the same user or game.
+This job rewrites each key once under its stable point_id() and deletes
+all other copies.
+
+Usage:
+    python -m app.jobs.compact_points [--dry-run] [--batch-size N] [collection ...]
+"""
+
+import argparse
+from typing import Optional
+
+import structlog
+from qdrant_client.http import models
+
+from app.config import get_settings
+from app.services.embedding_service import EmbeddingService, point_id
+
+logger = structlog.get_logger()
+
+
+def compact_collection(
+    service: EmbeddingService,
+    collection_name: str,
+    key_field: str,
+    batch_size: int = 1000,
+    dry_run: bool = False
+) -> dict:
+    """Deduplicate one collection onto stable point IDs.
+    
+    Keys that already have a point under their stable ID keep it. For other
+    keys one legacy copy is rewritten under the stable ID, preferring
+    realtime updates (written after training) over training batches.
+    
+    Args:
+        service: Embedding service providing the Qdrant client
+        collection_name: Collection or alias to compact
+        key_field: Payload field holding the entity key
+        batch_size: Points per scroll, upsert and delete request
+        dry_run: Only report what would change
+        
+    Returns:
+        Compaction statistics
+    """
+    client = service.client
+    
+    # Pass 1: payloads only, pick which point survives for each key
+    stable_keys: set[str] = set()
+    legacy: dict[str, tuple[int, models.ExtendedPointId]] = {}
+    stale_ids: list[models.ExtendedPointId] = []
+    num_points = 0
+    unkeyed = 0
+    
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection_name,
+            limit=batch_size,
+            offset=offset,
+            with_payload=[key_field, "source"],
+            with_vectors=False
+        )
+        
+        for point in points:
+            num_points += 1
+            payload = point.payload or {}
+            key = payload.get(key_field)
+            if key is None:
+                unkeyed += 1
+                continue
+            
+            if str(point.id) == point_id(key):
+                stable_keys.add(key)
+                continue
+            
+            stale_ids.append(point.id)
+            priority = 1 if str(payload.get("source", "")).endswith("_realtime") else 0
+            if key not in legacy or priority > legacy[key][0]:
+                legacy[key] = (priority, point.id)
+        
+        if offset is None:
+            break
+    
+    to_rewrite = [(key, pid) for key, (_, pid) in legacy.items() if key not in stable_keys]
+    
+    stats = {
+        "collection": collection_name,
+        "points": num_points,
+        "keys": len(stable_keys) + len(to_rewrite),
+        "rewritten": len(to_rewrite),
+        "deleted": len(stale_ids),
+        "unkeyed": unkeyed
+    }
+    
+    if dry_run:
+        return stats
+    
+    # Pass 2: copy the surviving legacy points under their stable IDs
+    for start in range(0, len(to_rewrite), batch_size):
+        chunk = to_rewrite[start:start + batch_size]
+        records = client.retrieve(
+            collection_name=collection_name,
+            ids=[pid for _, pid in chunk],
+            with_payload=True,
+            with_vectors=True
+        )
+        by_id = {str(record.id): record for record in records}
+        
+        points = []
+        for key, pid in chunk:
+            record = by_id.get(str(pid))
+            if record is not None:
+                points.append(models.PointStruct(
+                    id=point_id(key),
+                    vector=record.vector,
+                    payload=record.payload
+                ))
+        
+        client.upsert(collection_name=collection_name, points=points, wait=True)
+    
+    # Pass 3: drop every legacy copy
+    for start in range(0, len(stale_ids), batch_size):
+        client.delete(
+            collection_name=collection_name,
+            points_selector=models.PointIdsList(points=stale_ids[start:start + batch_size]),
+            wait=True
+        )
+    
+    return stats
+
+
+def main(argv: Optional[list[str]] = None):
+    """Compact the given collections (all embedding collections by default)."""
+    settings = get_settings()
+    key_fields = {
+        settings.lightgcn_users_collection: "user_id",
+        settings.lightgcn_games_collection: "game_slug",
+        settings.hgt_users_collection: "user_id",
+        settings.hgt_games_collection: "game_slug"
+    }
+    
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("collections", nargs="*", default=list(key_fields))
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+    
+    unknown = [name for name in args.collections if name not in key_fields]
+    if unknown:
+        parser.error(f"unknown collections: {', '.join(unknown)}")
+    
+    service = EmbeddingService()
+    existing = {c.name for c in service.client.get_collections().collections}
+    existing.update(service._get_aliases())
+    
+    for collection_name in args.collections:
+        if collection_name not in existing:
+            logger.info("Skipping missing collection", collection=collection_name)
+            continue
+        
+        stats = compact_collection(
+            service,
+            collection_name,
+            key_fields[collection_name],
+            batch_size=args.batch_size,
+            dry_run=args.dry_run
+        )
+        logger.info("Compacted collection" if not args.dry_run else "Dry run", **stats)
+
+
+if __name__ == "__main__":
+    main()
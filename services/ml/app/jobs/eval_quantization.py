@@ -0,0 +1,193 @@
+"""Measure the accuracy, memory and latency cost of embedding quantization.
+
+Scores a sample of users against all games with the game matrix stored as
+float32, float16 and int8 (per-row scales) and reports, per dtype, the
+recall@K of the quantized top-K against exact float32 scoring, the matrix
+size, and batch / single-query latency. With --qdrant, Qdrant's quantized
+search is also compared against an exact search that ignores quantization.
+
+Usage:
+    python -m app.jobs.eval_quantization [--model lightgcn|hgt] [--k 10]
+        [--sample 1000] [--qdrant]
+"""
+
+import argparse
+import time
+from typing import Optional, Sequence
+
+import numpy as np
+from qdrant_client.http import models
+
+from app.config import get_settings
+from app.models.quantization import DTYPES, QuantizedMatrix
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Unordered column indices of the top-K of each row."""
+    k = min(k, scores.shape[1])
+    return np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+
+def recall_at_k(truth: np.ndarray, found: np.ndarray) -> float:
+    """Mean fraction of each row's true top-K found (row order ignored)."""
+    hits = [len(np.intersect1d(t, f, assume_unique=True)) for t, f in zip(truth, found)]
+    return float(np.sum(hits) / truth.size) if truth.size else 1.0
+
+
+def evaluate_dtypes(
+    user_vectors: np.ndarray,
+    game_vectors: np.ndarray,
+    k: int = 10,
+    dtypes: Sequence[str] = DTYPES,
+    batch_size: int = 256,
+    single_queries: int = 200
+) -> list[dict]:
+    """Compare quantized in-process scoring against exact float32.
+    
+    Vectors are L2-normalized first (cosine, as served by ServingIndex).
+    
+    Args:
+        user_vectors: Sampled user embeddings [num_users, dim]
+        game_vectors: All game embeddings [num_games, dim]
+        k: Cutoff for recall@K
+        dtypes: Storage dtypes to compare
+        batch_size: Users scored per matmul for the batch latency
+        single_queries: Users scored one at a time for the p50 latency
+        
+    Returns:
+        One report row per dtype
+    """
+    users = _normalize(np.asarray(user_vectors, dtype=np.float32))
+    games = _normalize(np.asarray(game_vectors, dtype=np.float32))
+    truth = _top_k(users @ games.T, k)
+    
+    reports = []
+    for dtype in dtypes:
+        matrix = QuantizedMatrix.quantize(games, dtype)
+        
+        found = []
+        start = time.perf_counter()
+        for offset in range(0, len(users), batch_size):
+            found.append(_top_k(matrix.matmul_t(users[offset:offset + batch_size]), k))
+        batch_seconds = time.perf_counter() - start
+        found = np.concatenate(found) if found else np.zeros((0, k), dtype=np.int64)
+        
+        latencies = []
+        for user in users[:single_queries]:
+            start = time.perf_counter()
+            _top_k(matrix.matmul_t(user[None, :]), k)
+            latencies.append(time.perf_counter() - start)
+        
+        reports.append({
+            "dtype": dtype,
+            f"recall@{k}": round(recall_at_k(truth, found), 4),
+            "matrix_mb": round(matrix.nbytes / 2 ** 20, 2),
+            "batch_users_per_s": round(len(users) / max(batch_seconds, 1e-9)),
+            "single_p50_us": round(float(np.median(latencies)) * 1e6, 1) if latencies else None
+        })
+    
+    return reports
+
+
+def evaluate_qdrant(
+    client,
+    collection_name: str,
+    user_vectors: np.ndarray,
+    k: int = 10,
+    oversampling: Optional[float] = None
+) -> dict:
+    """Compare Qdrant's quantized search against exact, unquantized search.
+    
+    Args:
+        client: Qdrant client
+        collection_name: Games collection (or alias)
+        user_vectors: Sampled user embeddings used as queries
+        k: Cutoff for recall@K
+        oversampling: Quantized candidates rescored per result
+        
+    Returns:
+        Report row with recall@K and mean latencies of both searches
+    """
+    settings = get_settings()
+    oversampling = oversampling or settings.qdrant_quantization_oversampling
+    
+    quantized_params = models.SearchParams(
+        quantization=models.QuantizationSearchParams(rescore=True, oversampling=oversampling)
+    )
+    exact_params = models.SearchParams(
+        exact=True,
+        quantization=models.QuantizationSearchParams(ignore=True)
+    )
+    
+    hits, total = 0, 0
+    seconds = {"quantized": 0.0, "exact": 0.0}
+    
+    for vector in np.asarray(user_vectors, dtype=np.float32):
+        ids = {}
+        for name, params in (("quantized", quantized_params), ("exact", exact_params)):
+            start = time.perf_counter()
+            points = client.query_points(
+                collection_name=collection_name,
+                query=vector.tolist(),
+                limit=k,
+                search_params=params
+            ).points
+            seconds[name] += time.perf_counter() - start
+            ids[name] = {point.id for point in points}
+        
+        hits += len(ids["quantized"] & ids["exact"])
+        total += len(ids["exact"])
+    
+    num_queries = max(len(user_vectors), 1)
+    return {
+        "dtype": "qdrant",
+        f"recall@{k}": round(hits / total, 4) if total else 1.0,
+        "quantized_ms": round(seconds["quantized"] / num_queries * 1e3, 2),
+        "exact_ms": round(seconds["exact"] / num_queries * 1e3, 2)
+    }
+
+
+def main(argv: Optional[list[str]] = None):
+    """Evaluate quantization on the published embeddings of a model."""
+    from app.services.embedding_service import EmbeddingService
+    
+    settings = get_settings()
+    collections = {
+        "lightgcn": (settings.lightgcn_users_collection, settings.lightgcn_games_collection),
+        "hgt": (settings.hgt_users_collection, settings.hgt_games_collection)
+    }
+    
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--model", choices=list(collections), default="lightgcn")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--sample", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--qdrant", action="store_true", help="Also evaluate Qdrant's quantized search")
+    args = parser.parse_args(argv)
+    
+    users_collection, games_collection = collections[args.model]
+    service = EmbeddingService()
+    
+    _, user_vectors, _ = service.scroll_embeddings(users_collection, key_field="user_id")
+    _, game_vectors, _ = service.scroll_embeddings(games_collection, key_field="game_slug")
+    
+    rng = np.random.default_rng(args.seed)
+    sample = rng.choice(len(user_vectors), min(args.sample, len(user_vectors)), replace=False)
+    user_vectors = user_vectors[np.sort(sample)]
+    
+    reports = evaluate_dtypes(user_vectors, game_vectors, k=args.k)
+    if args.qdrant:
+        reports.append(evaluate_qdrant(service.client, games_collection, user_vectors, k=args.k))
+    
+    for report in reports:
+        print("  ".join(f"{key}={value}" for key, value in report.items()))
+
+
+if __name__ == "__main__":
+    main()
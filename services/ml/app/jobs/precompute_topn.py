@@ -0,0 +1,301 @@
+"""Precompute the top-N games of every user into a memory-mapped table.
+
+Users are scored in row blocks sized to fit a memory budget, spread across
+a process pool. Workers memory-map the inputs and write their rows straight
+into the output arrays, so nothing but block bounds crosses processes. The
+table is built next to the live one and swapped in when complete; see
+app.services.topn_store for the layout and the reader.
+
+Run after each training run, from the published Qdrant embeddings:
+    python -m app.jobs.precompute_topn --model lightgcn|hgt [--top-n N]
+        [--memory-budget-mb MB] [--workers N]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import time
+from typing import Optional
+
+import numpy as np
+import structlog
+import torch
+
+from app.config import get_settings
+from app.services.topn_store import (
+    META_FILE, USER_IDS_FILE, USER_ROWS_FILE, GAME_SLUGS_FILE, ITEMS_FILE, SCORES_FILE,
+    table_path
+)
+
+logger = structlog.get_logger()
+
+# Scratch copies of the inputs, memory-mapped by the workers
+USERS_INPUT = "users.input.npy"
+GAMES_INPUT = "games.input.npy"
+
+# Per-process worker state, set by _init_worker
+_worker: dict = {}
+
+
+def _init_worker(work_dir: str, num_users: int, top_n: int, single_thread: bool = True):
+    """Open the shared inputs and outputs in a worker process."""
+    if single_thread:
+        # One BLAS thread per process; the pool provides the parallelism
+        torch.set_num_threads(1)
+    
+    shape = (num_users, top_n)
+    _worker["users"] = np.load(os.path.join(work_dir, USERS_INPUT), mmap_mode="r")
+    _worker["games"] = torch.from_numpy(np.load(os.path.join(work_dir, GAMES_INPUT)))
+    _worker["items"] = np.memmap(os.path.join(work_dir, ITEMS_FILE), dtype=np.int32, mode="r+", shape=shape)
+    _worker["scores"] = np.memmap(os.path.join(work_dir, SCORES_FILE), dtype=np.float16, mode="r+", shape=shape)
+
+
+def _score_block(bounds: tuple[int, int]) -> int:
+    """Score users [start, end) against all games and store their top-N."""
+    start, end = bounds
+    users = torch.from_numpy(np.array(_worker["users"][start:end]))
+    
+    scores = users @ _worker["games"].T
+    top_scores, top_items = torch.topk(scores, _worker["items"].shape[1], dim=1)
+    
+    _worker["items"][start:end] = top_items.numpy().astype(np.int32)
+    _worker["scores"][start:end] = top_scores.numpy().astype(np.float16)
+    _worker["items"].flush()
+    _worker["scores"].flush()
+    
+    return end - start
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def precompute_topn(
+    user_ids: list[str],
+    user_embeddings: np.ndarray,
+    game_slugs: list[str],
+    game_embeddings: np.ndarray,
+    model: str,
+    metric: str = "dot",
+    top_n: Optional[int] = None,
+    memory_budget_mb: Optional[int] = None,
+    workers: Optional[int] = None,
+    output_dir: Optional[str] = None
+) -> dict:
+    """Compute and publish a model's top-N table.
+    
+    Args:
+        user_ids: User ID of each user embedding row
+        user_embeddings: User embeddings [num_users, dim]
+        game_slugs: Game slug of each game embedding row
+        game_embeddings: Game embeddings [num_games, dim]
+        model: Model name, the table's subdirectory
+        metric: "dot" or "cosine", matching how the model is served live
+        top_n: Games stored per user (defaults to config)
+        memory_budget_mb: Budget for score blocks across all workers
+            (defaults to config)
+        workers: Worker processes, 0 for one per core (defaults to config)
+        output_dir: Table directory (defaults to topn_path/model)
+        
+    Returns:
+        Table statistics
+    """
+    settings = get_settings()
+    if metric not in ("dot", "cosine"):
+        raise ValueError(f"Unknown metric: {metric}")
+    
+    top_n = top_n or settings.topn_size
+    memory_budget_mb = memory_budget_mb or settings.topn_memory_budget_mb
+    workers = settings.topn_workers if workers is None else workers
+    workers = workers or os.cpu_count() or 1
+    output_dir = output_dir or table_path(model)
+    
+    users = np.asarray(user_embeddings, dtype=np.float32)
+    games = np.asarray(game_embeddings, dtype=np.float32)
+    if metric == "cosine":
+        users, games = _normalize(users), _normalize(games)
+    
+    num_users, num_games = len(users), len(games)
+    top_n = min(top_n, num_games)
+    if num_users == 0 or top_n == 0:
+        raise ValueError("Nothing to precompute: no users or no games")
+    
+    # Rows per block, so that all in-flight score blocks fit the budget
+    row_bytes = 4 * (num_games + users.shape[1])
+    block_rows = (memory_budget_mb * 2 ** 20) // (workers * row_bytes)
+    block_rows = int(min(max(block_rows, 1), -(-num_users // workers)))
+    blocks = [(start, min(start + block_rows, num_users)) for start in range(0, num_users, block_rows)]
+    workers = min(workers, len(blocks))
+    
+    start_time = time.time()
+    work_dir = f"{output_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(work_dir, ignore_errors=True)
+    os.makedirs(work_dir)
+    
+    try:
+        np.save(os.path.join(work_dir, USERS_INPUT), users)
+        np.save(os.path.join(work_dir, GAMES_INPUT), games)
+        del users, games
+        
+        for name, dtype in ((ITEMS_FILE, np.int32), (SCORES_FILE, np.float16)):
+            np.memmap(os.path.join(work_dir, name), dtype=dtype, mode="w+", shape=(num_users, top_n)).flush()
+        
+        initargs = (work_dir, num_users, top_n)
+        if workers == 1:
+            _init_worker(*initargs, single_thread=False)
+            for bounds in blocks:
+                _score_block(bounds)
+            _worker.clear()
+        else:
+            # Spawned, so workers don't inherit the caller's torch threads
+            context = multiprocessing.get_context("spawn")
+            with context.Pool(workers, initializer=_init_worker, initargs=initargs) as pool:
+                for _ in pool.imap_unordered(_score_block, blocks):
+                    pass
+        
+        os.remove(os.path.join(work_dir, USERS_INPUT))
+        os.remove(os.path.join(work_dir, GAMES_INPUT))
+        
+        # Sorted, so readers binary-search the mapped IDs
+        ids = np.asarray(user_ids, dtype=str)
+        order = np.argsort(ids, kind="stable")
+        np.save(os.path.join(work_dir, USER_IDS_FILE), ids[order])
+        np.save(os.path.join(work_dir, USER_ROWS_FILE), order.astype(np.int64))
+        np.save(os.path.join(work_dir, GAME_SLUGS_FILE), np.asarray(game_slugs, dtype=str))
+        
+        stats = {
+            "model": model,
+            "metric": metric,
+            "num_users": num_users,
+            "num_games": num_games,
+            "top_n": top_n,
+            "created_at": time.time()
+        }
+        with open(os.path.join(work_dir, META_FILE), "w") as f:
+            json.dump(stats, f)
+        
+        # Swap in the new table
+        old_dir = f"{output_dir}.old"
+        shutil.rmtree(old_dir, ignore_errors=True)
+        if os.path.exists(output_dir):
+            os.rename(output_dir, old_dir)
+        os.rename(work_dir, output_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+    
+    except BaseException:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        raise
+    
+    stats.update(
+        path=output_dir,
+        workers=workers,
+        block_rows=block_rows,
+        duration_seconds=round(time.time() - start_time, 2)
+    )
+    logger.info("Precomputed top-N table", **stats)
+    return stats
+
+
+def precompute_lightgcn(inference, graph_data, **kwargs) -> dict:
+    """Precompute the LightGCN table from a trained inference wrapper.
+    
+    Ranked by cosine similarity, like /recommend.
+    """
+    user_ids = sorted(graph_data.user_id_to_idx, key=graph_data.user_id_to_idx.get)
+    game_slugs = sorted(graph_data.game_slug_to_idx, key=graph_data.game_slug_to_idx.get)
+    
+    return precompute_topn(
+        user_ids,
+        inference.get_all_user_embeddings().cpu().numpy(),
+        game_slugs,
+        inference.get_all_item_embeddings().cpu().numpy(),
+        model="lightgcn",
+        metric="cosine",
+        **kwargs
+    )
+
+
+def precompute_hgt(inference, **kwargs) -> dict:
+    """Precompute the HGT table from a trained inference wrapper.
+    
+    Ranked by dot product, like /hgt/recommend.
+    """
+    from app.models.hgt import NodeType
+    
+    if inference.embeddings is None:
+        inference.compute_embeddings()
+    
+    graph_data = inference.graph_data
+    user_ids = sorted(graph_data.user_id_to_idx, key=graph_data.user_id_to_idx.get)
+    game_slugs = sorted(graph_data.game_slug_to_idx, key=graph_data.game_slug_to_idx.get)
+    
+    return precompute_topn(
+        user_ids,
+        inference.embeddings[NodeType.USER].cpu().numpy(),
+        game_slugs,
+        inference.embeddings[NodeType.GAME].cpu().numpy(),
+        model="hgt",
+        metric="dot",
+        **kwargs
+    )
+
+
+def _order_by_index(keys: list[str], vectors: np.ndarray, indices: np.ndarray):
+    """Reorder scrolled points by their graph index when it is complete."""
+    if len(keys) and (np.sort(indices) == np.arange(len(keys))).all():
+        order = np.argsort(indices)
+        return [keys[i] for i in order], vectors[order]
+    return keys, vectors
+
+
+def main(argv: Optional[list[str]] = None):
+    """Precompute a model's table from its published Qdrant embeddings.
+    
+    Qdrant stores unit vectors (COSINE collections), so tables built here
+    are ranked by cosine similarity for both models.
+    """
+    from app.services.embedding_service import EmbeddingService
+    
+    settings = get_settings()
+    collections = {
+        "lightgcn": (settings.lightgcn_users_collection, settings.lightgcn_games_collection),
+        "hgt": (settings.hgt_users_collection, settings.hgt_games_collection)
+    }
+    
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--model", choices=list(collections), default="lightgcn")
+    parser.add_argument("--top-n", type=int, default=settings.topn_size)
+    parser.add_argument("--memory-budget-mb", type=int, default=settings.topn_memory_budget_mb)
+    parser.add_argument("--workers", type=int, default=settings.topn_workers)
+    parser.add_argument("--output-dir", default=None)
+    args = parser.parse_args(argv)
+    
+    users_collection, games_collection = collections[args.model]
+    service = EmbeddingService()
+    
+    user_ids, user_vectors, _ = service.scroll_embeddings(users_collection, key_field="user_id")
+    game_slugs, game_vectors, game_idx = service.scroll_embeddings(
+        games_collection, key_field="game_slug", index_field="game_idx"
+    )
+    game_slugs, game_vectors = _order_by_index(game_slugs, game_vectors, game_idx)
+    
+    precompute_topn(
+        user_ids,
+        user_vectors,
+        game_slugs,
+        game_vectors,
+        model=args.model,
+        metric="cosine",
+        top_n=args.top_n,
+        memory_budget_mb=args.memory_budget_mb,
+        workers=args.workers,
+        output_dir=args.output_dir
+    )
+
+
+if __name__ == "__main__":
+    main()
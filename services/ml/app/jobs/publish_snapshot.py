@@ -0,0 +1,78 @@
+"""Publish a model's embeddings as a memory-mapped serving snapshot.
+
+Training jobs publish one automatically when ML_SERVING_SOURCE=snapshot;
+this job (re)publishes from the current Qdrant collections, e.g. to seed
+the first snapshot. Serving workers swap to it within
+serving_version_check_interval; see app.services.snapshot_store.
+
+Usage:
+    python -m app.jobs.publish_snapshot [--dtype float32|float16|int8]
+"""
+
+import argparse
+from typing import Optional
+
+import numpy as np
+
+from app.config import get_settings
+from app.models.projection import project
+from app.models.quantization import DTYPES
+from app.services.snapshot_store import publish_snapshot
+
+
+def publish_lightgcn(inference, graph_data, **kwargs) -> str:
+    """Publish the LightGCN snapshot from a trained inference wrapper.
+    
+    Vectors are projected like the published Qdrant ones, so users missing
+    from the snapshot can still be scored from Qdrant.
+    """
+    publish_dim = get_settings().model_publish_dim("lightgcn")
+    user_ids = sorted(graph_data.user_id_to_idx, key=graph_data.user_id_to_idx.get)
+    game_slugs = sorted(graph_data.game_slug_to_idx, key=graph_data.game_slug_to_idx.get)
+    
+    return publish_snapshot(
+        "lightgcn",
+        user_ids,
+        project(inference.get_all_user_embeddings().cpu().numpy()[:len(user_ids)], publish_dim),
+        game_slugs,
+        project(inference.get_all_item_embeddings().cpu().numpy()[:len(game_slugs)], publish_dim),
+        metric="cosine",
+        **kwargs
+    )
+
+
+def main(argv: Optional[list[str]] = None):
+    """Publish the LightGCN snapshot from the Qdrant collections."""
+    from app.services.embedding_service import EmbeddingService
+    
+    settings = get_settings()
+    
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--dtype", choices=DTYPES, default=settings.serving_index_dtype)
+    parser.add_argument("--root", default=None, help="Snapshot directory (default: config)")
+    args = parser.parse_args(argv)
+    
+    service = EmbeddingService()
+    user_ids, user_vectors, _ = service.scroll_embeddings(
+        settings.lightgcn_users_collection, key_field="user_id"
+    )
+    game_slugs, game_vectors, game_idx = service.scroll_embeddings(
+        settings.lightgcn_games_collection, key_field="game_slug", index_field="game_idx"
+    )
+    
+    version = publish_snapshot(
+        "lightgcn",
+        user_ids,
+        user_vectors,
+        game_slugs,
+        game_vectors,
+        game_idx=np.asarray(game_idx),
+        metric="cosine",
+        dtype=args.dtype,
+        root=args.root
+    )
+    print(f"version={version}  users={len(user_ids)}  games={len(game_slugs)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""Train a model end to end: build its graph, train, save and publish.
+
+These are the pipelines behind /v1/train, /v1/tgn/train and /v1/hgt/train.
+The API runs them as jobs in a separate process (see
+app.services.job_registry) and, when they finish, loads the saved
+checkpoint with the returned graph for serving. Each pipeline returns a
+result dict with "stats" plus the state the API needs to load the model.
+
+Run a pipeline directly:
+    python -m app.jobs.train lightgcn|tgn|hgt [--lookback-days 30]
+        [--epochs 100] [--batch-size N]
+"""
+
+import argparse
+from typing import Optional
+
+import structlog
+
+from app.config import get_settings
+from app.jobs.precompute_topn import precompute_hgt, precompute_lightgcn
+from app.jobs.publish_snapshot import publish_lightgcn
+from app.models.hgt import NodeType
+from app.services.embedding_service import EmbeddingService
+from app.services.graph_store import IncrementalGraphStore
+from app.services.hgt_builder import HeteroGraphBuilder
+from app.services.hgt_trainer import HGTTrainer
+from app.services.job_registry import JobContext
+from app.services.tgn_trainer import TGNTrainer, TemporalGraphBuilder
+from app.services.trainer import LightGCNTrainer
+
+logger = structlog.get_logger()
+
+
+def _precompute_topn(context: JobContext, build, *args):
+    """Rebuild a precomputed top-N table; failures don't fail the job."""
+    context.stage("precomputing_topn")
+    try:
+        build(*args)
+    except Exception as e:
+        logger.error("Failed to precompute top-N table", error=str(e))
+
+
+def train_lightgcn(params: dict, context: JobContext) -> dict:
+    """Refresh the interaction graph, train LightGCN and publish embeddings.
+    
+    Args:
+        params: lookback_days, num_epochs, batch_size, force_rebuild,
+            train_mode (see TrainRequest)
+        context: Job context
+        
+    Returns:
+        Result with stats and the trained graph ("graph_data")
+    """
+    context.stage("building_graph")
+    
+    # Build graph (incrementally, unless a full rebuild is forced)
+    graph_store = IncrementalGraphStore()
+    try:
+        graph_data = graph_store.refresh(
+            lookback_days=params["lookback_days"],
+            full=params["force_rebuild"]
+        )
+    finally:
+        graph_store.close()
+    
+    if graph_data.num_users == 0 or graph_data.num_games == 0:
+        raise ValueError("No interaction data found to build graph")
+    
+    trainer = LightGCNTrainer(graph_data)
+    
+    # Try to load existing model for incremental training
+    if not params["force_rebuild"]:
+        trainer.load_model()
+    
+    context.stage("training", num_epochs=params["num_epochs"])
+    train_stats = trainer.train(
+        num_epochs=params["num_epochs"],
+        batch_size=params["batch_size"],
+        train_mode=params.get("train_mode"),
+        on_epoch=context.on_epoch
+    )
+    inference = trainer.get_inference()
+    trainer.save_model(inference=inference)
+    
+    # Store embeddings in Qdrant
+    context.stage("publishing")
+    embedding_service = EmbeddingService()
+    embedding_service.init_collections()
+    embedding_service.store_all_embeddings(inference, graph_data)
+    
+    # Serving workers map the snapshot and swap to it
+    if get_settings().serving_source == "snapshot":
+        context.stage("publishing_snapshot")
+        publish_lightgcn(inference, graph_data)
+    
+    if get_settings().topn_after_train:
+        _precompute_topn(context, precompute_lightgcn, inference, graph_data)
+    
+    return {
+        "stats": {
+            "num_users": graph_data.num_users,
+            "num_games": graph_data.num_games,
+            "num_edges": graph_data.num_edges,
+            "final_loss": train_stats["final_loss"],
+            "num_epochs": train_stats["num_epochs"]
+        },
+        "graph_data": graph_data
+    }
+
+
+def train_tgn(params: dict, context: JobContext) -> dict:
+    """Build temporal edges and train TGN.
+    
+    Args:
+        params: lookback_days, num_epochs, batch_size (see TGNTrainRequest)
+        context: Job context
+        
+    Returns:
+        Result with stats; the model is served from the saved artifact
+    """
+    context.stage("building_graph")
+    
+    builder = TemporalGraphBuilder()
+    try:
+        edges, user_id_to_idx, game_slug_to_idx = builder.build_temporal_edges(
+            lookback_days=params["lookback_days"]
+        )
+    finally:
+        builder.close()
+    
+    if not edges:
+        raise ValueError("No temporal edges found")
+    
+    num_users = len(user_id_to_idx)
+    num_items = len(game_slug_to_idx)
+    trainer = TGNTrainer(num_users, num_items)
+    
+    context.stage("training", num_epochs=params["num_epochs"])
+    train_stats = trainer.train(
+        edges=edges,
+        num_epochs=params["num_epochs"],
+        batch_size=params["batch_size"],
+        on_epoch=context.on_epoch
+    )
+    trainer.save_model(user_id_to_idx=user_id_to_idx, game_slug_to_idx=game_slug_to_idx, edges=edges)
+    
+    return {
+        "stats": {
+            "num_users": num_users,
+            "num_games": num_items,
+            "num_edges": len(edges),
+            "final_loss": train_stats["final_loss"],
+            "num_epochs": train_stats["num_epochs"]
+        }
+    }
+
+
+def train_hgt(params: dict, context: JobContext) -> dict:
+    """Build the heterogeneous graph, train HGT and publish embeddings.
+    
+    Args:
+        params: lookback_days, num_epochs, batch_size, cms_url (see
+            HGTTrainRequest)
+        context: Job context
+        
+    Returns:
+        Result with stats and the trained graph ("graph")
+    """
+    context.stage("building_graph")
+    
+    builder = HeteroGraphBuilder(cms_url=params.get("cms_url"))
+    try:
+        graph = builder.build_graph(lookback_days=params["lookback_days"])
+    finally:
+        builder.close()
+    
+    num_users = graph.num_nodes.get(NodeType.USER, 0)
+    num_games = graph.num_nodes.get(NodeType.GAME, 0)
+    
+    if num_users == 0 or num_games == 0:
+        raise ValueError(f"Insufficient data: {num_users} users, {num_games} games")
+    
+    trainer = HGTTrainer(graph)
+    
+    context.stage("training", num_epochs=params["num_epochs"])
+    stats = trainer.train(
+        num_epochs=params["num_epochs"],
+        batch_size=params["batch_size"],
+        on_epoch=context.on_epoch
+    )
+    inference = trainer.get_inference()
+    inference.compute_embeddings()
+    trainer.save_model(inference=inference)
+    
+    # Store embeddings in Qdrant
+    context.stage("publishing")
+    user_embs = inference.embeddings.get(NodeType.USER)
+    game_embs = inference.embeddings.get(NodeType.GAME)
+    
+    EmbeddingService().store_hgt_embeddings(
+        user_embs.cpu().numpy() if user_embs is not None else None,
+        graph.user_id_to_idx,
+        game_embs.cpu().numpy() if game_embs is not None else None,
+        graph.game_slug_to_idx
+    )
+    
+    if get_settings().topn_after_train:
+        _precompute_topn(context, precompute_hgt, inference)
+    
+    return {
+        "stats": {
+            "final_loss": stats["final_loss"],
+            "best_loss": stats["best_loss"],
+            "num_epochs": stats["num_epochs"],
+            "num_users": num_users,
+            "num_games": num_games,
+            "num_providers": graph.num_nodes.get(NodeType.PROVIDER, 0),
+            "num_promotions": graph.num_nodes.get(NodeType.PROMOTION, 0),
+            "num_edge_types": len(graph.edge_index)
+        },
+        "graph": graph
+    }
+
+
+PIPELINES = {
+    "lightgcn": train_lightgcn,
+    "tgn": train_tgn,
+    "hgt": train_hgt
+}
+
+
+def main(argv: Optional[list[str]] = None):
+    """Run a training pipeline in this process."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("model", choices=list(PIPELINES))
+    parser.add_argument("--lookback-days", type=int, default=30)
+    parser.add_argument("--epochs", type=int, default=None, help="Training epochs (default: config)")
+    parser.add_argument("--batch-size", type=int, default=None, help="Batch size (default: trainer's)")
+    parser.add_argument("--force-rebuild", action="store_true", help="LightGCN: rebuild the graph and start fresh")
+    args = parser.parse_args(argv)
+    
+    params = {
+        "lookback_days": args.lookback_days,
+        "num_epochs": args.epochs or get_settings().num_epochs,
+        "batch_size": args.batch_size,
+        "force_rebuild": args.force_rebuild
+    }
+    
+    result = PIPELINES[args.model](params, JobContext())
+    print("  ".join(f"{key}={value}" for key, value in result["stats"].items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@
 Provides LightGCN-based collaborative filtering recommendations.
 """
 
+import asyncio
 import structlog
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
@@ -10,7 +11,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from prometheus_fastapi_instrumentator import Instrumentator
 
 from app.config import get_settings
-from app.api.routes import router
+from app.api.routes import router, get_job_registry, get_session_service, warm_start
 from app.services.embedding_service import EmbeddingService
 
 # Configure structured logging
@@ -51,9 +52,15 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning("Failed to initialize Qdrant collections", error=str(e))
     
+    # Restore saved models in the background; /v1/ready flips when done
+    if settings.warm_start:
+        app.state.warm_start = asyncio.create_task(asyncio.to_thread(warm_start))
+    
     yield
     
     logger.info("Shutting down Casino ML Service")
+    get_job_registry().shutdown()
+    get_session_service().close()
 
 
 # Create FastAPI app
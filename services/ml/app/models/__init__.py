@@ -1,16 +1,17 @@
 """ML models for recommendation."""
 
-from app.models.lightgcn import LightGCN, LightGCNConv, LightGCNInference
+from app.models.lightgcn import LightGCN, LightGCNConv, LightGCNInference, build_norm_adj
 from app.models.tgn import TGN, TGNInference, TimeEncoder, MemoryModule, TemporalAttention
 from app.models.hgt import (
     HGT, HGTConv, HGTInference, HeteroGraphData,
     NodeType, EdgeType, HeteroEdge
 )
+from app.models.scoring import PlayedItems
 
 __all__ = [
-    "LightGCN", "LightGCNConv", "LightGCNInference",
+    "LightGCN", "LightGCNConv", "LightGCNInference", "build_norm_adj",
     "TGN", "TGNInference", "TimeEncoder", "MemoryModule", "TemporalAttention",
     "HGT", "HGTConv", "HGTInference", "HeteroGraphData",
-    "NodeType", "EdgeType", "HeteroEdge"
+    "NodeType", "EdgeType", "HeteroEdge", "PlayedItems"
 ]
 
@@ -19,6 +19,8 @@ import torch
 import torch.nn as nn
 import torch.nn.functional as F
 
+from app.models import scoring
+
 
 class NodeType(Enum):
     """Types of nodes in the heterogeneous graph."""
@@ -495,6 +497,30 @@ class HGTInference:
         
         # Cached embeddings
         self.embeddings: Optional[Dict[NodeType, torch.Tensor]] = None
+        
+        # Games each user played or rated, built on first use
+        self._played: Optional[scoring.PlayedItems] = None
+    
+    @property
+    def played(self) -> scoring.PlayedItems:
+        """Games each user played or rated in the graph."""
+        if self._played is None:
+            users = [torch.zeros(0, dtype=torch.long)]
+            games = [torch.zeros(0, dtype=torch.long)]
+            for edge_type in [EdgeType.PLAYED, EdgeType.RATED]:
+                key = (NodeType.USER, edge_type, NodeType.GAME)
+                if key in self.graph_data.edge_index:
+                    edge_index = self.graph_data.edge_index[key].cpu()
+                    users.append(edge_index[0])
+                    games.append(edge_index[1])
+            
+            self._played = scoring.PlayedItems(
+                torch.cat(users).numpy(),
+                torch.cat(games).numpy(),
+                self.graph_data.num_nodes.get(NodeType.USER, 0),
+                self.graph_data.num_nodes.get(NodeType.GAME, 0)
+            )
+        return self._played
     
     def compute_embeddings(self):
         """Compute and cache all embeddings."""
@@ -548,7 +574,8 @@ class HGTInference:
         user_id: str,
         top_k: int = 10,
         exclude_games: Optional[Set[str]] = None,
-        provider_filter: Optional[str] = None
+        provider_filter: Optional[str] = None,
+        exclude_played: bool = False
     ) -> List[Tuple[str, float]]:
         """Get recommendations for a user.
         
@@ -557,6 +584,7 @@ class HGTInference:
             top_k: Number of recommendations
             exclude_games: Games to exclude
             provider_filter: Optional provider to filter by
+            exclude_played: Also exclude games the user played or rated
             
         Returns:
             List of (game_slug, score) tuples
@@ -576,21 +604,103 @@ class HGTInference:
         # Compute scores
         scores = torch.matmul(game_embs, user_emb)
         
-        # Apply exclusions
+        # Apply exclusions and get top-K
+        exclude = None
         if exclude_games:
-            for game_slug in exclude_games:
-                game_idx = self.graph_data.game_slug_to_idx.get(game_slug)
-                if game_idx is not None:
-                    scores[game_idx] = float('-inf')
+            exclude = scoring.exclude_index(
+                scoring.slugs_to_indices(exclude_games, self.graph_data.game_slug_to_idx),
+                len(scores)
+            )
         
-        # Get top-K
-        top_scores, top_indices = torch.topk(scores, min(top_k, len(scores)))
+        top = scoring.top_k(
+            scores,
+            top_k,
+            exclude,
+            self.played.items(user_idx) if exclude_played else None
+        )
         
-        results = []
-        for idx, score in zip(top_indices, top_scores):
-            game_slug = self.graph_data.idx_to_game_slug.get(idx.item())
-            if game_slug:
-                results.append((game_slug, score.item()))
+        idx_to_game_slug = self.graph_data.idx_to_game_slug
+        return [
+            (idx_to_game_slug[idx], score)
+            for idx, score in top
+            if idx in idx_to_game_slug
+        ]
+    
+    def get_recommendations_batch(
+        self,
+        user_ids: List[str],
+        top_k: int = 10,
+        exclude_games: Optional[List[Optional[Set[str]]]] = None,
+        exclude_played: bool = False
+    ) -> List[List[Tuple[str, float]]]:
+        """Get recommendations for many users at once.
+        
+        Known users are scored with a single [batch, dim] x [dim, num_games]
+        matmul; cold-start users share the cold-start ranking.
+        
+        Args:
+            user_ids: User IDs
+            top_k: Number of recommendations per user
+            exclude_games: Games to exclude, per user
+            exclude_played: Also exclude games each user played or rated
+            
+        Returns:
+            List of (game_slug, score) tuples per user
+        """
+        if self.embeddings is None:
+            self.compute_embeddings()
+        
+        results: List[List[Tuple[str, float]]] = [[] for _ in user_ids]
+        exclude_games = exclude_games or [None] * len(user_ids)
+        
+        rows, user_indices, cold_rows = [], [], []
+        for row, user_id in enumerate(user_ids):
+            user_idx = self.graph_data.user_id_to_idx.get(user_id)
+            if user_idx is None:
+                cold_rows.append(row)
+            else:
+                rows.append(row)
+                user_indices.append(user_idx)
+        
+        if cold_rows:
+            cold_start = self._cold_start_recommendations(user_ids[cold_rows[0]], top_k)
+            for row in cold_rows:
+                results[row] = list(cold_start)
+        
+        if not rows:
+            return results
+        
+        user_embs = self.embeddings[NodeType.USER][user_indices]
+        game_embs = self.embeddings[NodeType.GAME]
+        
+        # Compute scores
+        scores = torch.matmul(user_embs, game_embs.t())
+        
+        # Apply exclusions and get top-K
+        game_slug_to_idx = self.graph_data.game_slug_to_idx
+        exclude = scoring.exclude_coords(
+            [
+                scoring.slugs_to_indices(exclude_games[row], game_slug_to_idx)
+                if exclude_games[row] else None
+                for row in rows
+            ],
+            scores.shape[1]
+        )
+        
+        top = scoring.top_k_batch(
+            scores,
+            top_k,
+            exclude,
+            self.played.coords(user_indices) if exclude_played else None
+        )
+        
+        idx_to_game_slug = self.graph_data.idx_to_game_slug
+        for row, recs in zip(rows, top):
+            results[row] = [
+                (idx_to_game_slug[idx], score)
+                for idx, score in recs
+                if idx in idx_to_game_slug
+            ]
         
         return results
     
@@ -15,6 +15,43 @@ from torch_geometric.nn.conv import MessagePassing
 from torch_geometric.utils import degree
 from typing import Optional, Tuple
 
+from app.models import scoring
+
+
+def build_norm_adj(
+    edge_index: torch.Tensor,
+    num_nodes: int,
+    edge_weight: Optional[torch.Tensor] = None
+) -> torch.Tensor:
+    """Build the symmetric-normalized weighted adjacency used by LightGCNConv.
+    
+    A[i, j] = w_ji / (√|N_i|√|N_j|) for each edge j -> i, so one layer of
+    propagation is a single sparse-dense matmul A @ x.
+    
+    Args:
+        edge_index: Edge indices [2, num_edges]
+        num_nodes: Total number of nodes
+        edge_weight: Optional edge weights [num_edges]
+        
+    Returns:
+        Sparse CSR tensor [num_nodes, num_nodes]
+    """
+    row, col = edge_index
+    deg = degree(col, num_nodes, dtype=torch.float32)
+    deg_inv_sqrt = deg.pow(-0.5)
+    deg_inv_sqrt[deg_inv_sqrt == float('inf')] = 0
+    norm = deg_inv_sqrt[row] * deg_inv_sqrt[col]
+    
+    if edge_weight is not None:
+        norm = norm * edge_weight
+    
+    adj = torch.sparse_coo_tensor(
+        torch.stack([col, row]),
+        norm,
+        (num_nodes, num_nodes)
+    ).coalesce()
+    return adj.to_sparse_csr()
+
 
 class LightGCNConv(MessagePassing):
     """Light Graph Convolution layer.
@@ -30,7 +67,8 @@ class LightGCNConv(MessagePassing):
         self,
         x: torch.Tensor,
         edge_index: torch.Tensor,
-        edge_weight: Optional[torch.Tensor] = None
+        edge_weight: Optional[torch.Tensor] = None,
+        adj: Optional[torch.Tensor] = None
     ) -> torch.Tensor:
         """Forward pass for LightGCN convolution.
         
@@ -38,10 +76,15 @@ class LightGCNConv(MessagePassing):
             x: Node embeddings [num_nodes, embedding_dim]
             edge_index: Edge indices [2, num_edges]
             edge_weight: Optional edge weights [num_edges]
+            adj: Optional precomputed adjacency from build_norm_adj; when
+                given, edge_index and edge_weight are ignored
             
         Returns:
             Updated node embeddings [num_nodes, embedding_dim]
         """
+        if adj is not None:
+            return torch.sparse.mm(adj, x)
+        
         # Compute normalization coefficients
         row, col = edge_index
         deg = degree(col, x.size(0), dtype=x.dtype)
@@ -109,7 +152,8 @@ class LightGCN(nn.Module):
     def forward(
         self,
         edge_index: torch.Tensor,
-        edge_weight: Optional[torch.Tensor] = None
+        edge_weight: Optional[torch.Tensor] = None,
+        adj: Optional[torch.Tensor] = None
     ) -> Tuple[torch.Tensor, torch.Tensor]:
         """Forward pass to compute all user and item embeddings.
         
@@ -118,6 +162,7 @@ class LightGCN(nn.Module):
                         Row 0: user indices (0 to num_users-1)
                         Row 1: item indices (num_users to num_users+num_items-1)
             edge_weight: Optional edge weights [num_edges]
+            adj: Optional precomputed normalized adjacency (see build_norm_adj)
             
         Returns:
             Tuple of (user_embeddings, item_embeddings)
@@ -133,7 +178,7 @@ class LightGCN(nn.Module):
         
         # Apply K layers of LightGCN convolution
         for _ in range(self.num_layers):
-            x = self.conv(x, edge_index, edge_weight)
+            x = self.conv(x, edge_index, edge_weight, adj)
             all_embeddings.append(x)
         
         # Average embeddings across all layers
@@ -269,17 +314,23 @@ class LightGCNInference:
         self.device = device
         self.user_embeddings: Optional[torch.Tensor] = None
         self.item_embeddings: Optional[torch.Tensor] = None
+        
+        # Items each user interacted with in the embedded graph
+        self.played: Optional[scoring.PlayedItems] = None
     
     def compute_embeddings(
         self,
         edge_index: torch.Tensor,
-        edge_weight: Optional[torch.Tensor] = None
+        edge_weight: Optional[torch.Tensor] = None,
+        adj: Optional[torch.Tensor] = None
     ):
         """Compute and cache all embeddings.
         
         Args:
             edge_index: Bipartite edge indices
             edge_weight: Optional edge weights
+            adj: Optional precomputed normalized adjacency; built from
+                edge_index / edge_weight when omitted
         """
         self.model.eval()
         with torch.no_grad():
@@ -287,9 +338,20 @@ class LightGCNInference:
             if edge_weight is not None:
                 edge_weight = edge_weight.to(self.device)
             
+            if adj is None:
+                adj = build_norm_adj(
+                    edge_index,
+                    self.model.num_users + self.model.num_items,
+                    edge_weight
+                )
+            
             self.user_embeddings, self.item_embeddings = self.model(
-                edge_index, edge_weight
+                edge_index, edge_weight, adj.to(self.device)
             )
+        
+        self.played = scoring.PlayedItems.from_bipartite(
+            edge_index, self.model.num_users, self.model.num_items
+        )
     
     def get_user_embedding(self, user_idx: int) -> torch.Tensor:
         """Get cached user embedding."""
@@ -319,14 +381,16 @@ class LightGCNInference:
         self,
         user_idx: int,
         exclude_items: Optional[set] = None,
-        top_k: int = 10
+        top_k: int = 10,
+        exclude_played: bool = False
     ) -> list[Tuple[int, float]]:
         """Generate top-K recommendations for a user.
         
         Args:
             user_idx: User index
-            exclude_items: Set of item indices to exclude (e.g., already interacted)
+            exclude_items: Set of item indices to exclude
             top_k: Number of recommendations to return
+            exclude_played: Also exclude items the user interacted with
             
         Returns:
             List of (item_idx, score) tuples, sorted by score descending
@@ -339,16 +403,46 @@ class LightGCNInference:
         # Compute scores for all items
         scores = torch.matmul(self.item_embeddings, user_emb)
         
-        # Mask excluded items
-        if exclude_items:
-            for item_idx in exclude_items:
-                scores[item_idx] = float('-inf')
+        return scoring.top_k(
+            scores,
+            top_k,
+            scoring.exclude_index(exclude_items, len(scores)),
+            self.played.items(user_idx) if exclude_played and self.played else None
+        )
+    
+    def recommend_batch(
+        self,
+        user_indices: list[int],
+        exclude_items: Optional[list[Optional[set]]] = None,
+        top_k: int = 10,
+        exclude_played: bool = False
+    ) -> list[list[Tuple[int, float]]]:
+        """Generate top-K recommendations for many users at once.
+        
+        Scores all users with a single [batch, dim] x [dim, num_items] matmul.
+        
+        Args:
+            user_indices: User indices
+            exclude_items: Item indices to exclude, per user
+            top_k: Number of recommendations per user
+            exclude_played: Also exclude items each user interacted with
+            
+        Returns:
+            List of (item_idx, score) tuples per user, sorted by score descending
+        """
+        if self.user_embeddings is None or self.item_embeddings is None:
+            raise RuntimeError("Call compute_embeddings first")
+        
+        if not user_indices:
+            return []
         
-        # Get top-K
-        top_scores, top_indices = torch.topk(scores, min(top_k, len(scores)))
+        users = torch.as_tensor(user_indices, dtype=torch.long, device=self.user_embeddings.device)
+        scores = torch.matmul(self.user_embeddings[users], self.item_embeddings.t())
         
-        return [
-            (idx.item(), score.item())
-            for idx, score in zip(top_indices, top_scores)
-        ]
+        return scoring.top_k_batch(
+            scores,
+            top_k,
+            scoring.exclude_coords(exclude_items, scores.shape[1]),
+            self.played.coords(user_indices) if exclude_played and self.played else None
+        )
 
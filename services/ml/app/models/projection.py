@@ -0,0 +1,44 @@
+"""Fixed projection of compact embeddings to a larger published size.
+
+Models train at a compact dimension; a consumer that needs fixed-size
+vectors (e.g. 768) gets them through a seeded matrix with orthonormal rows.
+Since P @ P.T = I, dot products, norms and cosine similarities are exactly
+those of the compact vectors, so rankings don't change, only storage size.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+PROJECTION_SEED = 20240101
+
+
+@lru_cache(maxsize=8)
+def projection_matrix(in_dim: int, out_dim: int, seed: int = PROJECTION_SEED) -> np.ndarray:
+    """Seeded [in_dim, out_dim] matrix with orthonormal rows.
+    
+    The same (in_dim, out_dim, seed) always yields the same matrix, so
+    vectors published by different runs or processes stay comparable.
+    """
+    if out_dim < in_dim:
+        raise ValueError(f"Cannot project {in_dim}-dim embeddings down to {out_dim}")
+    
+    gaussian = np.random.default_rng(seed).standard_normal((out_dim, in_dim))
+    q, r = np.linalg.qr(gaussian)
+    # Fix the QR sign ambiguity so the result is unique
+    q *= np.sign(np.diag(r))
+    matrix = np.ascontiguousarray(q.T, dtype=np.float32)
+    matrix.setflags(write=False)
+    return matrix
+
+
+def project(vectors: np.ndarray, out_dim: int) -> np.ndarray:
+    """Project embeddings [n, dim] (or one vector) to out_dim.
+    
+    Vectors that already have out_dim components are returned as is.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    in_dim = vectors.shape[-1]
+    if out_dim == in_dim:
+        return vectors
+    return vectors @ projection_matrix(in_dim, out_dim)
@@ -0,0 +1,116 @@
+"""Quantized embedding matrices for in-process scoring.
+
+Rows are stored as float32, float16 or int8. int8 rows are quantized
+symmetrically with one scale per row (max |x| / 127), so a row is recovered
+as int8 * scale. Scoring dequantizes one cache-sized block of rows at a
+time into a reused float32 buffer and multiplies it with BLAS, so memory
+stays at the quantized size, no half/integer matmul is run, and a single
+query reads a quarter (int8) or half (float16) of the float32 bytes.
+"""
+
+from typing import Optional
+
+import numpy as np
+import torch
+
+DTYPES = ("float32", "float16", "int8")
+
+
+class QuantizedMatrix:
+    """Row-major embedding matrix with optional per-row int8 scales."""
+    
+    # Rows dequantized per matmul block (512 x 768 float32 = 1.5 MB, stays in cache)
+    BLOCK_ROWS = 512
+    
+    def __init__(self, data: np.ndarray, scales: Optional[np.ndarray] = None):
+        """Initialize matrix.
+        
+        Args:
+            data: Stored rows [num_rows, dim] (float32, float16 or int8)
+            scales: Per-row scales [num_rows], required for int8
+        """
+        if data.dtype == np.int8 and scales is None:
+            raise ValueError("int8 rows need per-row scales")
+        
+        self.data = np.ascontiguousarray(data)
+        self.scales = None if scales is None else np.asarray(scales, dtype=np.float32)
+    
+    @classmethod
+    def quantize(cls, vectors: np.ndarray, dtype: str = "float32") -> "QuantizedMatrix":
+        """Quantize float vectors.
+        
+        Args:
+            vectors: Float vectors [num_rows, dim]
+            dtype: "float32", "float16" or "int8"
+        """
+        if dtype not in DTYPES:
+            raise ValueError(f"Unknown embedding dtype: {dtype}")
+        
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if dtype != "int8":
+            return cls(vectors.astype(dtype, copy=False))
+        
+        scales = np.abs(vectors).max(axis=1) / 127.0 if len(vectors) else np.zeros(0, np.float32)
+        scales = np.where(scales > 0, scales, 1.0).astype(np.float32)
+        data = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return cls(data, scales)
+    
+    @property
+    def dtype(self) -> str:
+        return self.data.dtype.name
+    
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.data.shape
+    
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+    
+    def __len__(self) -> int:
+        return len(self.data)
+    
+    def rows(self, index) -> np.ndarray:
+        """Dequantize selected rows to float32."""
+        rows = self.data[index].astype(np.float32)
+        if self.scales is not None:
+            rows *= self.scales[index][..., None]
+        return rows
+    
+    def dequantize(self) -> np.ndarray:
+        """Dequantize the whole matrix to float32."""
+        return self.rows(slice(None))
+    
+    def matmul_t(self, queries: np.ndarray) -> np.ndarray:
+        """Score queries against every row: queries @ matrix.T.
+        
+        Args:
+            queries: Float queries [batch, dim]
+            
+        Returns:
+            float32 scores [batch, num_rows]
+        """
+        queries = np.ascontiguousarray(queries, dtype=np.float32)
+        if self.data.dtype == np.float32:
+            return queries @ self.data.T
+        
+        num_rows = len(self.data)
+        scores = np.empty((len(queries), num_rows), dtype=np.float32)
+        
+        # torch converts half/int8 blocks with SIMD, numpy does not
+        data = torch.from_numpy(self.data)
+        query_tensor = torch.from_numpy(queries)
+        score_tensor = torch.from_numpy(scores)
+        block = torch.empty((min(self.BLOCK_ROWS, num_rows), self.data.shape[1]), dtype=torch.float32)
+        
+        for start in range(0, num_rows, self.BLOCK_ROWS):
+            end = min(start + self.BLOCK_ROWS, num_rows)
+            rows = block[:end - start]
+            rows.copy_(data[start:end])
+            torch.matmul(query_tensor, rows.T, out=score_tensor[:, start:end])
+        
+        # Per-row scales factor out of the dot product
+        if self.scales is not None:
+            scores *= self.scales
+        
+        return scores
@@ -0,0 +1,238 @@
+"""Shared top-K scoring for the recommendation models.
+
+Exclusions are converted to index tensors once and applied to the score
+vector (or matrix) with a single index_fill_ / index_put_, instead of
+writing -inf one item at a time. Items a user already interacted with come
+from a PlayedItems CSR index built once per graph, so callers don't have
+to send them.
+"""
+
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import torch
+
+NEG_INF = float('-inf')
+
+# (rows, cols) of the cells to mask in a [batch, num_items] score matrix
+Coords = Tuple[torch.Tensor, torch.Tensor]
+
+
+def slugs_to_indices(slugs: Iterable[str], slug_to_idx: Dict[str, int]) -> List[int]:
+    """Map slugs to indices, dropping unknown ones."""
+    return [idx for idx in map(slug_to_idx.get, slugs) if idx is not None]
+
+
+def exclude_index(
+    items: Optional[Iterable[int]],
+    num_items: int,
+    device: Optional[torch.device] = None
+) -> Optional[torch.Tensor]:
+    """Convert item indices to an index tensor, dropping out-of-range ones.
+    
+    Returns:
+        Long tensor of item indices, or None if nothing is excluded
+    """
+    if not items:
+        return None
+    
+    index = torch.as_tensor(np.fromiter(items, dtype=np.int64), device=device)
+    index = index[(index >= 0) & (index < num_items)]
+    return index if len(index) else None
+
+
+def exclude_coords(
+    exclude_items: Optional[Sequence[Optional[Iterable[int]]]],
+    num_items: int,
+    device: Optional[torch.device] = None
+) -> Optional[Coords]:
+    """Convert per-row item indices to score matrix coordinates.
+    
+    Args:
+        exclude_items: Item indices to exclude, per row
+        num_items: Number of score columns
+        device: Device of the score matrix
+        
+    Returns:
+        (rows, cols) tensors, or None if nothing is excluded
+    """
+    if not exclude_items or not any(exclude_items):
+        return None
+    
+    exclude_items = [list(items) if items else [] for items in exclude_items]
+    lengths = np.fromiter(map(len, exclude_items), dtype=np.int64, count=len(exclude_items))
+    cols = np.fromiter(chain.from_iterable(exclude_items), dtype=np.int64, count=int(lengths.sum()))
+    rows = np.repeat(np.arange(len(exclude_items)), lengths)
+    
+    valid = (cols >= 0) & (cols < num_items)
+    if not valid.any():
+        return None
+    return (
+        torch.as_tensor(rows[valid], device=device),
+        torch.as_tensor(cols[valid], device=device)
+    )
+
+
+class PlayedItems:
+    """Items each user has interacted with, as a CSR index.
+    
+    Built once per graph; looking up a user's items is a slice, and the
+    coordinates of a whole batch are gathered without a Python loop.
+    """
+    
+    def __init__(
+        self,
+        users: np.ndarray,
+        items: np.ndarray,
+        num_users: int,
+        num_items: int
+    ):
+        """Initialize index.
+        
+        Args:
+            users: User index of each interaction
+            items: Item index of each interaction
+            num_users: Total number of users
+            num_items: Total number of items
+        """
+        self.num_users = num_users
+        self.num_items = num_items
+        
+        # Deduplicated (user, item) pairs, sorted by user
+        keys = np.unique(np.asarray(users, dtype=np.int64) * num_items + np.asarray(items, dtype=np.int64))
+        counts = np.bincount(keys // max(num_items, 1), minlength=num_users)
+        
+        self.indptr = torch.from_numpy(np.concatenate([[0], np.cumsum(counts)]))
+        self.indices = torch.from_numpy(keys % max(num_items, 1))
+    
+    @classmethod
+    def from_bipartite(
+        cls,
+        edge_index: torch.Tensor,
+        num_users: int,
+        num_items: int
+    ) -> "PlayedItems":
+        """Build from bipartite edges (users first, then items offset by num_users)."""
+        edge_index = edge_index.cpu()
+        user_to_item = edge_index[0] < num_users
+        
+        return cls(
+            edge_index[0, user_to_item].numpy(),
+            edge_index[1, user_to_item].numpy() - num_users,
+            num_users,
+            num_items
+        )
+    
+    @classmethod
+    def from_csr(
+        cls,
+        indptr: torch.Tensor,
+        indices: torch.Tensor,
+        num_users: int,
+        num_items: int
+    ) -> "PlayedItems":
+        """Wrap an existing CSR index (e.g. one saved with a model) without copying it."""
+        played = cls.__new__(cls)
+        played.num_users = num_users
+        played.num_items = num_items
+        played.indptr = indptr
+        played.indices = indices
+        return played
+    
+    def __len__(self) -> int:
+        return len(self.indices)
+    
+    def items(self, user_idx: int) -> torch.Tensor:
+        """Item indices a user interacted with."""
+        if not 0 <= user_idx < self.num_users:
+            return self.indices[:0]
+        return self.indices[self.indptr[user_idx]:self.indptr[user_idx + 1]]
+    
+    def coords(self, user_indices: Sequence[int]) -> Optional[Coords]:
+        """Score matrix coordinates of the items of a batch of users.
+        
+        Args:
+            user_indices: User index of each score row
+            
+        Returns:
+            (rows, cols) tensors, or None if the users have no items
+        """
+        if self.num_users == 0:
+            return None
+        
+        users = torch.as_tensor(user_indices, dtype=torch.long)
+        in_range = (users >= 0) & (users < self.num_users)
+        users = users.clamp(0, self.num_users - 1)
+        
+        starts = self.indptr[users]
+        lengths = torch.where(in_range, self.indptr[users + 1] - starts, 0)
+        total = int(lengths.sum())
+        if total == 0:
+            return None
+        
+        # Position of each output element within its user's CSR row
+        rows = torch.repeat_interleave(torch.arange(len(users)), lengths)
+        offsets = torch.arange(total) - torch.repeat_interleave(torch.cumsum(lengths, 0) - lengths, lengths)
+        
+        return rows, self.indices[starts[rows] + offsets]
+
+
+def top_k(
+    scores: torch.Tensor,
+    k: int,
+    *exclude: Optional[torch.Tensor]
+) -> List[Tuple[int, float]]:
+    """Top-K of a score vector after masking excluded items.
+    
+    Args:
+        scores: Scores [num_items] (modified in place)
+        k: Number of results
+        *exclude: Item index tensors to exclude
+        
+    Returns:
+        List of (item_idx, score) tuples, best first, excluded items dropped
+    """
+    for index in exclude:
+        if index is not None:
+            scores.index_fill_(0, index.to(scores.device), NEG_INF)
+    
+    top_scores, top_indices = torch.topk(scores, min(k, len(scores)))
+    
+    return [
+        (idx, score)
+        for idx, score in zip(top_indices.tolist(), top_scores.tolist())
+        if score != NEG_INF
+    ]
+
+
+def top_k_batch(
+    scores: torch.Tensor,
+    k: int,
+    *exclude: Optional[Coords]
+) -> List[List[Tuple[int, float]]]:
+    """Row-wise top-K of a score matrix after masking excluded cells.
+    
+    Args:
+        scores: Scores [batch, num_items] (modified in place)
+        k: Number of results per row
+        *exclude: (rows, cols) coordinates to exclude
+        
+    Returns:
+        List of (item_idx, score) tuples per row, best first, excluded
+        items dropped
+    """
+    for coords in exclude:
+        if coords is not None:
+            rows, cols = coords
+            scores.index_put_(
+                (rows.to(scores.device), cols.to(scores.device)),
+                torch.tensor(NEG_INF, dtype=scores.dtype, device=scores.device)
+            )
+    
+    top_scores, top_indices = torch.topk(scores, min(k, scores.shape[1]), dim=1)
+    
+    return [
+        [(idx, score) for idx, score in zip(indices, row_scores) if score != NEG_INF]
+        for indices, row_scores in zip(top_indices.tolist(), top_scores.tolist())
+    ]
@@ -19,6 +19,8 @@ import torch.nn as nn
 import torch.nn.functional as F
 import numpy as np
 
+from app.models import scoring
+
 
 @dataclass
 class TemporalInteraction:
@@ -81,6 +83,69 @@ class TimeEncoder(nn.Module):
         return torch.cat([sin_enc, cos_enc], dim=-1)
 
 
+MEMORY_AGGREGATIONS = ("sequential", "last", "mean")
+
+
+def user_ranks(
+    user_indices: torch.Tensor,
+    timestamps: Optional[torch.Tensor] = None
+) -> torch.Tensor:
+    """Rank of each event among the same user's events in a batch.
+    
+    Args:
+        user_indices: User index of each event [batch_size]
+        timestamps: Event timestamps [batch_size]; batch order breaks ties
+            (and is used alone if omitted)
+        
+    Returns:
+        Long tensor [batch_size], 0 for each user's earliest event
+    """
+    positions = torch.arange(len(user_indices), device=user_indices.device)
+    if len(user_indices) < 2:
+        return torch.zeros_like(positions)
+    
+    # Offset of each event into its user's run of the events sorted by
+    # (user, time, position); both sorts are stable
+    order = positions
+    if timestamps is not None:
+        order = torch.sort(timestamps, stable=True).indices
+    order = order[torch.sort(user_indices[order], stable=True).indices]
+    sorted_users = user_indices[order]
+    run_start = torch.ones_like(sorted_users, dtype=torch.bool)
+    run_start[1:] = sorted_users[1:] != sorted_users[:-1]
+    first = torch.cummax(torch.where(run_start, positions, 0), dim=0).values
+    
+    ranks = torch.empty_like(positions)
+    ranks[order] = positions - first
+    return ranks
+
+
+def rank_groups(
+    user_indices: torch.Tensor,
+    timestamps: Optional[torch.Tensor] = None
+) -> List[torch.Tensor]:
+    """Split a batch of events into user-disjoint groups.
+    
+    Group r holds the positions of every user's (r + 1)-th event (see
+    user_ranks), so applying the groups in order replays each user's events
+    in time order, while all users of a group are updated in one step.
+    
+    Args:
+        user_indices: User index of each event [batch_size]
+        timestamps: Event timestamps [batch_size] (default: batch order)
+        
+    Returns:
+        Position tensors, one per rank (a single group if no user repeats)
+    """
+    ranks = user_ranks(user_indices, timestamps)
+    num_ranks = int(ranks.max()) + 1 if len(ranks) else 1
+    if num_ranks == 1:
+        return [torch.arange(len(user_indices), device=user_indices.device)]
+    
+    by_rank = torch.sort(ranks, stable=True).indices
+    return list(torch.split(by_rank, torch.bincount(ranks, minlength=num_ranks).tolist()))
+
+
 class MemoryModule(nn.Module):
     """Memory module that stores and updates user state vectors.
     
@@ -95,7 +160,8 @@ class MemoryModule(nn.Module):
         self,
         num_users: int,
         memory_dim: int = 768,
-        message_dim: int = 256
+        message_dim: int = 256,
+        aggregation: str = "sequential"
     ):
         """Initialize memory module.
         
@@ -103,12 +169,19 @@ class MemoryModule(nn.Module):
             num_users: Maximum number of users
             memory_dim: Dimension of memory vectors
             message_dim: Dimension of messages
+            aggregation: How a user's events within one batch are applied:
+                "sequential" (one GRU step per event, in time order),
+                "last" (only the latest message) or "mean" (mean message)
         """
         super().__init__()
         
+        if aggregation not in MEMORY_AGGREGATIONS:
+            raise ValueError(f"Unknown memory aggregation: {aggregation}")
+        
         self.num_users = num_users
         self.memory_dim = memory_dim
         self.message_dim = message_dim
+        self.aggregation = aggregation
         
         # Memory vectors (not learnable, updated via GRU)
         self.register_buffer(
@@ -176,11 +249,18 @@ class MemoryModule(nn.Module):
     ):
         """Update memory vectors for users.
         
+        A user repeated in the batch gets a single GRU step, from their
+        aggregated message (see aggregate_messages).
+        
         Args:
             user_indices: User indices [batch_size]
             messages: Message vectors [batch_size, message_dim]
             timestamps: Interaction timestamps [batch_size]
         """
+        user_indices, messages, timestamps = self.aggregate_messages(
+            user_indices, messages, timestamps
+        )
+        
         # Get current memory
         current_memory = self.memory[user_indices]
         
@@ -191,6 +271,51 @@ class MemoryModule(nn.Module):
         self.memory[user_indices] = new_memory.detach()
         self.last_update[user_indices] = timestamps.detach()
     
+    def aggregate_messages(
+        self,
+        user_indices: torch.Tensor,
+        messages: torch.Tensor,
+        timestamps: torch.Tensor
+    ) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        """Reduce a batch to one message per user.
+        
+        "mean" averages a user's messages; otherwise the latest one is kept
+        (sequential updates never repeat a user, see TGN.apply_memory_updates).
+        Either way the user's timestamp becomes their latest one.
+        
+        Args:
+            user_indices: User indices [batch_size]
+            messages: Message vectors [batch_size, message_dim]
+            timestamps: Interaction timestamps [batch_size]
+            
+        Returns:
+            (users, messages, timestamps) with each user once
+        """
+        users, inverse = torch.unique(user_indices, return_inverse=True)
+        if len(users) == len(user_indices):
+            return user_indices, messages, timestamps
+        
+        latest = torch.full(
+            (len(users),), float('-inf'), dtype=timestamps.dtype, device=timestamps.device
+        ).scatter_reduce(0, inverse, timestamps, reduce="amax")
+        
+        if self.aggregation == "mean":
+            aggregated = torch.zeros(
+                len(users), messages.shape[1], dtype=messages.dtype, device=messages.device
+            ).scatter_reduce(
+                0, inverse.unsqueeze(-1).expand_as(messages), messages,
+                reduce="mean", include_self=False
+            )
+            return users, aggregated, latest
+        
+        # Latest event of each user: the one of highest rank
+        ranks = user_ranks(user_indices, timestamps)
+        last_rank = torch.zeros_like(users).scatter_reduce(0, inverse, ranks, reduce="amax")
+        is_last = ranks == last_rank[inverse]
+        positions = torch.empty_like(users)
+        positions[inverse[is_last]] = torch.nonzero(is_last).squeeze(-1)
+        return users, messages[positions], latest
+    
     def reset_memory(self, user_indices: Optional[torch.Tensor] = None):
         """Reset memory for users or all users.
         
@@ -334,7 +459,8 @@ class TGN(nn.Module):
         message_dim: int = 256,
         num_heads: int = 8,
         num_neighbors: int = 10,
-        dropout: float = 0.1
+        dropout: float = 0.1,
+        memory_aggregation: str = "sequential"
     ):
         """Initialize TGN.
         
@@ -348,6 +474,7 @@ class TGN(nn.Module):
             num_heads: Number of attention heads
             num_neighbors: Number of neighbors to sample
             dropout: Dropout probability
+            memory_aggregation: Repeated users within a batch, see MemoryModule
         """
         super().__init__()
         
@@ -364,7 +491,7 @@ class TGN(nn.Module):
         self.event_embedding = nn.Embedding(5, message_dim // 4)  # impression, click, game_time, rating, review
         
         # Memory module
-        self.memory = MemoryModule(num_users, memory_dim, message_dim)
+        self.memory = MemoryModule(num_users, memory_dim, message_dim, memory_aggregation)
         
         # Time encoder
         self.time_encoder = TimeEncoder(time_dim)
@@ -525,26 +652,64 @@ class TGN(nn.Module):
         
         # Update memory if training
         if update_memory:
+            self.apply_memory_updates(
+                user_indices, item_emb, timestamps, event_types, weights
+            )
+        
+        return user_emb, item_emb
+    
+    def apply_memory_updates(
+        self,
+        user_indices: torch.Tensor,
+        item_emb: torch.Tensor,
+        timestamps: torch.Tensor,
+        event_types: torch.Tensor,
+        weights: torch.Tensor
+    ):
+        """Apply a batch of interactions to the user memory.
+        
+        With "sequential" aggregation each event is one GRU step from the
+        memory its user had after their previous event, as if the batch were
+        applied one event at a time: repeated users are stepped in time order
+        (see rank_groups), while distinct users are updated together. The
+        result doesn't depend on the batch size.
+        
+        With "last" or "mean" every message is computed from the memory
+        before the batch and each user takes one step from their aggregated
+        message (see MemoryModule.aggregate_messages).
+        
+        Args:
+            user_indices: User indices [batch_size]
+            item_emb: Item embeddings [batch_size, embed_dim]
+            timestamps: Interaction timestamps [batch_size]
+            event_types: Event type indices [batch_size]
+            weights: Interaction weights [batch_size]
+        """
+        if self.memory.aggregation == "sequential":
+            groups = rank_groups(user_indices, timestamps)
+        else:
+            groups = [torch.arange(len(user_indices), device=user_indices.device)]
+        
+        for group in groups:
+            users = user_indices[group]
+            
             # Compute time deltas from last update
-            last_update = self.memory.last_update[user_indices]
-            time_deltas = timestamps - last_update
+            time_deltas = timestamps[group] - self.memory.last_update[users]
             
             # Encode interaction features
             interaction_features = self.encode_interaction(
-                event_types, weights, time_deltas
+                event_types[group], weights[group], time_deltas
             )
             
             # Compute message
             messages = self.memory.compute_message(
-                self.memory.get_memory(user_indices),
-                item_emb,
+                self.memory.get_memory(users),
+                item_emb[group],
                 interaction_features
             )
             
             # Update memory
-            self.memory.update_memory(user_indices, messages, timestamps)
-        
-        return user_emb, item_emb
+            self.memory.update_memory(users, messages, timestamps[group])
     
     def predict(
         self,
@@ -585,36 +750,77 @@ class TGN(nn.Module):
         Returns:
             User embedding [embedding_dim]
         """
+        return self.get_user_embeddings(
+            [user_idx], current_time, [recent_items], [recent_times]
+        ).squeeze(0)
+    
+    def get_user_embeddings(
+        self,
+        user_indices: List[int],
+        current_time: float,
+        recent_items: Optional[List[Optional[List[int]]]] = None,
+        recent_times: Optional[List[Optional[List[float]]]] = None
+    ) -> torch.Tensor:
+        """Get embeddings for a batch of users at a specific time.
+        
+        Users with recent interactions get a temporal-attention embedding,
+        the others a memory-augmented one.
+        
+        Args:
+            user_indices: User indices
+            current_time: Current timestamp
+            recent_items: Recent item indices per user (None if none)
+            recent_times: Recent timestamps per user (None if none)
+            
+        Returns:
+            User embeddings [num_users, embedding_dim]
+        """
         device = self.user_embedding.weight.device
+        num_users = len(user_indices)
+        recent_items = recent_items or [None] * num_users
+        recent_times = recent_times or [None] * num_users
+        
+        with_history = [
+            row for row in range(num_users)
+            if recent_items[row] and recent_times[row]
+        ]
+        history_rows = set(with_history)
+        without_history = [row for row in range(num_users) if row not in history_rows]
         
-        user_indices = torch.tensor([user_idx], device=device)
-        timestamps = torch.tensor([current_time], device=device)
+        parts = []
         
-        if recent_items and recent_times:
+        if with_history:
             # Pad or truncate to num_neighbors
-            n = min(len(recent_items), self.num_neighbors)
-            padded_items = recent_items[-n:] + [0] * (self.num_neighbors - n)
-            padded_times = recent_times[-n:] + [0.0] * (self.num_neighbors - n)
-            
-            neighbor_items = torch.tensor([padded_items], device=device)
-            neighbor_times = torch.tensor([padded_times], device=device)
-            neighbor_mask = torch.tensor([[1] * n + [0] * (self.num_neighbors - n)], device=device)
+            padded_items, padded_times, masks = [], [], []
+            for row in with_history:
+                n = min(len(recent_items[row]), self.num_neighbors)
+                padded_items.append(recent_items[row][-n:] + [0] * (self.num_neighbors - n))
+                padded_times.append(recent_times[row][-n:] + [0.0] * (self.num_neighbors - n))
+                masks.append([1] * n + [0] * (self.num_neighbors - n))
             
+            user_idx = torch.tensor([user_indices[row] for row in with_history], device=device)
             emb = self.compute_temporal_embedding(
-                user_indices,
-                neighbor_items,
-                neighbor_times,
-                timestamps,
-                neighbor_mask
+                user_idx,
+                torch.tensor(padded_items, device=device),
+                torch.tensor(padded_times, device=device),
+                torch.full((len(with_history),), current_time, device=device),
+                torch.tensor(masks, device=device)
             )
-        else:
+            parts.append((with_history, emb))
+        
+        if without_history:
             # Use memory-augmented embedding
-            base_emb = self.user_embedding(user_indices)
-            memory = self.memory.get_memory(user_indices)
+            user_idx = torch.tensor([user_indices[row] for row in without_history], device=device)
+            base_emb = self.user_embedding(user_idx)
+            memory = self.memory.get_memory(user_idx)
             combined = torch.cat([base_emb, memory], dim=-1)
-            emb = self.embedding_combiner(combined)
+            parts.append((without_history, self.embedding_combiner(combined)))
+        
+        embeddings = parts[0][1].new_empty((num_users, parts[0][1].shape[-1]))
+        for rows, emb in parts:
+            embeddings[rows] = emb
         
-        return emb.squeeze(0)
+        return embeddings
     
     def get_all_item_embeddings(self) -> torch.Tensor:
         """Get all item embeddings.
@@ -641,6 +847,9 @@ class TGNInference:
         
         # Session tracking: user_id -> list of (item_idx, timestamp, weight)
         self.sessions: Dict[str, List[Tuple[int, float, float]]] = {}
+        
+        # Items each user interacted with in the training history
+        self.played: Optional[scoring.PlayedItems] = None
     
     def start_session(self, user_id: str):
         """Start a new session for a user."""
@@ -665,6 +874,24 @@ class TGNInference:
             event_type: Event type index
             weight: Interaction weight
         """
+        self.record_interaction(user_id, item_idx, timestamp, weight)
+        self.update_memory([user_idx], [item_idx], [timestamp], [event_type], [weight])
+    
+    def record_interaction(
+        self,
+        user_id: str,
+        item_idx: int,
+        timestamp: float,
+        weight: float
+    ):
+        """Append an interaction to the session history (memory untouched).
+        
+        Args:
+            user_id: User ID string
+            item_idx: Item index
+            timestamp: Unix timestamp
+            weight: Interaction weight
+        """
         if user_id not in self.sessions:
             self.sessions[user_id] = []
         
@@ -674,22 +901,36 @@ class TGNInference:
         max_history = self.model.num_neighbors * 2
         if len(self.sessions[user_id]) > max_history:
             self.sessions[user_id] = self.sessions[user_id][-max_history:]
+    
+    def update_memory(
+        self,
+        user_indices: List[int],
+        item_indices: List[int],
+        timestamps: List[float],
+        event_types: List[int],
+        weights: List[float]
+    ):
+        """Apply a batch of interactions to the user memory in one update.
+        
+        A user's events are applied in time order (see
+        TGN.apply_memory_updates), so this matches applying them one by one.
         
-        # Update memory
+        Args:
+            user_indices: User indices
+            item_indices: Item indices
+            timestamps: Unix timestamps
+            event_types: Event type indices
+            weights: Interaction weights
+        """
+        # The user embeddings of a forward pass aren't needed here
         with torch.no_grad():
-            user_indices = torch.tensor([user_idx], device=self.device)
-            item_indices = torch.tensor([item_idx], device=self.device)
-            timestamps_t = torch.tensor([timestamp], device=self.device)
-            event_types_t = torch.tensor([event_type], device=self.device)
-            weights_t = torch.tensor([weight], device=self.device)
-            
-            self.model(
-                user_indices,
-                item_indices,
-                timestamps_t,
-                event_types_t,
-                weights_t,
-                update_memory=True
+            items = torch.tensor(item_indices, device=self.device)
+            self.model.apply_memory_updates(
+                torch.tensor(user_indices, device=self.device),
+                self.model.item_embedding(items),
+                torch.tensor(timestamps, device=self.device),
+                torch.tensor(event_types, device=self.device),
+                torch.tensor(weights, device=self.device)
             )
     
     def get_recommendations(
@@ -698,7 +939,8 @@ class TGNInference:
         user_idx: int,
         current_time: float,
         top_k: int = 10,
-        exclude_items: Optional[set] = None
+        exclude_items: Optional[set] = None,
+        exclude_played: bool = False
     ) -> List[Tuple[int, float]]:
         """Get session-aware recommendations.
         
@@ -708,6 +950,7 @@ class TGNInference:
             current_time: Current timestamp
             top_k: Number of recommendations
             exclude_items: Items to exclude
+            exclude_played: Also exclude items from the user's training history
             
         Returns:
             List of (item_idx, score) tuples
@@ -737,19 +980,64 @@ class TGNInference:
             # Compute scores
             scores = torch.matmul(user_emb, item_embs.t())
             
-            # Mask excluded items
-            if exclude_items:
-                for idx in exclude_items:
-                    if idx < len(scores):
-                        scores[idx] = float('-inf')
+            return scoring.top_k(
+                scores,
+                top_k,
+                scoring.exclude_index(exclude_items, len(scores)),
+                self.played.items(user_idx) if exclude_played and self.played else None
+            )
+    
+    def get_recommendations_batch(
+        self,
+        user_ids: List[Optional[str]],
+        user_indices: List[int],
+        current_time: float,
+        top_k: int = 10,
+        exclude_items: Optional[List[Optional[set]]] = None,
+        exclude_played: bool = False
+    ) -> List[List[Tuple[int, float]]]:
+        """Get session-aware recommendations for many users at once.
+        
+        Scores all users with a single [batch, dim] x [dim, num_items] matmul.
+        
+        Args:
+            user_ids: User ID strings for session lookup (None to ignore
+                the user's session history)
+            user_indices: User indices
+            current_time: Current timestamp
+            top_k: Number of recommendations per user
+            exclude_items: Items to exclude, per user
+            exclude_played: Also exclude items from each user's training history
+            
+        Returns:
+            List of (item_idx, score) tuples per user
+        """
+        if not user_ids:
+            return []
+        
+        with torch.no_grad():
+            recent_items, recent_times = [], []
+            for user_id in user_ids:
+                session = self.sessions.get(user_id) if user_id is not None else None
+                recent_items.append([s[0] for s in session] if session else None)
+                recent_times.append([s[1] for s in session] if session else None)
+            
+            user_embs = self.model.get_user_embeddings(
+                user_indices,
+                current_time,
+                recent_items,
+                recent_times
+            )
+            item_embs = self.model.get_all_item_embeddings()
             
-            # Get top-K
-            top_scores, top_indices = torch.topk(scores, min(top_k, len(scores)))
+            scores = torch.matmul(user_embs, item_embs.t())
             
-            return [
-                (idx.item(), score.item())
-                for idx, score in zip(top_indices, top_scores)
-            ]
+            return scoring.top_k_batch(
+                scores,
+                top_k,
+                scoring.exclude_coords(exclude_items, scores.shape[1]),
+                self.played.coords(user_indices) if exclude_played and self.played else None
+            )
     
     def clear_session(self, user_id: str):
         """Clear session for a user."""
@@ -1,16 +1,21 @@
 """ML services."""
 
 from app.services.graph_builder import GraphBuilder, GraphData
+from app.services.graph_store import IncrementalGraphStore
+from app.services.sampling import BPRSampler
 from app.services.trainer import LightGCNTrainer
 from app.services.embedding_service import EmbeddingService
+from app.services.serving_index import ServingIndex
+from app.services.topn_store import TopNStore
 from app.services.tgn_trainer import TGNTrainer, TemporalGraphBuilder
 from app.services.session_service import SessionService
 from app.services.hgt_builder import HeteroGraphBuilder
 from app.services.hgt_trainer import HGTTrainer
 
 __all__ = [
-    "GraphBuilder", "GraphData", "LightGCNTrainer", "EmbeddingService",
-    "TGNTrainer", "TemporalGraphBuilder", "SessionService",
-    "HeteroGraphBuilder", "HGTTrainer"
+    "GraphBuilder", "GraphData", "IncrementalGraphStore", "LightGCNTrainer",
+    "EmbeddingService", "TGNTrainer", "TemporalGraphBuilder", "SessionService",
+    "HeteroGraphBuilder", "HGTTrainer", "BPRSampler", "ServingIndex",
+    "TopNStore"
 ]
 
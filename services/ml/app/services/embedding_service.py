@@ -1,5 +1,8 @@
 """Embedding service for managing LightGCN embeddings in Qdrant."""
 
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 import structlog
 from qdrant_client import QdrantClient
@@ -11,10 +14,24 @@ import numpy as np
 from app.config import get_settings
 from app.services.graph_builder import GraphData
 from app.models.lightgcn import LightGCNInference
+from app.models.projection import project
 
 logger = structlog.get_logger()
 
 
+# Namespace for point IDs; changing it orphans every stored point
+POINT_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "casino-ml/qdrant-points")
+
+
+def point_id(key: str) -> str:
+    """Stable point ID for an entity key (user ID or game slug).
+    
+    UUIDv5 of the key, so every process and restart maps a key to the
+    same point (unlike the per-process salted hash()).
+    """
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, key))
+
+
 class EmbeddingService:
     """Service for managing LightGCN embeddings in Qdrant."""
     
@@ -29,77 +46,452 @@ class EmbeddingService:
         if self._client is None:
             self._client = QdrantClient(
                 host=self.settings.qdrant_host,
-                port=self.settings.qdrant_port
+                port=self.settings.qdrant_port,
+                grpc_port=self.settings.qdrant_grpc_port,
+                prefer_grpc=self.settings.qdrant_prefer_grpc
             )
         return self._client
     
-    def _ensure_collection(self, collection_name: str):
-        """Ensure a collection exists with proper configuration."""
+    def _ensure_collection(self, collection_name: str, size: int):
+        """Ensure a collection (or an alias to one) exists with proper configuration.
+        
+        Args:
+            collection_name: Collection or alias name
+            size: Vector size to create the collection with
+        """
         collections = self.client.get_collections().collections
         collection_names = [c.name for c in collections]
         
-        if collection_name not in collection_names:
-            self.client.create_collection(
+        if collection_name in collection_names or collection_name in self._get_aliases():
+            return
+        
+        self.client.create_collection(
+            collection_name=collection_name,
+            vectors_config=self._vector_params(size)
+        )
+        logger.info(f"Created collection: {collection_name}")
+    
+    def _vector_params(self, size: int) -> VectorParams:
+        """Vector configuration of embedding collections.
+        
+        Vectors can be stored as float16, and int8 scalar quantization can
+        be enabled on top; searches then run on the quantized vectors and
+        rescore the best candidates with the originals.
+        """
+        datatype = self.settings.qdrant_vector_datatype
+        if datatype not in ("float32", "float16"):
+            raise ValueError(f"Unknown Qdrant vector datatype: {datatype}")
+        
+        quantization = self.settings.qdrant_quantization
+        if quantization not in ("none", "int8"):
+            raise ValueError(f"Unknown Qdrant quantization: {quantization}")
+        
+        params = VectorParams(
+            size=size,
+            distance=Distance.COSINE
+        )
+        if datatype == "float16":
+            params.datatype = models.Datatype.FLOAT16
+        if quantization == "int8":
+            params.quantization_config = models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=self.settings.qdrant_quantization_quantile,
+                    always_ram=self.settings.qdrant_quantization_always_ram
+                )
+            )
+        return params
+    
+    def _search_params(self) -> Optional[models.SearchParams]:
+        """Search parameters matching the collection quantization."""
+        if self.settings.qdrant_quantization == "none":
+            return None
+        
+        return models.SearchParams(
+            quantization=models.QuantizationSearchParams(
+                rescore=True,
+                oversampling=self.settings.qdrant_quantization_oversampling
+            )
+        )
+    
+    def _publish_vectors(self, model: str, vectors: np.ndarray) -> np.ndarray:
+        """Project a model's vectors to its published size, if configured."""
+        return project(vectors, self.settings.model_publish_dim(model))
+    
+    def _get_aliases(self) -> dict[str, str]:
+        """Get alias name -> collection name for all aliases."""
+        aliases = self.client.get_aliases().aliases
+        return {a.alias_name: a.collection_name for a in aliases}
+    
+    def get_collection_version(self, collection_name: str) -> Optional[str]:
+        """Resolve an alias to the collection it currently points at.
+        
+        Args:
+            collection_name: Alias (or plain collection) name
+            
+        Returns:
+            Collection name, or None if neither exists
+        """
+        aliases = self._get_aliases()
+        if collection_name in aliases:
+            return aliases[collection_name]
+        
+        if self.client.collection_exists(collection_name):
+            return collection_name
+        return None
+    
+    def scroll_embeddings(
+        self,
+        collection_name: str,
+        key_field: str,
+        index_field: Optional[str] = None,
+        batch_size: int = 1000
+    ) -> tuple[list[str], np.ndarray, np.ndarray]:
+        """Read every point of a collection.
+        
+        Args:
+            collection_name: Collection or alias to read
+            key_field: Payload field holding the entity ID
+            index_field: Optional payload field holding the row index
+            batch_size: Points per scroll request
+            
+        Returns:
+            Tuple of (keys, vectors [len(keys), dim], row indices [len(keys)],
+            -1 where the index is unknown)
+        """
+        keys: list[str] = []
+        vectors: list[list[float]] = []
+        indices: list[int] = []
+        fields = [key_field] if index_field is None else [key_field, index_field]
+        
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
                 collection_name=collection_name,
-                vectors_config=VectorParams(
-                    size=self.settings.embedding_dim,
-                    distance=Distance.COSINE
+                limit=batch_size,
+                offset=offset,
+                with_payload=fields,
+                with_vectors=True
+            )
+            
+            for point in points:
+                payload = point.payload or {}
+                key = payload.get(key_field)
+                if key is not None and point.vector is not None:
+                    keys.append(key)
+                    vectors.append(point.vector)
+                    indices.append(payload.get(index_field, -1) if index_field else -1)
+            
+            if offset is None:
+                break
+        
+        if not vectors:
+            empty = np.zeros((0, self.settings.embedding_dim), dtype=np.float32)
+            return keys, empty, np.zeros(0, dtype=np.int64)
+        return keys, np.asarray(vectors, dtype=np.float32), np.asarray(indices, dtype=np.int64)
+    
+    # ========================================
+    # Versioned Collections
+    # ========================================
+    
+    def _create_version(self, alias: str, size: int) -> str:
+        """Create an empty versioned collection for an alias.
+        
+        HNSW indexing is disabled (indexing_threshold=0) so the bulk load
+        only appends to segments; it is re-enabled by _finish_indexing.
+        The size may differ from the previous version's; readers switch
+        over with the alias.
+        
+        Args:
+            alias: Alias the version is created for
+            size: Vector size
+            
+        Returns:
+            Name of the new collection
+        """
+        version = f"{alias}_v{time.time_ns() // 1_000_000}"
+        self.client.create_collection(
+            collection_name=version,
+            vectors_config=self._vector_params(size),
+            optimizers_config=models.OptimizersConfigDiff(indexing_threshold=0)
+        )
+        logger.info("Created collection version", alias=alias, collection=version)
+        return version
+    
+    def _finish_indexing(self, collection_name: str, num_points: int):
+        """Re-enable indexing and wait until the collection is fully built."""
+        self.client.update_collection(
+            collection_name=collection_name,
+            optimizers_config=models.OptimizersConfigDiff(
+                indexing_threshold=self.settings.qdrant_indexing_threshold
+            )
+        )
+        
+        deadline = time.monotonic() + self.settings.qdrant_index_timeout
+        while True:
+            info = self.client.get_collection(collection_name)
+            points_count = info.points_count or 0
+            if info.status == models.CollectionStatus.GREEN and points_count >= num_points:
+                return
+            
+            if time.monotonic() > deadline:
+                # Still fully searchable, just not all segments are indexed yet
+                logger.warning(
+                    "Collection not fully indexed before swap",
+                    collection=collection_name,
+                    status=str(info.status),
+                    points_count=points_count,
+                    expected=num_points
                 )
+                return
+            
+            time.sleep(0.5)
+    
+    def _swap_aliases(self, versions: dict[str, str], in_use: set[str]):
+        """Point each alias at its new collection in one atomic update.
+        
+        Pre-alias deployments stored data in a plain collection with the
+        alias' name. Alias operations can't delete a collection, so such a
+        collection is deleted and its alias created in the very next
+        request, once every other alias has been swapped; the name is
+        missing only for that round trip, once per alias (see README,
+        Qdrant Collections).
+        
+        Args:
+            versions: Alias name -> collection name
+            in_use: Filled with the new collections that are (or are about
+                to be) the only data behind an alias, and must survive a
+                failure of a later step
+        """
+        aliases = self._get_aliases()
+        collection_names = {c.name for c in self.client.get_collections().collections}
+        operations = []
+        swapped = []
+        legacy = []
+        
+        for alias, version in versions.items():
+            create = models.CreateAliasOperation(
+                create_alias=models.CreateAlias(collection_name=version, alias_name=alias)
             )
-            logger.info(f"Created collection: {collection_name}")
+            
+            if alias in aliases:
+                operations.append(models.DeleteAliasOperation(
+                    delete_alias=models.DeleteAlias(alias_name=alias)
+                ))
+            elif alias in collection_names:
+                legacy.append((alias, version, create))
+                continue
+            
+            operations.append(create)
+            swapped.append(version)
+        
+        if operations:
+            self.client.update_collection_aliases(change_aliases_operations=operations)
+            in_use.update(swapped)
+        
+        for alias, version, create in legacy:
+            # Once the legacy collection is gone the new one is all there is
+            in_use.add(version)
+            self.client.delete_collection(alias)
+            self.client.update_collection_aliases(change_aliases_operations=[create])
+            logger.info("Replaced legacy collection with alias", alias=alias)
+        
+        logger.info("Swapped collection aliases", versions=versions)
+    
+    def _gc_versions(self, alias: str):
+        """Delete old versions of an alias beyond qdrant_keep_versions."""
+        current = self._get_aliases().get(alias)
+        prefix = f"{alias}_v"
+        versions = sorted(
+            (c.name for c in self.client.get_collections().collections
+             if c.name.startswith(prefix) and c.name[len(prefix):].isdigit()),
+            key=lambda name: int(name[len(prefix):]),
+            reverse=True
+        )
+        
+        # Versions newer than the current one belong to a load in progress
+        if current in versions:
+            versions = versions[versions.index(current):]
+        
+        for version in versions[max(self.settings.qdrant_keep_versions, 1):]:
+            self.client.delete_collection(version)
+            logger.info("Deleted old collection version", alias=alias, collection=version)
+    
+    def publish_versioned(
+        self,
+        uploads: dict[str, dict],
+        batch_size: Optional[int] = None
+    ) -> dict[str, str]:
+        """Load embeddings into fresh collections and swap them in together.
+        
+        Each alias gets a new versioned collection, filled with indexing
+        deferred and indexed once the load completes. All aliases are then
+        flipped in one atomic operation, so readers see either the previous
+        or the new embedding space, never a mix or a partially written one.
+        
+        Args:
+            uploads: Alias name -> publish_embeddings keyword arguments
+                (keys, vectors, key_field, source, index_field)
+            batch_size: Batch size for upserting (defaults to config)
+            
+        Returns:
+            Alias name -> new collection name
+        """
+        versions: dict[str, str] = {}
+        in_use: set[str] = set()
+        
+        try:
+            for alias, upload in uploads.items():
+                size = np.asarray(upload["vectors"]).shape[1]
+                versions[alias] = self._create_version(alias, size)
+                self.publish_embeddings(versions[alias], batch_size=batch_size, **upload)
+            
+            for alias, version in versions.items():
+                self._finish_indexing(version, len(uploads[alias]["keys"]))
+            
+            self._swap_aliases(versions, in_use)
+        
+        except Exception:
+            # Drop the new versions no alias depends on; a cleanup failure
+            # must not hide the original error
+            for version in versions.values():
+                if version in in_use:
+                    continue
+                try:
+                    self.client.delete_collection(version)
+                except Exception as e:
+                    logger.warning(
+                        "Failed to delete unused collection version",
+                        collection=version,
+                        error=str(e)
+                    )
+            raise
+        
+        for alias in versions:
+            self._gc_versions(alias)
+        
+        return versions
     
     def init_collections(self):
         """Initialize LightGCN collections in Qdrant."""
-        self._ensure_collection(self.settings.lightgcn_users_collection)
-        self._ensure_collection(self.settings.lightgcn_games_collection)
+        size = self.settings.model_publish_dim("lightgcn")
+        self._ensure_collection(self.settings.lightgcn_users_collection, size)
+        self._ensure_collection(self.settings.lightgcn_games_collection, size)
         logger.info("Initialized LightGCN collections")
     
+    def publish_embeddings(
+        self,
+        collection_name: str,
+        keys: list[str],
+        vectors: np.ndarray,
+        key_field: str,
+        source: str,
+        index_field: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        parallel: Optional[int] = None,
+        wait: Optional[bool] = None
+    ) -> int:
+        """Bulk upload an embedding matrix to a collection.
+        
+        Rows are sliced straight from the NumPy array into columnar batches
+        (ids, vectors, payloads), and up to `parallel` upserts are kept in
+        flight on the shared client.
+        
+        Args:
+            collection_name: Target collection
+            keys: Entity ID of each row of vectors
+            vectors: Embedding matrix [len(keys), dim]
+            key_field: Payload field holding the entity ID
+            source: Payload source tag
+            index_field: Optional payload field holding the row index
+            batch_size: Points per upsert request (defaults to config)
+            parallel: Concurrent upsert requests (defaults to config)
+            wait: Block until each batch is indexed (defaults to config)
+            
+        Returns:
+            Number of points uploaded
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self._ensure_collection(collection_name, vectors.shape[1])
+        
+        batch_size = batch_size or self.settings.qdrant_upload_batch_size
+        parallel = parallel or self.settings.qdrant_upload_parallel
+        wait = self.settings.qdrant_upload_wait if wait is None else wait
+        
+        def upsert_batch(start: int):
+            batch_keys = keys[start:start + batch_size]
+            payloads = [{key_field: key, "source": source} for key in batch_keys]
+            if index_field is not None:
+                for idx, payload in enumerate(payloads, start):
+                    payload[index_field] = idx
+            
+            self.client.upsert(
+                collection_name=collection_name,
+                points=models.Batch(
+                    ids=[point_id(key) for key in batch_keys],
+                    vectors=vectors[start:start + batch_size].tolist(),
+                    payloads=payloads
+                ),
+                wait=wait
+            )
+        
+        starts = range(0, len(keys), batch_size)
+        with ThreadPoolExecutor(max_workers=parallel) as executor:
+            # Surface the first failed batch
+            for _ in executor.map(upsert_batch, starts):
+                pass
+        
+        return len(keys)
+    
+    def _lightgcn_uploads(
+        self,
+        inference: LightGCNInference,
+        graph_data: GraphData,
+        users: bool = True,
+        games: bool = True
+    ) -> dict[str, dict]:
+        """Build publish_versioned uploads for LightGCN embeddings."""
+        uploads = {}
+        
+        if users:
+            user_embeddings = inference.get_all_user_embeddings().cpu().numpy()
+            uploads[self.settings.lightgcn_users_collection] = {
+                "keys": [graph_data.idx_to_user_id[idx] for idx in range(graph_data.num_users)],
+                "vectors": self._publish_vectors("lightgcn", user_embeddings[:graph_data.num_users]),
+                "key_field": "user_id",
+                "index_field": "user_idx",
+                "source": "lightgcn"
+            }
+        
+        if games:
+            item_embeddings = inference.get_all_item_embeddings().cpu().numpy()
+            uploads[self.settings.lightgcn_games_collection] = {
+                "keys": [graph_data.idx_to_game_slug[idx] for idx in range(graph_data.num_games)],
+                "vectors": self._publish_vectors("lightgcn", item_embeddings[:graph_data.num_games]),
+                "key_field": "game_slug",
+                "index_field": "game_idx",
+                "source": "lightgcn"
+            }
+        
+        return uploads
+    
     def store_user_embeddings(
         self,
         inference: LightGCNInference,
         graph_data: GraphData,
-        batch_size: int = 100
+        batch_size: Optional[int] = None
     ):
-        """Store all user embeddings in Qdrant.
+        """Store all user embeddings in a new collection version.
         
         Args:
             inference: LightGCN inference with computed embeddings
             graph_data: Graph data with ID mappings
-            batch_size: Batch size for upserting
+            batch_size: Batch size for upserting (defaults to config)
         """
-        self._ensure_collection(self.settings.lightgcn_users_collection)
-        
-        user_embeddings = inference.get_all_user_embeddings().cpu().numpy()
-        
-        points = []
-        for idx in range(graph_data.num_users):
-            user_id = graph_data.idx_to_user_id[idx]
-            embedding = user_embeddings[idx].tolist()
-            
-            # Use hash as numeric ID for older Qdrant versions
-            numeric_id = abs(hash(user_id)) % (2**63)
-            points.append(PointStruct(
-                id=numeric_id,
-                vector=embedding,
-                payload={
-                    "user_id": user_id,
-                    "user_idx": idx,
-                    "source": "lightgcn"
-                }
-            ))
-            
-            if len(points) >= batch_size:
-                self.client.upsert(
-                    collection_name=self.settings.lightgcn_users_collection,
-                    points=points
-                )
-                points = []
-        
-        if points:
-            self.client.upsert(
-                collection_name=self.settings.lightgcn_users_collection,
-                points=points
-            )
+        self.publish_versioned(
+            self._lightgcn_uploads(inference, graph_data, games=False),
+            batch_size=batch_size
+        )
         
         logger.info(
             "Stored user embeddings",
@@ -111,48 +503,19 @@ class EmbeddingService:
         self,
         inference: LightGCNInference,
         graph_data: GraphData,
-        batch_size: int = 100
+        batch_size: Optional[int] = None
     ):
-        """Store all game embeddings in Qdrant.
+        """Store all game embeddings in a new collection version.
         
         Args:
             inference: LightGCN inference with computed embeddings
             graph_data: Graph data with ID mappings
-            batch_size: Batch size for upserting
+            batch_size: Batch size for upserting (defaults to config)
         """
-        self._ensure_collection(self.settings.lightgcn_games_collection)
-        
-        item_embeddings = inference.get_all_item_embeddings().cpu().numpy()
-        
-        points = []
-        for idx in range(graph_data.num_games):
-            game_slug = graph_data.idx_to_game_slug[idx]
-            embedding = item_embeddings[idx].tolist()
-            
-            # Use hash as numeric ID for older Qdrant versions
-            numeric_id = abs(hash(game_slug)) % (2**63)
-            points.append(PointStruct(
-                id=numeric_id,
-                vector=embedding,
-                payload={
-                    "game_slug": game_slug,
-                    "game_idx": idx,
-                    "source": "lightgcn"
-                }
-            ))
-            
-            if len(points) >= batch_size:
-                self.client.upsert(
-                    collection_name=self.settings.lightgcn_games_collection,
-                    points=points
-                )
-                points = []
-        
-        if points:
-            self.client.upsert(
-                collection_name=self.settings.lightgcn_games_collection,
-                points=points
-            )
+        self.publish_versioned(
+            self._lightgcn_uploads(inference, graph_data, users=False),
+            batch_size=batch_size
+        )
         
         logger.info(
             "Stored game embeddings",
@@ -165,14 +528,19 @@ class EmbeddingService:
         inference: LightGCNInference,
         graph_data: GraphData
     ):
-        """Store both user and game embeddings.
+        """Store both user and game embeddings, swapped in together.
         
         Args:
             inference: LightGCN inference with computed embeddings
             graph_data: Graph data with ID mappings
         """
-        self.store_user_embeddings(inference, graph_data)
-        self.store_game_embeddings(inference, graph_data)
+        self.publish_versioned(self._lightgcn_uploads(inference, graph_data))
+        
+        logger.info(
+            "Stored LightGCN embeddings",
+            num_users=graph_data.num_users,
+            num_games=graph_data.num_games
+        )
     
     def get_user_embedding(self, user_id: str) -> Optional[list[float]]:
         """Get user embedding from Qdrant.
@@ -186,7 +554,7 @@ class EmbeddingService:
         try:
             result = self.client.retrieve(
                 collection_name=self.settings.lightgcn_users_collection,
-                ids=[user_id],
+                ids=[point_id(user_id)],
                 with_vectors=True
             )
             
@@ -198,6 +566,36 @@ class EmbeddingService:
             logger.error("Failed to get user embedding", error=str(e), user_id=user_id)
             return None
     
+    def get_user_embeddings(self, user_ids: list[str]) -> dict[str, list[float]]:
+        """Get many user embeddings from Qdrant in one request.
+        
+        Args:
+            user_ids: User IDs
+            
+        Returns:
+            Mapping of user ID to embedding for the users that were found
+        """
+        if not user_ids:
+            return {}
+        
+        try:
+            result = self.client.retrieve(
+                collection_name=self.settings.lightgcn_users_collection,
+                ids=[point_id(user_id) for user_id in user_ids],
+                with_payload=["user_id"],
+                with_vectors=True
+            )
+            
+            return {
+                point.payload["user_id"]: point.vector
+                for point in result
+                if point.payload and point.vector is not None
+            }
+        
+        except Exception as e:
+            logger.error("Failed to get user embeddings", error=str(e), num_users=len(user_ids))
+            return {}
+    
     def get_game_embedding(self, game_slug: str) -> Optional[list[float]]:
         """Get game embedding from Qdrant.
         
@@ -210,7 +608,7 @@ class EmbeddingService:
         try:
             result = self.client.retrieve(
                 collection_name=self.settings.lightgcn_games_collection,
-                ids=[game_slug],
+                ids=[point_id(game_slug)],
                 with_vectors=True
             )
             
@@ -243,7 +641,8 @@ class EmbeddingService:
                 collection_name=self.settings.lightgcn_games_collection,
                 query_vector=user_embedding,
                 limit=limit,
-                score_threshold=score_threshold
+                score_threshold=score_threshold,
+                search_params=self._search_params()
             )
             
             return [
@@ -271,13 +670,11 @@ class EmbeddingService:
             embedding: New embedding vector
         """
         try:
-            # Use hash as numeric ID for older Qdrant versions
-            numeric_id = abs(hash(user_id)) % (2**63)
             self.client.upsert(
                 collection_name=self.settings.lightgcn_users_collection,
                 points=[PointStruct(
-                    id=numeric_id,
-                    vector=embedding,
+                    id=point_id(user_id),
+                    vector=self._publish_vectors("lightgcn", embedding).tolist(),
                     payload={
                         "user_id": user_id,
                         "source": "lightgcn_realtime"
@@ -360,16 +757,15 @@ class EmbeddingService:
             user_id: User ID
             embedding: Embedding vector
         """
-        self._ensure_collection(self.settings.hgt_users_collection)
+        vector = self._publish_vectors("hgt", embedding).tolist()
+        self._ensure_collection(self.settings.hgt_users_collection, len(vector))
         
         try:
-            # Use hash of user_id as numeric ID for older Qdrant versions
-            numeric_id = abs(hash(user_id)) % (2**63)
             self.client.upsert(
                 collection_name=self.settings.hgt_users_collection,
                 points=[PointStruct(
-                    id=numeric_id,
-                    vector=embedding,
+                    id=point_id(user_id),
+                    vector=vector,
                     payload={
                         "user_id": user_id,
                         "source": "hgt"
@@ -386,16 +782,15 @@ class EmbeddingService:
             game_slug: Game slug
             embedding: Embedding vector
         """
-        self._ensure_collection(self.settings.hgt_games_collection)
+        vector = self._publish_vectors("hgt", embedding).tolist()
+        self._ensure_collection(self.settings.hgt_games_collection, len(vector))
         
         try:
-            # Use hash of game_slug as numeric ID for older Qdrant versions
-            numeric_id = abs(hash(game_slug)) % (2**63)
             self.client.upsert(
                 collection_name=self.settings.hgt_games_collection,
                 points=[PointStruct(
-                    id=numeric_id,
-                    vector=embedding,
+                    id=point_id(game_slug),
+                    vector=vector,
                     payload={
                         "game_slug": game_slug,
                         "source": "hgt"
@@ -404,4 +799,48 @@ class EmbeddingService:
             )
         except Exception as e:
             logger.error("Failed to store HGT game embedding", error=str(e), game_slug=game_slug)
-
+    
+    def store_hgt_embeddings(
+        self,
+        user_embeddings: Optional[np.ndarray],
+        user_id_to_idx: dict[str, int],
+        game_embeddings: Optional[np.ndarray],
+        game_slug_to_idx: dict[str, int]
+    ):
+        """Bulk store HGT user and game embeddings in new collection versions.
+        
+        Args:
+            user_embeddings: User embedding matrix, or None to skip users
+            user_id_to_idx: User ID to row mapping
+            game_embeddings: Game embedding matrix, or None to skip games
+            game_slug_to_idx: Game slug to row mapping
+        """
+        uploads = {}
+        
+        if user_embeddings is not None:
+            user_ids = list(user_id_to_idx)
+            rows = np.fromiter(user_id_to_idx.values(), dtype=np.int64, count=len(user_ids))
+            uploads[self.settings.hgt_users_collection] = {
+                "keys": user_ids,
+                "vectors": self._publish_vectors("hgt", user_embeddings[rows]),
+                "key_field": "user_id",
+                "source": "hgt"
+            }
+        
+        if game_embeddings is not None:
+            game_slugs = list(game_slug_to_idx)
+            rows = np.fromiter(game_slug_to_idx.values(), dtype=np.int64, count=len(game_slugs))
+            uploads[self.settings.hgt_games_collection] = {
+                "keys": game_slugs,
+                "vectors": self._publish_vectors("hgt", game_embeddings[rows]),
+                "key_field": "game_slug",
+                "source": "hgt"
+            }
+        
+        self.publish_versioned(uploads)
+        
+        logger.info(
+            "Stored HGT embeddings",
+            num_users=len(user_id_to_idx) if user_embeddings is not None else 0,
+            num_games=len(game_slug_to_idx) if game_embeddings is not None else 0
+        )
@@ -5,22 +5,83 @@ with proper weighting and time decay.
 """
 
 import math
+import time
 import asyncio
 from datetime import datetime, timedelta
-from typing import Optional, Any
+from typing import Optional, Any, Iterator
 from dataclasses import dataclass, field
 
 import numpy as np
+import pandas as pd
 import torch
 import psycopg2
 import asyncpg
 import structlog
 
 from app.config import get_settings
+from app.models.lightgcn import build_norm_adj
 
 logger = structlog.get_logger()
 
 
+def aggregate_pairs(
+    users: np.ndarray,
+    games: np.ndarray,
+    weights: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sum weights per (user, game) pair.
+    
+    Factorizes both key columns and reduces with a single bincount
+    instead of accumulating into a Python dict.
+    
+    Args:
+        users: User IDs [num_rows]
+        games: Game slugs [num_rows]
+        weights: Row weights [num_rows]
+        
+    Returns:
+        Tuple of (users, games, summed weights), one entry per distinct pair
+    """
+    if len(weights) == 0:
+        return users[:0], games[:0], np.zeros(0, dtype=np.float64)
+    
+    user_codes, user_uniques = pd.factorize(users)
+    game_codes, game_uniques = pd.factorize(games)
+    num_games = len(game_uniques)
+    
+    pair_keys = user_codes.astype(np.int64) * num_games + game_codes
+    pair_codes, pair_uniques = pd.factorize(pair_keys)
+    summed = np.bincount(pair_codes, weights=weights, minlength=len(pair_uniques))
+    
+    return (
+        np.asarray(user_uniques, dtype=object)[pair_uniques // num_games],
+        np.asarray(game_uniques, dtype=object)[pair_uniques % num_games],
+        summed
+    )
+
+
+def merge_pairs(
+    partials: list[tuple[np.ndarray, np.ndarray, np.ndarray]]
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Combine several (users, games, weights) chunks into one per-pair sum.
+    
+    Args:
+        partials: Chunks as returned by aggregate_pairs
+        
+    Returns:
+        Tuple of (users, games, summed weights), one entry per distinct pair
+    """
+    if not partials:
+        empty = np.empty(0, dtype=object)
+        return empty, empty, np.zeros(0, dtype=np.float64)
+    
+    return aggregate_pairs(
+        np.concatenate([p[0] for p in partials]),
+        np.concatenate([p[1] for p in partials]),
+        np.concatenate([p[2] for p in partials])
+    )
+
+
 @dataclass
 class GraphData:
     """Container for graph data."""
@@ -40,6 +101,18 @@ class GraphData:
     num_games: int = 0
     num_edges: int = 0
     
+    # Growable storage behind edge_index / edge_weight, which are views of
+    # the first num_edges columns
+    _edge_buf: Optional[torch.Tensor] = field(default=None, repr=False)  # [2, capacity]
+    _weight_buf: Optional[torch.Tensor] = field(default=None, repr=False)  # [capacity]
+    
+    # (user_idx, game_idx) -> slot of the user->game edge; the reverse edge
+    # is stored in the next slot. Built lazily on the first upsert.
+    _edge_slots: Optional[dict[tuple[int, int], int]] = field(default=None, repr=False)
+    
+    # Cached normalized adjacency for LightGCN; reset whenever edges change
+    _norm_adj: Optional[torch.Tensor] = field(default=None, repr=False)
+    
     def get_user_idx(self, user_id: str) -> Optional[int]:
         """Get user index from user ID."""
         return self.user_id_to_idx.get(user_id)
@@ -47,14 +120,120 @@ class GraphData:
     def get_game_idx(self, game_slug: str) -> Optional[int]:
         """Get game index from game slug."""
         return self.game_slug_to_idx.get(game_slug)
+    
+    def get_norm_adj(self) -> torch.Tensor:
+        """Get the symmetric-normalized adjacency, building it on first use.
+        
+        Returns:
+            Sparse CSR tensor [num_users + num_games, num_users + num_games]
+        """
+        if self._norm_adj is None:
+            self._norm_adj = build_norm_adj(
+                self.edge_index,
+                self.num_users + self.num_games,
+                self.edge_weight
+            )
+        return self._norm_adj
+    
+    def set_edges(self, edge_index: torch.Tensor, edge_weight: torch.Tensor):
+        """Replace all edges.
+        
+        Args:
+            edge_index: Interleaved user->game / game->user edges [2, num_edges]
+            edge_weight: Edge weights [num_edges]
+        """
+        self._edge_buf = edge_index
+        self._weight_buf = edge_weight
+        self._edge_slots = None
+        self._norm_adj = None
+        self.num_edges = edge_index.shape[1]
+        self._update_views()
+    
+    def _update_views(self):
+        """Point edge_index / edge_weight at the filled part of the buffers."""
+        self.edge_index = self._edge_buf[:, :self.num_edges]
+        self.edge_weight = self._weight_buf[:self.num_edges]
+    
+    def _reserve(self, num_edges: int):
+        """Grow the buffers to hold at least num_edges, doubling capacity."""
+        capacity = 0 if self._edge_buf is None else self._edge_buf.shape[1]
+        if num_edges <= capacity:
+            return
+        
+        new_capacity = max(num_edges, 2 * capacity, 64)
+        edge_buf = torch.empty((2, new_capacity), dtype=torch.long)
+        weight_buf = torch.empty(new_capacity, dtype=torch.float32)
+        
+        if self.num_edges:
+            edge_buf[:, :self.num_edges] = self._edge_buf[:, :self.num_edges]
+            weight_buf[:self.num_edges] = self._weight_buf[:self.num_edges]
+        
+        self._edge_buf = edge_buf
+        self._weight_buf = weight_buf
+    
+    def _build_edge_slots(self):
+        """Index existing user->game edges by (user_idx, game_idx)."""
+        self._edge_slots = {}
+        if not self.num_edges:
+            return
+        
+        users = self.edge_index[0, 0::2].tolist()
+        games = (self.edge_index[1, 0::2] - self.num_users).tolist()
+        self._edge_slots = {
+            (user_idx, game_idx): 2 * i
+            for i, (user_idx, game_idx) in enumerate(zip(users, games))
+        }
+    
+    def upsert_edge(self, user_idx: int, game_idx: int, weight: float) -> bool:
+        """Add weight to a user-game edge pair, appending it if missing.
+        
+        Existing pairs are updated in place; new pairs are appended in
+        amortized O(1).
+        
+        Args:
+            user_idx: User index
+            game_idx: Game index (not offset by num_users)
+            weight: Weight to add to both directions
+            
+        Returns:
+            True if a new edge pair was appended
+        """
+        if self._edge_slots is None:
+            self._build_edge_slots()
+        
+        self._norm_adj = None
+        
+        slot = self._edge_slots.get((user_idx, game_idx))
+        if slot is not None:
+            self._weight_buf[slot:slot + 2] += weight
+            return False
+        
+        slot = self.num_edges
+        self._reserve(slot + 2)
+        
+        game_node_idx = self.num_users + game_idx
+        self._edge_buf[0, slot], self._edge_buf[1, slot] = user_idx, game_node_idx
+        self._edge_buf[0, slot + 1], self._edge_buf[1, slot + 1] = game_node_idx, user_idx
+        self._weight_buf[slot:slot + 2] = weight
+        
+        self._edge_slots[(user_idx, game_idx)] = slot
+        self.num_edges += 2
+        self._update_views()
+        return True
 
 
 class GraphBuilder:
     """Builds user-game bipartite graphs from interaction data."""
     
-    def __init__(self):
-        """Initialize graph builder with settings."""
+    def __init__(self, pushdown: Optional[bool] = None):
+        """Initialize graph builder with settings.
+        
+        Args:
+            pushdown: Aggregate edge weights in PostgreSQL instead of
+                Python (defaults to config)
+        """
         self.settings = get_settings()
+        self.pushdown = self.settings.graph_pushdown if pushdown is None else pushdown
         self._conn: Optional[Any] = None
     
     def _get_connection(self) -> Any:
@@ -113,150 +292,417 @@ class GraphBuilder:
         days_since = (now - event_time).total_seconds() / 86400
         return math.pow(0.5, days_since / half_life_days)
     
-    def build_graph(self, lookback_days: int = 30) -> GraphData:
-        """Build bipartite graph from interaction data.
+    def _calculate_event_weights(
+        self,
+        event_types: np.ndarray,
+        durations: np.ndarray
+    ) -> np.ndarray:
+        """Vectorized _calculate_event_weight over a column of events.
         
         Args:
-            lookback_days: Number of days of history to include
+            event_types: Event type strings [num_events]
+            durations: Durations in seconds, 0 where missing [num_events]
             
         Returns:
-            GraphData with edge index and weights
+            Event weights [num_events]
         """
-        logger.info("Building interaction graph", lookback_days=lookback_days)
+        weights = np.zeros(len(event_types), dtype=np.float64)
+        weights[event_types == "impression"] = self.settings.impression_weight
+        weights[event_types == "click"] = self.settings.click_weight
         
+        timed = (event_types == "game_time") | (event_types == "play_end")
+        weights[timed | (event_types == "play_start")] = self.settings.game_time_base_weight
+        
+        # Add log bonus for duration
+        bonus = timed & (durations > 0)
+        weights[bonus] += np.log(durations[bonus] + 1)
+        return weights
+    
+    def _calculate_rating_weights(self, ratings: np.ndarray) -> np.ndarray:
+        """Vectorized _calculate_rating_weight over a column of ratings."""
+        return self.settings.rating_1_weight + (
+            self.settings.rating_5_weight - self.settings.rating_1_weight
+        ) * (ratings - 1) / 4
+    
+    def _calculate_time_decays(
+        self,
+        timestamps: np.ndarray,
+        half_life_days: int,
+        now: float
+    ) -> np.ndarray:
+        """Vectorized _calculate_time_decay over Unix timestamps.
+        
+        Args:
+            timestamps: Event times as Unix seconds [num_rows]
+            half_life_days: Decay half-life in days
+            now: Reference time as Unix seconds
+            
+        Returns:
+            Decay factors [num_rows]
+        """
+        days_since = (now - timestamps) / 86400
+        return np.power(0.5, days_since / half_life_days)
+    
+    def _fetch_frames(
+        self,
+        name: str,
+        query: str,
+        columns: list[str],
+        params: tuple | dict = ()
+    ) -> Iterator[pd.DataFrame]:
+        """Stream a query through a server-side cursor as DataFrame chunks.
+        
+        Args:
+            name: Server-side cursor name
+            query: SQL query
+            columns: Column names for the result frames
+            params: Query parameters
+            
+        Yields:
+            One DataFrame per fetched chunk
+        """
+        chunk_size = self.settings.graph_fetch_chunk_size
         conn = self._get_connection()
-        since = datetime.now() - timedelta(days=lookback_days)
         
-        # Collect all interactions with weights
-        interactions: dict[tuple[str, str], float] = {}
+        with conn.cursor(name=name) as cur:
+            cur.itersize = chunk_size
+            cur.execute(query, params)
+            
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield pd.DataFrame.from_records(rows, columns=columns)
+    
+    def _weighted_event_frames(
+        self,
+        since: datetime,
+        now: float,
+        with_ids: bool = False
+    ) -> Iterator[pd.DataFrame]:
+        """Stream events with their decayed weights.
         
-        # Process events
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT user_id, game_slug, event_type, duration_seconds, created_at
+        Args:
+            since: Only events created at or after this time
+            now: Reference time for decay as Unix seconds
+            with_ids: Also return each event's primary key
+            
+        Yields:
+            DataFrames with user_id, game_slug, weight and created_us
+            (creation time in Unix microseconds) columns, plus event_id
+            if requested
+        """
+        columns = ["user_id", "game_slug", "event_type", "duration_seconds", "created_us"]
+        id_column = ""
+        if with_ids:
+            columns.append("event_id")
+            id_column = ", id::text"
+        
+        for frame in self._fetch_frames(
+            "graph_user_events",
+            f"""
+                SELECT user_id, game_slug, event_type, duration_seconds,
+                       (EXTRACT(EPOCH FROM created_at) * 1000000)::int8{id_column}
                 FROM user_events
                 WHERE created_at >= %s
-            """, (since,))
+            """,
+            columns,
+            (since,)
+        ):
+            weights = self._calculate_event_weights(
+                frame["event_type"].to_numpy(dtype=object),
+                frame["duration_seconds"].fillna(0).to_numpy(dtype=np.float64)
+            )
+            weights *= self._calculate_time_decays(
+                frame["created_us"].to_numpy(dtype=np.float64) / 1e6,
+                self.settings.behavior_half_life_days,
+                now
+            )
+            frame["weight"] = weights
+            yield frame
+    
+    def _collect_rating_interactions(
+        self,
+        now: float
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Collect decayed review and rating weights per (user, game).
+        
+        Ratings are skipped for pairs that also have a review.
+        
+        Args:
+            now: Reference time for decay as Unix seconds
             
-            for row in cur.fetchall():
-                user_id, game_slug, event_type, duration_seconds, created_at = row
-                
-                weight = self._calculate_event_weight(event_type, duration_seconds)
-                decay = self._calculate_time_decay(
-                    created_at, 
-                    self.settings.behavior_half_life_days
-                )
-                
-                key = (user_id, game_slug)
-                if key not in interactions:
-                    interactions[key] = 0.0
-                interactions[key] += weight * decay
+        Returns:
+            Tuple of (users, games, weights), one entry per distinct pair
+        """
+        partials: list[tuple[np.ndarray, np.ndarray, np.ndarray]] = []
         
         # Track games with reviews (to avoid double counting)
-        reviewed_games: set[tuple[str, str]] = set()
+        reviewed_users: list[np.ndarray] = []
+        reviewed_games: list[np.ndarray] = []
         
         # Process reviews (includes sentiment)
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT user_id, game_slug, rating, sentiment_score, updated_at
+        for frame in self._fetch_frames(
+            "graph_user_reviews",
+            """
+                SELECT user_id, game_slug, rating, sentiment_score,
+                       EXTRACT(EPOCH FROM updated_at)::float8
                 FROM user_reviews
-            """)
+            """,
+            ["user_id", "game_slug", "rating", "sentiment_score", "timestamp"]
+        ):
+            weights = self._calculate_rating_weights(
+                frame["rating"].to_numpy(dtype=np.float64)
+            )
             
-            for row in cur.fetchall():
-                user_id, game_slug, rating, sentiment_score, updated_at = row
-                
-                weight = self._calculate_rating_weight(rating)
-                
-                # Apply sentiment multiplier if available
-                if sentiment_score is not None:
-                    sentiment_multiplier = 1.0 + (float(sentiment_score) * 0.5)
-                    weight *= sentiment_multiplier
-                
-                decay = self._calculate_time_decay(
-                    updated_at,
-                    self.settings.rating_half_life_days
-                )
-                
-                key = (user_id, game_slug)
-                reviewed_games.add(key)
-                
-                if key not in interactions:
-                    interactions[key] = 0.0
-                interactions[key] += weight * decay
+            # Apply sentiment multiplier if available
+            sentiment = frame["sentiment_score"].astype(float).fillna(0).to_numpy()
+            weights *= 1.0 + sentiment * 0.5
+            
+            weights *= self._calculate_time_decays(
+                frame["timestamp"].to_numpy(dtype=np.float64),
+                self.settings.rating_half_life_days,
+                now
+            )
+            
+            users = frame["user_id"].to_numpy(dtype=object)
+            games = frame["game_slug"].to_numpy(dtype=object)
+            reviewed_users.append(users)
+            reviewed_games.append(games)
+            partials.append(aggregate_pairs(users, games, weights))
+        
+        # One lookup table over all reviewed pairs; its hash engine is
+        # built once and probed by every ratings chunk
+        reviewed = pd.MultiIndex.from_arrays([
+            np.concatenate(reviewed_users) if reviewed_users else np.empty(0, dtype=object),
+            np.concatenate(reviewed_games) if reviewed_games else np.empty(0, dtype=object)
+        ]).unique()
         
         # Process ratings (only for games without reviews)
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT user_id, game_slug, rating, updated_at
+        for frame in self._fetch_frames(
+            "graph_user_ratings",
+            """
+                SELECT user_id, game_slug, rating,
+                       EXTRACT(EPOCH FROM updated_at)::float8
                 FROM user_ratings
-            """)
+            """,
+            ["user_id", "game_slug", "rating", "timestamp"]
+        ):
+            users = frame["user_id"].to_numpy(dtype=object)
+            games = frame["game_slug"].to_numpy(dtype=object)
+            
+            keep = reviewed.get_indexer(pd.MultiIndex.from_arrays([users, games])) < 0
             
-            for row in cur.fetchall():
-                user_id, game_slug, rating, updated_at = row
-                
-                key = (user_id, game_slug)
-                if key in reviewed_games:
-                    continue  # Skip, already processed in reviews
-                
-                weight = self._calculate_rating_weight(rating)
-                decay = self._calculate_time_decay(
-                    updated_at,
-                    self.settings.rating_half_life_days
+            weights = self._calculate_rating_weights(
+                frame["rating"].to_numpy(dtype=np.float64)
+            )
+            weights *= self._calculate_time_decays(
+                frame["timestamp"].to_numpy(dtype=np.float64),
+                self.settings.rating_half_life_days,
+                now
+            )
+            partials.append(aggregate_pairs(users[keep], games[keep], weights[keep]))
+        
+        return merge_pairs(partials)
+    
+    def _collect_interactions(
+        self,
+        lookback_days: int
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Collect one decayed weight per (user, game) from all sources.
+        
+        Events, reviews and ratings are fetched in chunks, weighted and
+        decayed as array operations, and reduced per pair as they stream in.
+        
+        Returns:
+            Tuple of (users, games, weights), one entry per distinct pair
+        """
+        since = datetime.now() - timedelta(days=lookback_days)
+        now = time.time()
+        partials: list[tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        
+        # Process events
+        for frame in self._weighted_event_frames(since, now):
+            partials.append(aggregate_pairs(
+                frame["user_id"].to_numpy(dtype=object),
+                frame["game_slug"].to_numpy(dtype=object),
+                frame["weight"].to_numpy(dtype=np.float64)
+            ))
+        
+        partials.append(self._collect_rating_interactions(now))
+        return merge_pairs(partials)
+    
+    def _collect_interactions_pushdown(
+        self,
+        lookback_days: int
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Collect one decayed weight per (user, game), aggregated in SQL.
+        
+        Same weighting as _collect_interactions, but each source is reduced
+        with GROUP BY user_id, game_slug so only one row per edge leaves the
+        database. Review-over-rating precedence is an anti-join.
+        
+        Returns:
+            Tuple of (users, games, weights), one entry per distinct pair
+        """
+        params = {
+            "since": datetime.now() - timedelta(days=lookback_days),
+            "impression_weight": self.settings.impression_weight,
+            "click_weight": self.settings.click_weight,
+            "game_time_base_weight": self.settings.game_time_base_weight,
+            "rating_1_weight": self.settings.rating_1_weight,
+            "rating_5_weight": self.settings.rating_5_weight,
+            "behavior_half_life_days": float(self.settings.behavior_half_life_days),
+            "rating_half_life_days": float(self.settings.rating_half_life_days),
+        }
+        rating_weight = """
+            (%(rating_1_weight)s::float8
+             + (%(rating_5_weight)s::float8 - %(rating_1_weight)s::float8) * (r.rating - 1) / 4.0)
+        """
+        rating_decay = """
+            POWER(0.5::float8,
+                  EXTRACT(EPOCH FROM (NOW() - r.updated_at))::float8 / 86400.0
+                  / %(rating_half_life_days)s::float8)
+        """
+        columns = ["user_id", "game_slug", "weight"]
+        partials: list[tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        
+        queries = [
+            ("graph_user_events_agg", """
+                SELECT e.user_id, e.game_slug, SUM(
+                    (CASE
+                        WHEN e.event_type = 'impression' THEN %(impression_weight)s::float8
+                        WHEN e.event_type = 'click' THEN %(click_weight)s::float8
+                        WHEN e.event_type IN ('game_time', 'play_end', 'play_start')
+                            THEN %(game_time_base_weight)s::float8
+                        ELSE 0.0
+                     END
+                     + CASE
+                        WHEN e.event_type IN ('game_time', 'play_end') AND e.duration_seconds > 0
+                            THEN LN(e.duration_seconds + 1.0)
+                        ELSE 0.0
+                     END)
+                    * POWER(0.5::float8,
+                            EXTRACT(EPOCH FROM (NOW() - e.created_at))::float8 / 86400.0
+                            / %(behavior_half_life_days)s::float8)
+                )
+                FROM user_events e
+                WHERE e.created_at >= %(since)s
+                GROUP BY e.user_id, e.game_slug
+            """),
+            ("graph_user_reviews_agg", f"""
+                SELECT r.user_id, r.game_slug, SUM(
+                    {rating_weight}
+                    * (1.0 + COALESCE(r.sentiment_score, 0)::float8 * 0.5)
+                    * {rating_decay}
                 )
-                
-                if key not in interactions:
-                    interactions[key] = 0.0
-                interactions[key] += weight * decay
+                FROM user_reviews r
+                GROUP BY r.user_id, r.game_slug
+            """),
+            ("graph_user_ratings_agg", f"""
+                SELECT r.user_id, r.game_slug, SUM({rating_weight} * {rating_decay})
+                FROM user_ratings r
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM user_reviews v
+                    WHERE v.user_id = r.user_id AND v.game_slug = r.game_slug
+                )
+                GROUP BY r.user_id, r.game_slug
+            """),
+        ]
+        
+        for name, query in queries:
+            for frame in self._fetch_frames(name, query, columns, params):
+                partials.append((
+                    frame["user_id"].to_numpy(dtype=object),
+                    frame["game_slug"].to_numpy(dtype=object),
+                    frame["weight"].to_numpy(dtype=np.float64)
+                ))
+        
+        return merge_pairs(partials)
+    
+    def _assemble_graph(
+        self,
+        users: np.ndarray,
+        games: np.ndarray,
+        weights: np.ndarray
+    ) -> GraphData:
+        """Build GraphData from one aggregated weight per (user, game).
         
-        # Build graph data
+        Args:
+            users: User IDs [num_pairs]
+            games: Game slugs [num_pairs]
+            weights: Aggregated pair weights [num_pairs]
+            
+        Returns:
+            GraphData with sorted ID mappings and symmetric edges
+        """
         graph_data = GraphData()
         
         # Filter out negative weights (disliked items shouldn't create positive edges)
-        positive_interactions = {
-            k: v for k, v in interactions.items() if v > 0
-        }
-        
-        if not positive_interactions:
+        positive = weights > 0
+        if not positive.any():
             logger.warning("No positive interactions found")
             return graph_data
         
-        # Build ID mappings
-        users = sorted(set(k[0] for k in positive_interactions.keys()))
-        games = sorted(set(k[1] for k in positive_interactions.keys()))
+        users, games, weights = users[positive], games[positive], weights[positive]
+        
+        # Build ID mappings (np.unique sorts, matching sorted() on strings)
+        user_ids, user_idx = np.unique(users, return_inverse=True)
+        game_slugs, game_idx = np.unique(games, return_inverse=True)
         
-        graph_data.user_id_to_idx = {uid: idx for idx, uid in enumerate(users)}
+        graph_data.user_id_to_idx = {uid: idx for idx, uid in enumerate(user_ids.tolist())}
         graph_data.idx_to_user_id = {idx: uid for uid, idx in graph_data.user_id_to_idx.items()}
-        graph_data.game_slug_to_idx = {slug: idx for idx, slug in enumerate(games)}
+        graph_data.game_slug_to_idx = {slug: idx for idx, slug in enumerate(game_slugs.tolist())}
         graph_data.idx_to_game_slug = {idx: slug for slug, idx in graph_data.game_slug_to_idx.items()}
         
-        graph_data.num_users = len(users)
-        graph_data.num_games = len(games)
+        graph_data.num_users = len(user_ids)
+        graph_data.num_games = len(game_slugs)
         
         # Build edge tensors
         # For bipartite graph: users are nodes 0 to num_users-1
         # items are nodes num_users to num_users+num_items-1
-        src_nodes = []  # User indices
-        dst_nodes = []  # Game indices (offset by num_users)
-        weights = []
+        order = np.lexsort((game_idx, user_idx))
+        user_nodes = user_idx[order].astype(np.int64)
+        game_nodes = game_idx[order].astype(np.int64) + graph_data.num_users
+        weights = weights[order]
+        
+        # Interleave both directions: user->game, then game->user (reverse edge for GCN)
+        num_pairs = len(order)
+        src_nodes = np.empty(2 * num_pairs, dtype=np.int64)
+        dst_nodes = np.empty(2 * num_pairs, dtype=np.int64)
+        src_nodes[0::2], src_nodes[1::2] = user_nodes, game_nodes
+        dst_nodes[0::2], dst_nodes[1::2] = game_nodes, user_nodes
+        
+        graph_data.set_edges(
+            torch.from_numpy(np.stack([src_nodes, dst_nodes])),
+            torch.from_numpy(np.repeat(weights, 2).astype(np.float32))
+        )
         
-        for (user_id, game_slug), weight in positive_interactions.items():
-            user_idx = graph_data.user_id_to_idx[user_id]
-            game_idx = graph_data.game_slug_to_idx[game_slug]
-            
-            # Add edges in both directions (user->game and game->user)
-            # User to game
-            src_nodes.append(user_idx)
-            dst_nodes.append(graph_data.num_users + game_idx)
-            weights.append(weight)
+        return graph_data
+    
+    def build_graph(self, lookback_days: int = 30) -> GraphData:
+        """Build bipartite graph from interaction data.
+        
+        Args:
+            lookback_days: Number of days of history to include
             
-            # Game to user (reverse edge for GCN)
-            src_nodes.append(graph_data.num_users + game_idx)
-            dst_nodes.append(user_idx)
-            weights.append(weight)
+        Returns:
+            GraphData with edge index and weights
+        """
+        logger.info(
+            "Building interaction graph",
+            lookback_days=lookback_days,
+            pushdown=self.pushdown
+        )
+        
+        if self.pushdown:
+            users, games, weights = self._collect_interactions_pushdown(lookback_days)
+        else:
+            users, games, weights = self._collect_interactions(lookback_days)
+        graph_data = self._assemble_graph(users, games, weights)
         
-        graph_data.edge_index = torch.tensor([src_nodes, dst_nodes], dtype=torch.long)
-        graph_data.edge_weight = torch.tensor(weights, dtype=torch.float32)
-        graph_data.num_edges = len(weights)
+        if graph_data.num_edges == 0:
+            return graph_data
         
         logger.info(
             "Graph built successfully",
@@ -276,7 +722,8 @@ class GraphBuilder:
     ) -> GraphData:
         """Add a new interaction to an existing graph.
         
-        For real-time updates. Creates new user/game nodes if needed.
+        For real-time updates. Repeated interactions add to the weight of
+        the existing edge pair; new nodes still require a rebuild.
         
         Args:
             graph_data: Existing graph data
@@ -306,24 +753,9 @@ class GraphBuilder:
         
         user_idx = graph_data.user_id_to_idx[user_id]
         game_idx = graph_data.game_slug_to_idx[game_slug]
-        game_node_idx = graph_data.num_users + game_idx
-        
-        # Add new edges
-        new_src = torch.tensor([user_idx, game_node_idx], dtype=torch.long)
-        new_dst = torch.tensor([game_node_idx, user_idx], dtype=torch.long)
-        new_weights = torch.tensor([weight, weight], dtype=torch.float32)
-        
-        graph_data.edge_index = torch.cat([
-            graph_data.edge_index,
-            torch.stack([new_src, new_dst])
-        ], dim=1)
-        
-        graph_data.edge_weight = torch.cat([
-            graph_data.edge_weight,
-            new_weights
-        ])
         
-        graph_data.num_edges += 2
+        # Merge into the existing edge pair or append a new one
+        graph_data.upsert_edge(user_idx, game_idx, weight)
         
         return graph_data
 
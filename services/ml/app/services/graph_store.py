@@ -0,0 +1,364 @@
+"""Incremental graph store for the LightGCN interaction graph.
+
+Persists the aggregated behavior weight of every (user, game) edge together
+with a created_at watermark, so a rebuild only fetches events that arrived
+since the previous one instead of rescanning the whole lookback window.
+
+created_at is the inserting transaction's start time, so an event can
+commit after a refresh with a created_at below that refresh's watermark.
+Each refresh therefore re-reads graph_watermark_overlap seconds below the
+watermark and skips events already folded in, by id; the ids of events in
+that window are persisted with the store.
+"""
+
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+import structlog
+
+from app.config import get_settings
+from app.services.graph_builder import GraphBuilder, GraphData, merge_pairs
+
+logger = structlog.get_logger()
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+@dataclass
+class EdgeTable:
+    """Aggregated behavior edges carried between rebuilds."""
+    
+    # Append-only ID tables (edge_users / edge_games index into these)
+    user_ids: list[str] = field(default_factory=list)
+    game_slugs: list[str] = field(default_factory=list)
+    
+    # Per-edge columns
+    edge_users: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    edge_games: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    behavior_weight: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.float64))
+    last_event_us: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    
+    # Latest created_at folded in, and the time behavior_weight is decayed to
+    watermark_us: int = 0
+    decayed_at: float = 0.0
+    lookback_days: int = 0
+    
+    # Events folded in within the overlap window below the watermark (None
+    # for stores saved before ids were kept: the next refresh can't dedupe)
+    recent_event_ids: Optional[np.ndarray] = field(default_factory=lambda: np.zeros(0, dtype=str))
+    recent_event_us: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    
+    @property
+    def num_edges(self) -> int:
+        return len(self.behavior_weight)
+
+
+class IncrementalGraphStore:
+    """Maintains the bipartite graph incrementally across rebuilds.
+    
+    Behavior weights decay multiplicatively, so edges folded in earlier are
+    brought up to date by rescaling them with 0.5 ** (dt / half_life) before
+    new events are added. Ratings and reviews are small and mutable, so their
+    contribution is recomputed on every refresh.
+    
+    Edges expire once their latest event leaves the lookback window. An edge
+    that is still active keeps the (heavily decayed) contribution of its
+    older events, where a full rebuild would drop them; a full rebuild
+    resets this drift.
+    """
+    
+    def __init__(
+        self,
+        graph_builder: Optional[GraphBuilder] = None,
+        path: Optional[str] = None
+    ):
+        """Initialize store.
+        
+        Args:
+            graph_builder: Builder used for queries and graph assembly
+            path: Persisted store location (defaults to config)
+        """
+        self.settings = get_settings()
+        self.graph_builder = graph_builder or GraphBuilder(pushdown=False)
+        self.path = path or self.settings.graph_store_path
+        self.edges: Optional[EdgeTable] = None
+        
+        # Lookups into the append-only ID tables
+        self._user_lookup: dict[str, int] = {}
+        self._game_lookup: dict[str, int] = {}
+    
+    def close(self):
+        """Close the builder's database connection."""
+        self.graph_builder.close()
+    
+    def _reset(self, lookback_days: int):
+        """Start over with an empty edge table."""
+        self.edges = EdgeTable(lookback_days=lookback_days, decayed_at=time.time())
+        self._user_lookup = {}
+        self._game_lookup = {}
+    
+    def load(self) -> bool:
+        """Load the persisted edge table.
+        
+        Returns:
+            True if a store was loaded
+        """
+        if not os.path.exists(self.path):
+            return False
+        
+        try:
+            with np.load(self.path) as data:
+                self.edges = EdgeTable(
+                    user_ids=data["user_ids"].tolist(),
+                    game_slugs=data["game_slugs"].tolist(),
+                    edge_users=data["edge_users"],
+                    edge_games=data["edge_games"],
+                    behavior_weight=data["behavior_weight"],
+                    last_event_us=data["last_event_us"],
+                    watermark_us=int(data["watermark_us"]),
+                    decayed_at=float(data["decayed_at"]),
+                    lookback_days=int(data["lookback_days"]),
+                    recent_event_ids=data["recent_event_ids"] if "recent_event_ids" in data else None,
+                    recent_event_us=(
+                        data["recent_event_us"] if "recent_event_us" in data
+                        else np.zeros(0, dtype=np.int64)
+                    )
+                )
+        except Exception as e:
+            logger.error("Failed to load graph store", path=self.path, error=str(e))
+            self.edges = None
+            return False
+        
+        self._user_lookup = {uid: idx for idx, uid in enumerate(self.edges.user_ids)}
+        self._game_lookup = {slug: idx for idx, slug in enumerate(self.edges.game_slugs)}
+        
+        logger.info(
+            "Graph store loaded",
+            path=self.path,
+            num_edges=self.edges.num_edges,
+            watermark_us=self.edges.watermark_us
+        )
+        return True
+    
+    def save(self):
+        """Persist the edge table atomically."""
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        
+        edges = self.edges
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                user_ids=np.array(edges.user_ids, dtype=str),
+                game_slugs=np.array(edges.game_slugs, dtype=str),
+                edge_users=edges.edge_users,
+                edge_games=edges.edge_games,
+                behavior_weight=edges.behavior_weight,
+                last_event_us=edges.last_event_us,
+                watermark_us=np.int64(edges.watermark_us),
+                decayed_at=np.float64(edges.decayed_at),
+                lookback_days=np.int64(edges.lookback_days),
+                recent_event_ids=(
+                    edges.recent_event_ids if edges.recent_event_ids is not None
+                    else np.zeros(0, dtype=str)
+                ),
+                recent_event_us=edges.recent_event_us
+            )
+        os.replace(tmp_path, self.path)
+    
+    def _intern(self, values: np.ndarray, table: list[str], lookup: dict[str, int]) -> np.ndarray:
+        """Map IDs to stable indices, appending unseen IDs to the table."""
+        codes, uniques = pd.factorize(values)
+        indices = np.empty(len(uniques), dtype=np.int64)
+        
+        for i, value in enumerate(uniques):
+            idx = lookup.get(value)
+            if idx is None:
+                idx = len(table)
+                table.append(value)
+                lookup[value] = idx
+            indices[i] = idx
+        
+        return indices[codes]
+    
+    def _rescale(self, now: float):
+        """Decay all behavior weights from decayed_at to now."""
+        edges = self.edges
+        days = (now - edges.decayed_at) / 86400
+        edges.behavior_weight *= 0.5 ** (days / self.settings.behavior_half_life_days)
+        edges.decayed_at = now
+    
+    def _fold_events(self, since: datetime, now: float, overlap_us: int) -> int:
+        """Add events created at or after `since` to the edge table.
+        
+        Events whose id is in recent_event_ids were folded in by an earlier
+        refresh and are skipped. Afterwards recent_event_ids holds the
+        events created within overlap_us of the new watermark.
+        
+        Returns:
+            Number of events folded in
+        """
+        edges = self.edges
+        num_events = 0
+        chunks: list[pd.DataFrame] = []
+        
+        known = edges.recent_event_ids
+        if known is None:
+            known = np.zeros(0, dtype=str)
+        
+        # Hash table over the already folded ids, built once for all chunks
+        seen = pd.Index(known)
+        recent_ids = [known]
+        recent_us = [edges.recent_event_us]
+        latest_us = edges.watermark_us
+        
+        for frame in self.graph_builder._weighted_event_frames(since, now, with_ids=True):
+            if len(seen):
+                frame = frame[seen.get_indexer(frame["event_id"]) < 0]
+            if frame.empty:
+                continue
+            
+            num_events += len(frame)
+            created = frame["created_us"].to_numpy(dtype=np.int64)
+            latest_us = max(latest_us, int(created.max()))
+            
+            # Only events near the (running) watermark can be re-read later
+            near = created >= latest_us - overlap_us
+            recent_ids.append(frame["event_id"].to_numpy(dtype=str)[near])
+            recent_us.append(created[near])
+            
+            chunks.append(frame.groupby(["user_id", "game_slug"], sort=False).agg(
+                weight=("weight", "sum"),
+                created_us=("created_us", "max")
+            ))
+        
+        ids = np.concatenate(recent_ids)
+        created = np.concatenate(recent_us)
+        keep = created >= latest_us - overlap_us
+        edges.recent_event_ids = ids[keep]
+        edges.recent_event_us = created[keep]
+        
+        if not chunks:
+            return 0
+        
+        grouped = pd.concat(chunks)
+        if len(chunks) > 1:
+            grouped = grouped.groupby(level=[0, 1], sort=False).agg(
+                weight=("weight", "sum"),
+                created_us=("created_us", "max")
+            )
+        
+        users = self._intern(
+            grouped.index.get_level_values(0).to_numpy(dtype=object),
+            edges.user_ids,
+            self._user_lookup
+        )
+        games = self._intern(
+            grouped.index.get_level_values(1).to_numpy(dtype=object),
+            edges.game_slugs,
+            self._game_lookup
+        )
+        weights = grouped["weight"].to_numpy(dtype=np.float64)
+        created_us = grouped["created_us"].to_numpy(dtype=np.int64)
+        
+        # Merge into existing edges, append the rest
+        existing = pd.Index((edges.edge_users << 32) | edges.edge_games)
+        slots = existing.get_indexer((users << 32) | games)
+        found = slots >= 0
+        
+        edges.behavior_weight[slots[found]] += weights[found]
+        edges.last_event_us[slots[found]] = np.maximum(
+            edges.last_event_us[slots[found]], created_us[found]
+        )
+        
+        new = ~found
+        edges.edge_users = np.concatenate([edges.edge_users, users[new]])
+        edges.edge_games = np.concatenate([edges.edge_games, games[new]])
+        edges.behavior_weight = np.concatenate([edges.behavior_weight, weights[new]])
+        edges.last_event_us = np.concatenate([edges.last_event_us, created_us[new]])
+        
+        edges.watermark_us = max(edges.watermark_us, int(created_us.max()))
+        
+        return num_events
+    
+    def _expire(self, cutoff_us: int) -> int:
+        """Drop edges whose latest event is older than cutoff_us.
+        
+        Returns:
+            Number of edges dropped
+        """
+        edges = self.edges
+        keep = edges.last_event_us >= cutoff_us
+        num_expired = int((~keep).sum())
+        
+        if num_expired:
+            edges.edge_users = edges.edge_users[keep]
+            edges.edge_games = edges.edge_games[keep]
+            edges.behavior_weight = edges.behavior_weight[keep]
+            edges.last_event_us = edges.last_event_us[keep]
+        
+        return num_expired
+    
+    def refresh(self, lookback_days: int = 30, full: bool = False) -> GraphData:
+        """Bring the graph up to date and return it.
+        
+        Args:
+            lookback_days: Number of days of history to include
+            full: Discard the persisted store and rebuild from scratch
+            
+        Returns:
+            GraphData equivalent to GraphBuilder.build_graph
+        """
+        if self.edges is None and not full:
+            self.load()
+        
+        if full or self.edges is None or self.edges.lookback_days != lookback_days:
+            self._reset(lookback_days)
+        
+        edges = self.edges
+        now = time.time()
+        cutoff_us = int((now - lookback_days * 86400) * 1e6)
+        overlap_us = int(self.settings.graph_watermark_overlap * 1e6)
+        
+        # Re-read the overlap window for late commits, unless the store has
+        # no ids to dedupe it against
+        if edges.recent_event_ids is None:
+            start_us = max(edges.watermark_us + 1, cutoff_us)
+        else:
+            start_us = max(edges.watermark_us - overlap_us, cutoff_us)
+        since = _EPOCH + timedelta(microseconds=start_us)
+        
+        self._rescale(now)
+        num_events = self._fold_events(since, now, overlap_us)
+        num_expired = self._expire(cutoff_us)
+        
+        # Ratings and reviews are recomputed in full
+        rating_pairs = self.graph_builder._collect_rating_interactions(now)
+        
+        table_users = np.array(edges.user_ids, dtype=object)
+        table_games = np.array(edges.game_slugs, dtype=object)
+        users, games, weights = merge_pairs([
+            (table_users[edges.edge_users], table_games[edges.edge_games], edges.behavior_weight),
+            rating_pairs
+        ])
+        graph_data = self.graph_builder._assemble_graph(users, games, weights)
+        
+        self.save()
+        
+        logger.info(
+            "Graph store refreshed",
+            new_events=num_events,
+            expired_edges=num_expired,
+            stored_edges=edges.num_edges,
+            num_users=graph_data.num_users,
+            num_games=graph_data.num_games,
+            num_edges=graph_data.num_edges
+        )
+        
+        return graph_data
@@ -31,14 +31,17 @@ logger = structlog.get_logger()
 class HeteroGraphBuilder:
     """Builds heterogeneous graphs from PostgreSQL and CMS data."""
     
-    def __init__(self, cms_url: Optional[str] = None):
+    def __init__(self, cms_url: Optional[str] = None, pushdown: Optional[bool] = None):
         """Initialize builder.
         
         Args:
             cms_url: CMS API URL (defaults to config)
+            pushdown: Aggregate edge weights in PostgreSQL instead of
+                Python (defaults to config)
         """
         self.settings = get_settings()
         self.cms_url = cms_url or "http://cms:3001"
+        self.pushdown = self.settings.graph_pushdown if pushdown is None else pushdown
         self._conn = None
     
     def _get_connection(self):
@@ -99,99 +102,23 @@ class HeteroGraphBuilder:
             logger.warning("Failed to fetch CMS data", error=str(e))
             return {"games": [], "promotions": []}
     
-    def build_graph(self, lookback_days: int = 30) -> HeteroGraphData:
-        """Build heterogeneous graph from all data sources.
+    def _collect_interactions(
+        self,
+        graph: HeteroGraphData,
+        since: datetime
+    ) -> Tuple[Dict[str, Dict[str, float]], Dict[str, Dict[str, float]], Dict[str, set]]:
+        """Collect played/rated weights and devices row by row.
+        
+        Registers user and game nodes on the graph as they are seen.
         
         Args:
-            lookback_days: Days of interaction history to include
+            graph: Graph whose user/game mappings are extended
+            since: Start of the event window
             
         Returns:
-            HeteroGraphData with all nodes and edges
+            Tuple of (played weights, rated weights, devices) keyed by user
         """
-        logger.info("Building heterogeneous graph", lookback_days=lookback_days)
-        
-        graph = HeteroGraphData()
         conn = self._get_connection()
-        since = datetime.now() - timedelta(days=lookback_days)
-        
-        # ============================================
-        # Collect nodes from CMS
-        # ============================================
-        cms_data = self._fetch_cms_data()
-        
-        # Process games
-        providers = set()
-        badges = set()
-        game_providers: Dict[str, str] = {}  # game_slug -> provider
-        game_badges: Dict[str, List[str]] = {}  # game_slug -> badges
-        
-        for game in cms_data["games"]:
-            slug = game.get("slug")
-            if not slug:
-                continue
-            
-            if slug not in graph.game_slug_to_idx:
-                idx = len(graph.game_slug_to_idx)
-                graph.game_slug_to_idx[slug] = idx
-                graph.idx_to_game_slug[idx] = slug
-            
-            # Extract provider
-            provider = game.get("provider")
-            if provider:
-                provider_name = provider.get("name") if isinstance(provider, dict) else str(provider)
-                if provider_name:
-                    providers.add(provider_name)
-                    game_providers[slug] = provider_name
-            
-            # Extract badges
-            game_badge_list = game.get("badges", [])
-            if game_badge_list:
-                badge_names = []
-                for badge in game_badge_list:
-                    badge_name = badge.get("name") if isinstance(badge, dict) else str(badge)
-                    if badge_name:
-                        badges.add(badge_name)
-                        badge_names.append(badge_name)
-                if badge_names:
-                    game_badges[slug] = badge_names
-        
-        # Create provider mappings
-        for provider in sorted(providers):
-            idx = len(graph.provider_to_idx)
-            graph.provider_to_idx[provider] = idx
-            graph.idx_to_provider[idx] = provider
-        
-        # Create badge mappings
-        for badge in sorted(badges):
-            idx = len(graph.badge_to_idx)
-            graph.badge_to_idx[badge] = idx
-        
-        # Process promotions
-        promo_games: Dict[str, List[str]] = {}  # promo_id -> games
-        
-        for promo in cms_data["promotions"]:
-            promo_id = promo.get("id") or promo.get("slug")
-            if not promo_id:
-                continue
-            
-            if promo_id not in graph.promotion_to_idx:
-                idx = len(graph.promotion_to_idx)
-                graph.promotion_to_idx[promo_id] = idx
-                graph.idx_to_promotion[idx] = promo_id
-            
-            # Extract featured games
-            featured = promo.get("featuredGames", [])
-            game_slugs = []
-            for g in featured:
-                slug = g.get("slug") if isinstance(g, dict) else str(g)
-                if slug and slug in graph.game_slug_to_idx:
-                    game_slugs.append(slug)
-            if game_slugs:
-                promo_games[promo_id] = game_slugs
-        
-        # ============================================
-        # Collect user interactions from PostgreSQL
-        # ============================================
         
         user_games_played: Dict[str, Dict[str, float]] = {}  # user -> game -> weight
         user_games_rated: Dict[str, Dict[str, float]] = {}
@@ -294,6 +221,225 @@ class HeteroGraphBuilder:
                         weight
                     )
         
+        return user_games_played, user_games_rated, user_devices
+    
+    def _collect_interactions_pushdown(
+        self,
+        graph: HeteroGraphData,
+        since: datetime
+    ) -> Tuple[Dict[str, Dict[str, float]], Dict[str, Dict[str, float]], Dict[str, set]]:
+        """Collect played/rated weights and devices, aggregated in SQL.
+        
+        Same weighting as _collect_interactions, but events are reduced with
+        GROUP BY user_id, game_slug and devices with DISTINCT, so only one
+        row per edge (or per user device) leaves the database.
+        
+        Args:
+            graph: Graph whose user/game mappings are extended
+            since: Start of the event window
+            
+        Returns:
+            Tuple of (played weights, rated weights, devices) keyed by user
+        """
+        conn = self._get_connection()
+        params = {
+            "since": since,
+            "impression_weight": self.settings.impression_weight,
+            "click_weight": self.settings.click_weight,
+            "game_time_base_weight": self.settings.game_time_base_weight,
+            "rating_1_weight": self.settings.rating_1_weight,
+            "rating_5_weight": self.settings.rating_5_weight,
+        }
+        
+        user_games_played: Dict[str, Dict[str, float]] = {}  # user -> game -> weight
+        user_games_rated: Dict[str, Dict[str, float]] = {}
+        user_devices: Dict[str, set] = {}  # user -> devices
+        
+        def add_user(user_id: str):
+            if user_id not in graph.user_id_to_idx:
+                idx = len(graph.user_id_to_idx)
+                graph.user_id_to_idx[user_id] = idx
+                graph.idx_to_user_id[idx] = user_id
+        
+        def add_game(game_slug: str):
+            if game_slug not in graph.game_slug_to_idx:
+                idx = len(graph.game_slug_to_idx)
+                graph.game_slug_to_idx[game_slug] = idx
+                graph.idx_to_game_slug[idx] = game_slug
+        
+        # Process events
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT user_id, game_slug, SUM(
+                    CASE
+                        WHEN event_type = 'impression' THEN %(impression_weight)s::float8
+                        WHEN event_type = 'click' THEN %(click_weight)s::float8
+                        WHEN event_type IN ('game_time', 'play_end', 'play_start')
+                            THEN %(game_time_base_weight)s::float8
+                                 + CASE WHEN duration_seconds > 0
+                                        THEN LN(duration_seconds + 1.0) ELSE 0.0 END
+                        ELSE 1.0
+                    END
+                )
+                FROM user_events
+                WHERE created_at >= %(since)s
+                GROUP BY user_id, game_slug
+            """, params)
+            
+            for user_id, game_slug, weight in cur.fetchall():
+                add_user(user_id)
+                add_game(game_slug)
+                if weight > 0:
+                    user_games_played.setdefault(user_id, {})[game_slug] = weight
+        
+        # Extract devices from metadata
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT DISTINCT user_id, device
+                FROM (
+                    SELECT user_id, COALESCE(
+                        NULLIF(metadata->>'device', ''),
+                        NULLIF(metadata->>'deviceType', '')
+                    ) AS device
+                    FROM user_events
+                    WHERE created_at >= %(since)s AND metadata IS NOT NULL
+                ) d
+                WHERE device IS NOT NULL
+            """, params)
+            
+            for user_id, device in cur.fetchall():
+                user_devices.setdefault(user_id, set()).add(device)
+        
+        # Process ratings and reviews (max of the positive weights per pair)
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT
+                    COALESCE(r.user_id, v.user_id),
+                    COALESCE(r.game_slug, v.game_slug),
+                    r.user_id IS NOT NULL,
+                    %(rating_1_weight)s::float8
+                        + (%(rating_5_weight)s::float8 - %(rating_1_weight)s::float8)
+                        * (r.rating - 1) / 4.0,
+                    (%(rating_1_weight)s::float8
+                        + (%(rating_5_weight)s::float8 - %(rating_1_weight)s::float8)
+                        * (v.rating - 1) / 4.0)
+                    * (1.0 + COALESCE(v.sentiment_score, 0)::float8 * 0.5)
+                FROM user_ratings r
+                FULL OUTER JOIN user_reviews v
+                    ON v.user_id = r.user_id AND v.game_slug = r.game_slug
+            """, params)
+            
+            for user_id, game_slug, has_rating, rating_weight, review_weight in cur.fetchall():
+                add_user(user_id)
+                # Reviews alone do not introduce game nodes
+                if has_rating:
+                    add_game(game_slug)
+                
+                weight = max(rating_weight or 0, review_weight or 0)
+                if weight > 0:
+                    user_games_rated.setdefault(user_id, {})[game_slug] = weight
+        
+        return user_games_played, user_games_rated, user_devices
+    
+    def build_graph(self, lookback_days: int = 30) -> HeteroGraphData:
+        """Build heterogeneous graph from all data sources.
+        
+        Args:
+            lookback_days: Days of interaction history to include
+            
+        Returns:
+            HeteroGraphData with all nodes and edges
+        """
+        logger.info("Building heterogeneous graph", lookback_days=lookback_days)
+        
+        graph = HeteroGraphData()
+        since = datetime.now() - timedelta(days=lookback_days)
+        
+        # ============================================
+        # Collect nodes from CMS
+        # ============================================
+        cms_data = self._fetch_cms_data()
+        
+        # Process games
+        providers = set()
+        badges = set()
+        game_providers: Dict[str, str] = {}  # game_slug -> provider
+        game_badges: Dict[str, List[str]] = {}  # game_slug -> badges
+        
+        for game in cms_data["games"]:
+            slug = game.get("slug")
+            if not slug:
+                continue
+            
+            if slug not in graph.game_slug_to_idx:
+                idx = len(graph.game_slug_to_idx)
+                graph.game_slug_to_idx[slug] = idx
+                graph.idx_to_game_slug[idx] = slug
+            
+            # Extract provider
+            provider = game.get("provider")
+            if provider:
+                provider_name = provider.get("name") if isinstance(provider, dict) else str(provider)
+                if provider_name:
+                    providers.add(provider_name)
+                    game_providers[slug] = provider_name
+            
+            # Extract badges
+            game_badge_list = game.get("badges", [])
+            if game_badge_list:
+                badge_names = []
+                for badge in game_badge_list:
+                    badge_name = badge.get("name") if isinstance(badge, dict) else str(badge)
+                    if badge_name:
+                        badges.add(badge_name)
+                        badge_names.append(badge_name)
+                if badge_names:
+                    game_badges[slug] = badge_names
+        
+        # Create provider mappings
+        for provider in sorted(providers):
+            idx = len(graph.provider_to_idx)
+            graph.provider_to_idx[provider] = idx
+            graph.idx_to_provider[idx] = provider
+        
+        # Create badge mappings
+        for badge in sorted(badges):
+            idx = len(graph.badge_to_idx)
+            graph.badge_to_idx[badge] = idx
+        
+        # Process promotions
+        promo_games: Dict[str, List[str]] = {}  # promo_id -> games
+        
+        for promo in cms_data["promotions"]:
+            promo_id = promo.get("id") or promo.get("slug")
+            if not promo_id:
+                continue
+            
+            if promo_id not in graph.promotion_to_idx:
+                idx = len(graph.promotion_to_idx)
+                graph.promotion_to_idx[promo_id] = idx
+                graph.idx_to_promotion[idx] = promo_id
+            
+            # Extract featured games
+            featured = promo.get("featuredGames", [])
+            game_slugs = []
+            for g in featured:
+                slug = g.get("slug") if isinstance(g, dict) else str(g)
+                if slug and slug in graph.game_slug_to_idx:
+                    game_slugs.append(slug)
+            if game_slugs:
+                promo_games[promo_id] = game_slugs
+        
+        # ============================================
+        # Collect user interactions from PostgreSQL
+        # ============================================
+        
+        collect = (
+            self._collect_interactions_pushdown if self.pushdown
+            else self._collect_interactions
+        )
+        user_games_played, user_games_rated, user_devices = collect(graph, since)
+        
         # Create device mappings
         all_devices = set()
         for devices in user_devices.values():
@@ -1,14 +1,11 @@
 """Training pipeline for HGT (Heterogeneous Graph Transformer) model."""
 
-import os
-import random
 from pathlib import Path
-from typing import Optional, List, Tuple, Dict
+from typing import Callable, Optional, List, Tuple, Dict
 
 import torch
 import torch.optim as optim
 import torch.nn.functional as F
-from torch.utils.data import Dataset, DataLoader
 import structlog
 
 from app.config import get_settings
@@ -16,71 +13,27 @@ from app.models.hgt import (
     HGT, HGTInference, HeteroGraphData,
     NodeType, EdgeType
 )
+from app.services.model_artifacts import (
+    InferenceBundle, artifact_exists, load_checkpoint, save_artifact
+)
+from app.services.sampling import BPRSampler
 
 logger = structlog.get_logger()
 
+# Artifact ID table -> HeteroGraphData mapping attribute
+ID_TABLES = {
+    "users": "user_id_to_idx",
+    "games": "game_slug_to_idx",
+    "providers": "provider_to_idx",
+    "promotions": "promotion_to_idx",
+    "devices": "device_to_idx",
+    "badges": "badge_to_idx"
+}
 
-class HGTBPRDataset(Dataset):
-    """Dataset for HGT training using BPR loss.
-    
-    Generates (user, positive_game, negative_game) triplets.
-    """
-    
-    def __init__(
-        self,
-        graph_data: HeteroGraphData,
-        num_negatives: int = 1
-    ):
-        """Initialize dataset.
-        
-        Args:
-            graph_data: Heterogeneous graph data
-            num_negatives: Negative samples per positive
-        """
-        self.graph_data = graph_data
-        self.num_negatives = num_negatives
-        
-        # Build user -> positive games mapping from edges
-        self.user_positive_games: Dict[int, set] = {}
-        
-        for edge_type in [EdgeType.PLAYED, EdgeType.RATED]:
-            key = (NodeType.USER, edge_type, NodeType.GAME)
-            if key in graph_data.edge_index:
-                edge_index = graph_data.edge_index[key]
-                for i in range(edge_index.size(1)):
-                    user_idx = edge_index[0, i].item()
-                    game_idx = edge_index[1, i].item()
-                    
-                    if user_idx not in self.user_positive_games:
-                        self.user_positive_games[user_idx] = set()
-                    self.user_positive_games[user_idx].add(game_idx)
-        
-        # Build training triplets
-        self.triplets = []
-        for user_idx, pos_games in self.user_positive_games.items():
-            for pos_game in pos_games:
-                self.triplets.append((user_idx, pos_game))
-        
-        self.all_games = set(range(graph_data.num_nodes.get(NodeType.GAME, 0)))
-    
-    def __len__(self) -> int:
-        return len(self.triplets) * self.num_negatives
-    
-    def __getitem__(self, idx: int) -> Tuple[int, int, int]:
-        """Get a training triplet."""
-        triplet_idx = idx // self.num_negatives
-        user_idx, pos_game_idx = self.triplets[triplet_idx]
-        
-        # Sample negative game
-        pos_games = self.user_positive_games.get(user_idx, set())
-        neg_candidates = list(self.all_games - pos_games)
-        
-        if not neg_candidates:
-            neg_game_idx = random.randint(0, len(self.all_games) - 1)
-        else:
-            neg_game_idx = random.choice(neg_candidates)
-        
-        return user_idx, pos_game_idx, neg_game_idx
+
+def _edge_name(key: Tuple[NodeType, EdgeType, NodeType]) -> str:
+    """Artifact name of an edge type ("user:played:game")."""
+    return ":".join(part.value for part in key)
 
 
 class HGTTrainer:
@@ -115,7 +68,7 @@ class HGTTrainer:
             node_types=node_types,
             edge_types=edge_types,
             num_nodes_dict=graph_data.num_nodes,
-            embedding_dim=self.settings.embedding_dim,
+            embedding_dim=self.settings.model_embedding_dim("hgt"),
             hidden_dim=256,
             num_layers=2,
             num_heads=8,
@@ -147,13 +100,16 @@ class HGTTrainer:
     def train(
         self,
         num_epochs: Optional[int] = None,
-        batch_size: Optional[int] = None
+        batch_size: Optional[int] = None,
+        on_epoch: Optional[Callable[[int, float], None]] = None
     ) -> dict:
         """Train the HGT model.
         
         Args:
             num_epochs: Number of training epochs
             batch_size: Batch size
+            on_epoch: Called with (epoch, loss) after each epoch; raising
+                from it stops training
             
         Returns:
             Training statistics
@@ -169,10 +125,10 @@ class HGTTrainer:
             num_edge_types=len(self.graph_data.edge_index)
         )
         
-        # Create dataset
-        dataset = HGTBPRDataset(self.graph_data)
+        # Create sampler
+        sampler = BPRSampler.from_hetero_graph(self.graph_data)
         
-        if len(dataset) == 0:
+        if len(sampler) == 0:
             logger.warning("No training data for HGT")
             return {
                 "final_loss": 0.0,
@@ -181,13 +137,6 @@ class HGTTrainer:
                 "train_losses": []
             }
         
-        dataloader = DataLoader(
-            dataset,
-            batch_size=batch_size,
-            shuffle=True,
-            num_workers=0
-        )
-        
         best_loss = float('inf')
         
         for epoch in range(num_epochs):
@@ -195,7 +144,7 @@ class HGTTrainer:
             total_loss = 0.0
             num_batches = 0
             
-            for batch in dataloader:
+            for batch in sampler.batches(batch_size):
                 user_idx, pos_game_idx, neg_game_idx = batch
                 user_idx = user_idx.to(self.device)
                 pos_game_idx = pos_game_idx.to(self.device)
@@ -243,6 +192,9 @@ class HGTTrainer:
             if avg_loss < best_loss:
                 best_loss = avg_loss
             
+            if on_epoch is not None:
+                on_epoch(epoch + 1, avg_loss)
+            
             if (epoch + 1) % 10 == 0:
                 logger.info(
                     f"HGT Epoch {epoch + 1}/{num_epochs}",
@@ -259,46 +211,85 @@ class HGTTrainer:
             "train_losses": self.train_losses
         }
     
-    def save_model(self, path: Optional[str] = None):
-        """Save model checkpoint."""
+    def save_model(self, path: Optional[str] = None, inference: Optional[HGTInference] = None):
+        """Save the model artifact (see app.services.model_artifacts).
+        
+        Args:
+            path: Checkpoint path (defaults to config)
+            inference: Inference wrapper with computed embeddings, saved
+                with the artifact (computed when omitted)
+        """
         if path is None:
             path = self.settings.model_path.replace('lightgcn', 'hgt')
         
         Path(path).parent.mkdir(parents=True, exist_ok=True)
         
-        # Serialize num_nodes with string keys
-        num_nodes_serializable = {
-            k.value: v for k, v in self.graph_data.num_nodes.items()
-        }
+        inference = inference or self.get_inference()
+        if inference.embeddings is None:
+            inference.compute_embeddings()
         
-        checkpoint = {
-            "model_state_dict": self.model.state_dict(),
-            "optimizer_state_dict": self.optimizer.state_dict(),
-            "train_losses": self.train_losses,
-            "num_nodes": num_nodes_serializable,
-            "embedding_dim": self.settings.embedding_dim,
-            "user_id_to_idx": self.graph_data.user_id_to_idx,
-            "game_slug_to_idx": self.graph_data.game_slug_to_idx,
-            "provider_to_idx": self.graph_data.provider_to_idx,
-            "promotion_to_idx": self.graph_data.promotion_to_idx,
-        }
+        # Serialize node types with string keys
+        num_nodes = {k.value: v for k, v in self.graph_data.num_nodes.items()}
         
-        torch.save(checkpoint, path)
+        # Final embeddings plus the edges serving reads (played games,
+        # providers, cold-start meta-paths), so no graph rebuild is needed
+        arrays = {
+            f"embeddings.{node_type.value}": embeddings
+            for node_type, embeddings in inference.embeddings.items()
+        }
+        for key, edge_index in self.graph_data.edge_index.items():
+            arrays[f"edges.{_edge_name(key)}.index"] = edge_index
+            if key in self.graph_data.edge_weight:
+                arrays[f"edges.{_edge_name(key)}.weight"] = self.graph_data.edge_weight[key]
+        
+        save_artifact(
+            path,
+            "hgt",
+            self.model.state_dict(),
+            config={
+                "num_nodes": num_nodes,
+                "node_types": [nt.value for nt in self.model.node_types],
+                "edge_types": [[src.value, rel.value, dst.value] for src, rel, dst in self.model.edge_types],
+                "embedding_dim": self.settings.model_embedding_dim("hgt"),
+                "hidden_dim": 256,
+                "num_layers": 2,
+                "num_heads": 8,
+                "dropout": 0.1
+            },
+            stats={
+                "num_nodes": num_nodes,
+                "num_edges": {
+                    _edge_name(key): int(edge_index.shape[1])
+                    for key, edge_index in self.graph_data.edge_index.items()
+                }
+            },
+            arrays=arrays,
+            id_tables={
+                name: getattr(self.graph_data, attribute)
+                for name, attribute in ID_TABLES.items()
+            },
+            training={
+                "optimizer_state_dict": self.optimizer.state_dict(),
+                "train_losses": self.train_losses
+            }
+        )
         logger.info("HGT model saved", path=path)
     
     def load_model(self, path: Optional[str] = None) -> bool:
-        """Load model checkpoint."""
+        """Load the model artifact (or a legacy checkpoint) into this graph's model."""
         if path is None:
             path = self.settings.model_path.replace('lightgcn', 'hgt')
         
-        if not os.path.exists(path):
-            return False
-        
         try:
-            checkpoint = torch.load(path, map_location=self.device)
-            self.model.load_state_dict(checkpoint["model_state_dict"])
-            self.optimizer.load_state_dict(checkpoint["optimizer_state_dict"])
-            self.train_losses = checkpoint.get("train_losses", [])
+            checkpoint = load_checkpoint(path, map_location=self.device)
+            if checkpoint is None:
+                return False
+            
+            state_dict, _, training = checkpoint
+            self.model.load_state_dict(state_dict)
+            if training:
+                self.optimizer.load_state_dict(training["optimizer_state_dict"])
+                self.train_losses = training.get("train_losses", [])
             
             logger.info("HGT model loaded", path=path)
             return True
@@ -311,3 +302,82 @@ class HGTTrainer:
         """Get inference wrapper."""
         return HGTInference(self.model, self.graph_data, self.device)
 
+
+def _graph_from_bundle(bundle: InferenceBundle) -> HeteroGraphData:
+    """Rebuild the served graph from an artifact (arrays stay mapped)."""
+    config = bundle.config
+    graph = HeteroGraphData(
+        num_nodes={NodeType(name): count for name, count in config["num_nodes"].items()}
+    )
+    
+    for src, rel, dst in config["edge_types"]:
+        key = (NodeType(src), EdgeType(rel), NodeType(dst))
+        name = _edge_name(key)
+        graph.edge_index[key] = bundle.tensor(f"edges.{name}.index")
+        if f"edges.{name}.weight" in bundle.arrays:
+            graph.edge_weight[key] = bundle.tensor(f"edges.{name}.weight")
+    
+    for name, attribute in ID_TABLES.items():
+        setattr(graph, attribute, bundle.id_table(name))
+    
+    # Reverse mappings used for serving; users are only looked up by ID
+    graph.idx_to_game_slug = graph.game_slug_to_idx.inverse()
+    graph.idx_to_provider = graph.provider_to_idx.inverse()
+    graph.idx_to_promotion = graph.promotion_to_idx.inverse()
+    return graph
+
+
+def load_inference(
+    path: Optional[str] = None,
+    device: Optional[torch.device] = None
+) -> Optional[HGTInference]:
+    """Load a saved HGT model for serving, without PostgreSQL or the CMS.
+    
+    The graph, ID mappings and final embeddings all come from the
+    artifact, so cold-start and provider lookups work as after training.
+    
+    Args:
+        path: Checkpoint path (defaults to config)
+        device: PyTorch device (CPU keeps the arrays mapped)
+        
+    Returns:
+        The inference wrapper (graph in .graph_data), or None if no
+        artifact has been saved
+        
+    Raises:
+        ArtifactError: If the artifact has another format version
+    """
+    path = path or get_settings().model_path.replace('lightgcn', 'hgt')
+    device = device or torch.device("cpu")
+    
+    if not artifact_exists(path):
+        return None
+    
+    bundle = InferenceBundle.load(path)
+    
+    config = bundle.config
+    graph = _graph_from_bundle(bundle)
+    
+    with torch.device("meta"):
+        model = HGT(
+            node_types=[NodeType(name) for name in config["node_types"]],
+            edge_types=list(graph.edge_index),
+            num_nodes_dict=graph.num_nodes,
+            embedding_dim=config["embedding_dim"],
+            hidden_dim=config["hidden_dim"],
+            num_layers=config["num_layers"],
+            num_heads=config["num_heads"],
+            dropout=config["dropout"]
+        )
+    model.load_state_dict(bundle.state_dict(), assign=True)
+    model.to(device)
+    
+    inference = HGTInference(model, graph, device)
+    inference.embeddings = {
+        node_type: bundle.tensor(f"embeddings.{node_type.value}").to(device)
+        for node_type in model.node_types
+        if f"embeddings.{node_type.value}" in bundle.arrays
+    }
+    
+    logger.info("HGT inference loaded", path=str(bundle.path), checksum=bundle.checksum[:12])
+    return inference
@@ -0,0 +1,363 @@
+"""Registry of background training jobs.
+
+Each job runs in its own spawned process, so graph building, the epoch
+loop and the Qdrant upload never block the API's event loop or hold its
+GIL. The job process reports its stage and per-epoch loss over a queue
+and checks a cancel event between epochs; the registry keeps each job's
+status, loss history and result. When a job succeeds, its return value
+is handed to an on_success callback in the API process, which loads the
+new model for serving.
+"""
+
+import multiprocessing
+import pickle
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+import structlog
+
+from app.config import get_settings
+
+logger = structlog.get_logger()
+
+# Job statuses
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when it has been cancelled."""
+
+
+class JobConflictError(Exception):
+    """Raised when a job of the same kind is already queued or running."""
+
+
+class JobContext:
+    """Progress reporting and cancellation for a running job.
+    
+    Passed to the job function; stage() and on_epoch() also raise
+    JobCancelled once the job has been cancelled. Without a queue (when a
+    pipeline is run directly) progress is only logged.
+    """
+    
+    def __init__(self, events=None, cancel_event=None):
+        """Initialize context.
+        
+        Args:
+            events: Queue progress messages are sent to
+            cancel_event: Event set when the job is cancelled
+        """
+        self._events = events
+        self._cancel_event = cancel_event
+    
+    def _send(self, kind: str, value: Any):
+        if self._events is not None:
+            self._events.put((kind, value))
+    
+    def check_cancelled(self):
+        """Raise JobCancelled if the job has been cancelled."""
+        if self._cancel_event is not None and self._cancel_event.is_set():
+            raise JobCancelled()
+    
+    def stage(self, name: str, num_epochs: Optional[int] = None):
+        """Report the stage the job has reached.
+        
+        Args:
+            name: Stage name (e.g. "building_graph", "training")
+            num_epochs: Epochs to run, when entering the training stage
+        """
+        self.check_cancelled()
+        logger.info("Job stage", stage=name)
+        self._send("stage", (name, num_epochs))
+    
+    def on_epoch(self, epoch: int, loss: float):
+        """Report a finished epoch (trainer on_epoch callback)."""
+        self._send("epoch", (epoch, loss))
+        self.check_cancelled()
+
+
+def _run_job(target: Callable[[dict, JobContext], dict], params: dict, events, cancel_event):
+    """Entry point of a job process."""
+    context = JobContext(events, cancel_event)
+    
+    try:
+        result = target(params, context)
+    except JobCancelled:
+        events.put((CANCELLED, None))
+    except Exception as e:
+        logger.error("Job failed", error=str(e))
+        events.put((FAILED, str(e)))
+    else:
+        # Pickled here so tensors are sent by value, not as shared memory
+        # handles that would not outlive this process
+        events.put((SUCCEEDED, pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)))
+
+
+@dataclass
+class Job:
+    """A training job and its progress."""
+    
+    id: str
+    kind: str
+    params: dict
+    status: str = QUEUED
+    stage: Optional[str] = None
+    epoch: int = 0
+    num_epochs: Optional[int] = None
+    losses: list[float] = field(default_factory=list)
+    cancel_requested: bool = False
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    
+    # Set to ask the job process to stop
+    _cancel_event: Any = field(default=None, repr=False)
+    
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+    
+    def to_dict(self) -> dict:
+        """Public fields, safe to serialize while the job is running."""
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "stage": self.stage,
+            "epoch": self.epoch,
+            "num_epochs": self.num_epochs,
+            "losses": list(self.losses),
+            "cancel_requested": self.cancel_requested,
+            "params": self.params,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+
+class JobRegistry:
+    """Queue, run and track training jobs.
+    
+    At most one job per kind is queued or running at a time, and at most
+    training_workers jobs run at once. Job processes use the spawn start
+    method, so they don't inherit the API's threads or CUDA state.
+    """
+    
+    def __init__(self, max_workers: Optional[int] = None, history: Optional[int] = None):
+        """Initialize registry.
+        
+        Args:
+            max_workers: Jobs run at once (defaults to config)
+            history: Finished jobs kept (defaults to config)
+        """
+        self.settings = get_settings()
+        self.history = history or self.settings.training_job_history
+        
+        self._context = multiprocessing.get_context("spawn")
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or self.settings.training_workers,
+            thread_name_prefix="training-job"
+        )
+        self._jobs: dict[str, Job] = {}
+        self._processes: dict[str, Any] = {}
+        self._lock = threading.Lock()
+    
+    def submit(
+        self,
+        kind: str,
+        target: Callable[[dict, JobContext], dict],
+        params: dict,
+        on_success: Optional[Callable[[dict], dict]] = None
+    ) -> Job:
+        """Queue a job.
+        
+        Args:
+            kind: Job kind (e.g. "lightgcn"); one job per kind at a time
+            target: Picklable module-level function(params, context)
+                returning a result dict; runs in the job process
+            params: Job parameters (must be picklable)
+            on_success: Called in the API process with the result; its
+                return value is stored as the job result
+                
+        Returns:
+            The queued job
+            
+        Raises:
+            JobConflictError: If a job of this kind is queued or running
+        """
+        with self._lock:
+            for job in self._jobs.values():
+                if job.kind == kind and not job.finished:
+                    raise JobConflictError(f"{kind} job {job.id} is already {job.status}")
+            
+            job = Job(id=uuid.uuid4().hex, kind=kind, params=params)
+            job._cancel_event = self._context.Event()
+            self._jobs[job.id] = job
+            self._prune()
+        
+        logger.info("Queued job", job_id=job.id, kind=kind)
+        self._executor.submit(self._run, job, target, on_success)
+        return job
+    
+    def get(self, job_id: str) -> Optional[Job]:
+        """Get a job by ID."""
+        return self._jobs.get(job_id)
+    
+    def list(self, kind: Optional[str] = None) -> list[Job]:
+        """Jobs, most recent first."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job for job in reversed(jobs) if kind is None or job.kind == kind]
+    
+    def is_active(self, kind: Optional[str] = None) -> bool:
+        """Whether a job (of a kind) is queued or running."""
+        return any(not job.finished for job in self.list(kind))
+    
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a job.
+        
+        A queued job is cancelled at once. A running job stops at its next
+        epoch or stage; it is killed if it is still running after
+        training_cancel_grace_seconds.
+        
+        Returns:
+            The job, or None if unknown
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return job
+            
+            job.cancel_requested = True
+            job._cancel_event.set()
+            if job.status == QUEUED:
+                job.status = CANCELLED
+                job.finished_at = time.time()
+        
+        logger.info("Cancelling job", job_id=job_id, kind=job.kind)
+        return job
+    
+    def shutdown(self):
+        """Cancel queued jobs and kill running job processes."""
+        for job in self.list():
+            if not job.finished:
+                self.cancel(job.id)
+        
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for process in list(self._processes.values()):
+            if process.is_alive():
+                process.terminate()
+    
+    def _prune(self):
+        """Drop the oldest finished jobs beyond the history size (lock held)."""
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(len(finished) - self.history, 0)]:
+            del self._jobs[job_id]
+    
+    def _finish(self, job: Job, status: str, error: Optional[str] = None):
+        with self._lock:
+            job.status = status
+            job.error = error
+            job.finished_at = time.time()
+            self._prune()
+        
+        logger.info(
+            "Job finished",
+            job_id=job.id,
+            kind=job.kind,
+            status=status,
+            error=error,
+            seconds=round(job.finished_at - (job.started_at or job.created_at), 1)
+        )
+    
+    def _run(self, job: Job, target: Callable, on_success: Optional[Callable[[dict], dict]]):
+        """Run a job in a new process and track it to completion (executor thread)."""
+        with self._lock:
+            if job.status != QUEUED:
+                return
+            job.status = RUNNING
+            job.started_at = time.time()
+        
+        events = self._context.Queue()
+        process = self._context.Process(
+            target=_run_job,
+            args=(target, job.params, events, job._cancel_event),
+            name=f"{job.kind}-job-{job.id[:8]}"
+        )
+        
+        try:
+            process.start()
+            self._processes[job.id] = process
+            
+            status, value = self._monitor(job, process, events)
+            if status != SUCCEEDED:
+                self._finish(job, status, value)
+                return
+            
+            result = pickle.loads(value)
+            if on_success is not None:
+                job.stage = "loading"
+                result = on_success(result)
+            job.result = result
+            self._finish(job, SUCCEEDED)
+        
+        except Exception as e:
+            logger.error("Job failed", job_id=job.id, kind=job.kind, error=str(e))
+            self._finish(job, FAILED, str(e))
+        
+        finally:
+            self._processes.pop(job.id, None)
+            if process.is_alive():
+                process.terminate()
+            process.join(timeout=5)
+            events.close()
+    
+    def _monitor(self, job: Job, process, events) -> tuple[str, Any]:
+        """Apply progress messages until the job process reports its outcome.
+        
+        Returns:
+            (status, value): the pickled result for SUCCEEDED, an error
+            message for FAILED
+        """
+        grace = self.settings.training_cancel_grace_seconds
+        cancelled_at = None
+        
+        while True:
+            alive = process.is_alive()
+            try:
+                kind, value = events.get(timeout=0.5)
+            except queue.Empty:
+                if not alive:
+                    return FAILED, f"Job process exited with code {process.exitcode}"
+                
+                if job.cancel_requested:
+                    cancelled_at = cancelled_at or time.monotonic()
+                    if time.monotonic() - cancelled_at > grace:
+                        logger.warning("Killing cancelled job", job_id=job.id, kind=job.kind)
+                        process.terminate()
+                        return CANCELLED, None
+                continue
+            
+            if kind == "stage":
+                job.stage, num_epochs = value
+                if num_epochs is not None:
+                    job.num_epochs = num_epochs
+            elif kind == "epoch":
+                job.epoch, loss = value
+                job.losses.append(loss)
+            else:
+                return kind, value
@@ -0,0 +1,370 @@
+"""Versioned model artifacts: an inference bundle and a training bundle.
+
+A trained model is saved as a directory next to its configured checkpoint
+path (lightgcn_model.pt -> lightgcn_model/):
+    
+    manifest.json    format_version, model, config (dims), stats (graph
+                     sizes), files (shape, dtype, sha256) and checksum
+    inference/       One .npy per array, memory-mapped on load:
+        model.<name>.npy   Model state (parameters and buffers)
+        <name>.npy         Precomputed arrays (e.g. final embeddings)
+        ids.<table>.keys.npy  Sorted, fixed-width IDs of an ID table
+        ids.<table>.rows.npy  Index of each sorted ID
+    training.pt      Optimizer state and loss history (torch.save), only
+                     needed to resume training
+                     
+Loading the inference bundle reads the manifest and maps the arrays, so a
+serving worker starts in milliseconds whatever the model size, and tensors
+share the page cache instead of being unpickled into private memory. The
+checksum (over the per-file sha256 digests) is recorded in the training
+bundle too, so optimizer state is never resumed against other weights.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+import numpy as np
+import structlog
+import torch
+
+logger = structlog.get_logger()
+
+FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+INFERENCE_DIR = "inference"
+TRAINING_FILE = "training.pt"
+MODEL_PREFIX = "model."
+IDS_PREFIX = "ids."
+
+ArrayLike = Union[np.ndarray, torch.Tensor]
+
+
+class ArtifactError(Exception):
+    """Raised when an artifact is missing, corrupt or of another format."""
+
+
+def artifact_dir(path: str) -> Path:
+    """Artifact directory for a checkpoint path (its suffix dropped)."""
+    return Path(path).with_suffix("")
+
+
+def artifact_exists(path: str) -> bool:
+    """Whether an artifact has been saved for a checkpoint path."""
+    return (artifact_dir(path) / MANIFEST_FILE).exists()
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _to_numpy(array: ArrayLike) -> np.ndarray:
+    if isinstance(array, torch.Tensor):
+        array = array.detach().cpu().numpy()
+    return np.ascontiguousarray(array)
+
+
+class IdTable(Mapping):
+    """Read-only ID -> index mapping backed by sorted arrays.
+    
+    Drop-in for the dicts the graphs use (get, in, [], len); lookups
+    binary-search the mapped keys, so nothing is built on load.
+    """
+    
+    def __init__(self, keys: np.ndarray, rows: np.ndarray):
+        """Initialize table.
+        
+        Args:
+            keys: Sorted IDs
+            rows: Index of each ID
+        """
+        self.keys = keys
+        self.rows = rows
+    
+    @classmethod
+    def from_dict(cls, mapping: Mapping) -> "IdTable":
+        """Build from an ID -> index dict."""
+        keys = np.array(list(mapping), dtype=str)
+        rows = np.fromiter(mapping.values(), dtype=np.int64, count=len(mapping))
+        order = np.argsort(keys, kind="stable")
+        return cls(keys[order], rows[order])
+    
+    def lookup(self, keys) -> np.ndarray:
+        """Index of each key, -1 if not in the table."""
+        if not len(keys) or not len(self.keys):
+            return np.full(len(keys), -1, dtype=np.int64)
+        
+        keys = np.asarray(keys, dtype=str)
+        positions = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        return np.where(self.keys[positions] == keys, self.rows[positions], -1)
+    
+    def __getitem__(self, key: str) -> int:
+        row = self.lookup([key])[0] if isinstance(key, str) else -1
+        if row < 0:
+            raise KeyError(key)
+        return int(row)
+    
+    def __contains__(self, key) -> bool:
+        return isinstance(key, str) and self.lookup([key])[0] >= 0
+    
+    def __len__(self) -> int:
+        return len(self.keys)
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys.tolist())
+    
+    def inverse(self) -> dict[int, str]:
+        """Index -> ID dict (for the idx_to_* graph mappings)."""
+        return dict(zip(self.rows.tolist(), self.keys.tolist()))
+
+
+class InferenceBundle:
+    """A loaded inference bundle: manifest plus memory-mapped arrays."""
+    
+    def __init__(self, path: Path, manifest: dict, arrays: dict[str, np.ndarray]):
+        self.path = path
+        self.manifest = manifest
+        self.arrays = arrays
+    
+    @classmethod
+    def load(cls, path: str, verify: bool = False) -> "InferenceBundle":
+        """Map an artifact's inference bundle.
+        
+        Args:
+            path: Checkpoint path or artifact directory
+            verify: Check every file against its sha256 (reads the files)
+            
+        Raises:
+            ArtifactError: If the artifact is missing, of another format
+                version or fails verification
+        """
+        directory = artifact_dir(path)
+        manifest = read_manifest(directory)
+        if verify:
+            verify_artifact(directory, manifest)
+        
+        # Copy-on-write mappings are writable, so torch.from_numpy accepts
+        # them, but pages stay shared because nothing writes to them
+        arrays = {
+            name: np.load(directory / INFERENCE_DIR / f"{name}.npy", mmap_mode="c")
+            for name in manifest["files"]
+            if name != TRAINING_FILE
+        }
+        return cls(directory, manifest, arrays)
+    
+    @property
+    def config(self) -> dict:
+        return self.manifest["config"]
+    
+    @property
+    def stats(self) -> dict:
+        return self.manifest["stats"]
+    
+    @property
+    def checksum(self) -> str:
+        return self.manifest["checksum"]
+    
+    def tensor(self, name: str) -> torch.Tensor:
+        """An array as a tensor sharing the mapping."""
+        return torch.from_numpy(self.arrays[name])
+    
+    def state_dict(self) -> dict[str, torch.Tensor]:
+        """Model state, for load_state_dict (assign=True keeps it mapped)."""
+        return {
+            name[len(MODEL_PREFIX):]: self.tensor(name)
+            for name in self.arrays
+            if name.startswith(MODEL_PREFIX)
+        }
+    
+    def id_table(self, name: str) -> IdTable:
+        """An ID table by name (e.g. "users", "games")."""
+        return IdTable(
+            self.arrays[f"{IDS_PREFIX}{name}.keys"],
+            self.arrays[f"{IDS_PREFIX}{name}.rows"]
+        )
+
+
+def read_manifest(path: Union[str, Path]) -> dict:
+    """Read and check an artifact's manifest.
+    
+    Raises:
+        ArtifactError: If there is no manifest or it has another format version
+    """
+    manifest_path = artifact_dir(str(path)) / MANIFEST_FILE
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        raise ArtifactError(f"No model artifact at {manifest_path.parent}")
+    
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ArtifactError(
+            f"Unsupported artifact format {manifest.get('format_version')} "
+            f"(expected {FORMAT_VERSION})"
+        )
+    return manifest
+
+
+def verify_artifact(path: Union[str, Path], manifest: Optional[dict] = None):
+    """Check every file of an artifact against the manifest.
+    
+    Raises:
+        ArtifactError: If a file is missing or its sha256 differs
+    """
+    directory = artifact_dir(str(path))
+    manifest = manifest or read_manifest(directory)
+    
+    for name, entry in manifest["files"].items():
+        file_path = directory / entry["file"]
+        if not file_path.exists() or _sha256(file_path) != entry["sha256"]:
+            raise ArtifactError(f"Artifact file {entry['file']} is missing or corrupt")
+
+
+def save_artifact(
+    path: str,
+    model: str,
+    state_dict: dict[str, torch.Tensor],
+    config: dict,
+    stats: dict,
+    arrays: Optional[dict[str, ArrayLike]] = None,
+    id_tables: Optional[dict[str, Mapping]] = None,
+    training: Optional[dict] = None
+) -> dict:
+    """Write a model artifact, replacing any previous one.
+    
+    Args:
+        path: Checkpoint path (the artifact directory drops its suffix)
+        model: Model name ("lightgcn", "hgt" or "tgn")
+        state_dict: Model state
+        config: Hyperparameters needed to rebuild the model (dims, layers)
+        stats: Graph statistics of the training data
+        arrays: Precomputed arrays served without running the model
+        id_tables: ID -> index dicts (e.g. {"users": user_id_to_idx})
+        training: Training-only state (optimizer, losses) for training.pt
+        
+    Returns:
+        The manifest
+    """
+    start = time.time()
+    directory = artifact_dir(path)
+    work_dir = directory.with_name(f".{directory.name}.tmp")
+    old_dir = directory.with_name(f".{directory.name}.old")
+    
+    shutil.rmtree(work_dir, ignore_errors=True)
+    (work_dir / INFERENCE_DIR).mkdir(parents=True)
+    
+    named = {f"{MODEL_PREFIX}{name}": value for name, value in state_dict.items()}
+    named.update(arrays or {})
+    for name, mapping in (id_tables or {}).items():
+        table = IdTable.from_dict(mapping)
+        named[f"{IDS_PREFIX}{name}.keys"] = table.keys
+        named[f"{IDS_PREFIX}{name}.rows"] = table.rows
+    
+    files = {}
+    for name, value in named.items():
+        array = _to_numpy(value)
+        relative = f"{INFERENCE_DIR}/{name}.npy"
+        np.save(work_dir / relative, array)
+        files[name] = {
+            "file": relative,
+            "shape": list(array.shape),
+            "dtype": array.dtype.str,
+            "sha256": _sha256(work_dir / relative)
+        }
+    
+    checksum = hashlib.sha256(
+        "".join(files[name]["sha256"] for name in sorted(files)).encode()
+    ).hexdigest()
+    
+    if training is not None:
+        torch.save({**training, "checksum": checksum}, work_dir / TRAINING_FILE)
+        files[TRAINING_FILE] = {"file": TRAINING_FILE, "sha256": _sha256(work_dir / TRAINING_FILE)}
+    
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "model": model,
+        "created_at": time.time(),
+        "config": config,
+        "stats": stats,
+        "files": files,
+        "checksum": checksum
+    }
+    with open(work_dir / MANIFEST_FILE, "w") as f:
+        json.dump(manifest, f, indent=2)
+    
+    # Swap directories; workers still mapping old files keep reading them
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if directory.exists():
+        os.rename(directory, old_dir)
+    os.rename(work_dir, directory)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    
+    logger.info(
+        "Saved model artifact",
+        model=model,
+        path=str(directory),
+        checksum=checksum[:12],
+        seconds=round(time.time() - start, 2)
+    )
+    return manifest
+
+
+def load_training_state(path: str, checksum: str, map_location=None) -> Optional[dict]:
+    """Load an artifact's training bundle.
+    
+    Args:
+        path: Checkpoint path or artifact directory
+        checksum: Checksum of the inference bundle being resumed
+        map_location: torch.load map_location
+        
+    Returns:
+        The training state, or None if there is none or it belongs to
+        other weights
+    """
+    training_path = artifact_dir(path) / TRAINING_FILE
+    if not training_path.exists():
+        return None
+    
+    state = torch.load(training_path, map_location=map_location)
+    if state.get("checksum") != checksum:
+        logger.warning("Training state does not match model weights", path=str(training_path))
+        return None
+    return state
+
+
+def load_checkpoint(path: str, map_location=None) -> Optional[tuple[dict, dict, dict]]:
+    """Load everything needed to resume training from a checkpoint path.
+    
+    Reads the artifact (verified against its checksums), or a legacy
+    single-file torch.save checkpoint at the path itself.
+    
+    Args:
+        path: Checkpoint path
+        map_location: torch.load map_location
+        
+    Returns:
+        (state_dict, config, training) or None if nothing was saved;
+        training is empty when the optimizer state can't be resumed
+        
+    Raises:
+        ArtifactError: If the artifact is corrupt or of another format
+    """
+    if artifact_exists(path):
+        bundle = InferenceBundle.load(path, verify=True)
+        training = load_training_state(path, bundle.checksum, map_location) or {}
+        return bundle.state_dict(), bundle.config, training
+    
+    if os.path.exists(path):
+        checkpoint = torch.load(path, map_location=map_location)
+        return checkpoint["model_state_dict"], checkpoint, checkpoint
+    
+    return None
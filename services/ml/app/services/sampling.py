@@ -0,0 +1,178 @@
+"""Vectorized BPR negative sampling for LightGCN and HGT training.
+
+Positives are kept as a sorted array of user * num_items + item keys, so a
+whole batch of candidate negatives can be checked with one searchsorted call
+and only the rejected ones are redrawn.
+"""
+
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+import torch
+
+from app.config import get_settings
+from app.models.hgt import HeteroGraphData, NodeType, EdgeType
+from app.services.graph_builder import GraphData
+
+
+class BPRSampler:
+    """Draws (user, positive_game, negative_game) BPR batches."""
+    
+    # Redraw rounds before giving up on users that interacted with almost
+    # every item; their remaining negatives are kept as drawn
+    MAX_REJECTION_ROUNDS = 16
+    
+    def __init__(
+        self,
+        users: np.ndarray,
+        items: np.ndarray,
+        num_items: int,
+        num_negatives: Optional[int] = None,
+        popularity_alpha: Optional[float] = None,
+        seed: Optional[int] = None
+    ):
+        """Initialize sampler.
+        
+        Args:
+            users: User index of each positive interaction
+            items: Item index of each positive interaction
+            num_items: Total number of items to sample negatives from
+            num_negatives: Negative samples per positive (defaults to config)
+            popularity_alpha: Sample negatives proportional to
+                popularity ** alpha; 0 samples uniformly (defaults to config)
+            seed: Optional RNG seed
+        """
+        settings = get_settings()
+        self.num_items = num_items
+        self.num_negatives = num_negatives or settings.bpr_num_negatives
+        self.popularity_alpha = (
+            settings.bpr_popularity_alpha if popularity_alpha is None else popularity_alpha
+        )
+        self.rng = np.random.default_rng(seed)
+        
+        # Deduplicated positives, sorted by (user, item)
+        keys = np.asarray(users, dtype=np.int64) * num_items + np.asarray(items, dtype=np.int64)
+        self._pos_keys = np.unique(keys)
+        self.pos_users = self._pos_keys // max(num_items, 1)
+        self.pos_items = self._pos_keys % max(num_items, 1)
+        
+        # Negative sampling distribution, as a CDF so each draw is a binary
+        # search (rng.choice with p= rebuilds it on every call)
+        self._item_cdf: Optional[np.ndarray] = None
+        if self.popularity_alpha > 0 and num_items > 0:
+            counts = np.bincount(self.pos_items, minlength=num_items).astype(np.float64)
+            weights = np.power(counts + 1.0, self.popularity_alpha)
+            self._item_cdf = np.cumsum(weights / weights.sum())
+    
+    @classmethod
+    def from_graph_data(cls, graph_data: GraphData, **kwargs) -> "BPRSampler":
+        """Create a sampler from the user->game edges of a bipartite graph."""
+        edge_index = graph_data.edge_index
+        if edge_index is None:
+            edge_index = torch.zeros((2, 0), dtype=torch.long)
+        
+        # src is user (0 to num_users-1)
+        # dst is game (num_users to num_users+num_games-1)
+        user_to_game = edge_index[0] < graph_data.num_users
+        users = edge_index[0, user_to_game].cpu().numpy()
+        items = edge_index[1, user_to_game].cpu().numpy() - graph_data.num_users
+        
+        return cls(users, items, graph_data.num_games, **kwargs)
+    
+    @classmethod
+    def from_hetero_graph(cls, graph_data: HeteroGraphData, **kwargs) -> "BPRSampler":
+        """Create a sampler from the PLAYED and RATED edges of an HGT graph."""
+        users, items = [], []
+        for edge_type in [EdgeType.PLAYED, EdgeType.RATED]:
+            key = (NodeType.USER, edge_type, NodeType.GAME)
+            if key in graph_data.edge_index:
+                edge_index = graph_data.edge_index[key].cpu().numpy()
+                users.append(edge_index[0])
+                items.append(edge_index[1])
+        
+        if not users:
+            users, items = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)]
+        
+        return cls(
+            np.concatenate(users),
+            np.concatenate(items),
+            graph_data.num_nodes.get(NodeType.GAME, 0),
+            **kwargs
+        )
+    
+    def __len__(self) -> int:
+        return len(self._pos_keys) * self.num_negatives
+    
+    def _draw(self, size: int) -> np.ndarray:
+        """Draw candidate negative items."""
+        if self._item_cdf is None:
+            return self.rng.integers(0, self.num_items, size=size)
+        
+        items = np.searchsorted(
+            self._item_cdf, self.rng.random(size) * self._item_cdf[-1], side="right"
+        )
+        return np.minimum(items, self.num_items - 1)
+    
+    def is_positive(self, users: np.ndarray, items: np.ndarray) -> np.ndarray:
+        """Check which (user, item) pairs are positive interactions.
+        
+        Args:
+            users: User indices [n]
+            items: Item indices [n]
+            
+        Returns:
+            Boolean mask [n]
+        """
+        keys = users * self.num_items + items
+        slots = np.searchsorted(self._pos_keys, keys)
+        slots = np.minimum(slots, len(self._pos_keys) - 1)
+        return self._pos_keys[slots] == keys
+    
+    def sample_negatives(self, users: np.ndarray) -> np.ndarray:
+        """Sample one negative item per user, rejecting positives.
+        
+        Args:
+            users: User indices [n]
+            
+        Returns:
+            Negative item indices [n]
+        """
+        negatives = self._draw(len(users))
+        rejected = np.flatnonzero(self.is_positive(users, negatives))
+        
+        for _ in range(self.MAX_REJECTION_ROUNDS):
+            if len(rejected) == 0:
+                break
+            negatives[rejected] = self._draw(len(rejected))
+            rejected = rejected[self.is_positive(users[rejected], negatives[rejected])]
+        
+        return negatives
+    
+    def batches(
+        self,
+        batch_size: int
+    ) -> Iterator[Tuple[torch.Tensor, torch.Tensor, torch.Tensor]]:
+        """Iterate over one shuffled epoch of BPR triplets.
+        
+        Every positive appears num_negatives times, each with its own negative.
+        
+        Args:
+            batch_size: Triplets per batch
+            
+        Yields:
+            Tuples of (user_idx, pos_game_idx, neg_game_idx) tensors
+        """
+        if len(self) == 0 or self.num_items == 0:
+            return
+        
+        order = self.rng.permutation(len(self)) // self.num_negatives
+        
+        for start in range(0, len(order), batch_size):
+            positives = order[start:start + batch_size]
+            users = self.pos_users[positives]
+            
+            yield (
+                torch.from_numpy(users),
+                torch.from_numpy(self.pos_items[positives]),
+                torch.from_numpy(self.sample_negatives(users))
+            )
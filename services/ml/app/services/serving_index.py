@@ -0,0 +1,441 @@
+"""In-process top-K serving index for LightGCN recommendations.
+
+Keeps every game embedding as one contiguous, L2-normalized matrix and a
+bounded LRU/TTL cache of hot user vectors, so a recommendation is one
+matrix-vector product plus argpartition instead of two Qdrant round trips.
+Qdrant is only consulted on a user cache miss and to reload the games after
+a new training run is published.
+
+With serving_source="snapshot", games and users are instead mapped from the
+published snapshot (app.services.snapshot_store), which every worker
+shares; Qdrant is then only asked for users missing from the snapshot.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from itertools import chain
+from typing import Optional
+
+import numpy as np
+import structlog
+
+from app.config import get_settings
+from app.models.quantization import QuantizedMatrix
+from app.models.scoring import slugs_to_indices
+from app.services.embedding_service import EmbeddingService
+from app.services.snapshot_store import Snapshot, current_version
+
+logger = structlog.get_logger()
+
+
+class ServingIndex:
+    """Game embedding matrix plus a hot user vector cache."""
+    
+    def __init__(self, embedding_service: Optional[EmbeddingService] = None):
+        """Initialize serving index.
+        
+        Args:
+            embedding_service: Service used to read embeddings from Qdrant
+        """
+        self.settings = get_settings()
+        self.embedding_service = embedding_service or EmbeddingService()
+        self.dtype = self.settings.serving_index_dtype
+        
+        if self.settings.serving_source not in ("qdrant", "snapshot"):
+            raise ValueError(f"Unknown serving source: {self.settings.serving_source}")
+        self.use_snapshot = self.settings.serving_source == "snapshot"
+        
+        # Game matrix (rows are L2-normalized, matching Qdrant's COSINE),
+        # stored as serving_index_dtype
+        self._games: Optional[QuantizedMatrix] = None
+        self._game_slugs: list[str] = []
+        self._game_idx = np.zeros(0, dtype=np.int64)
+        self._slug_to_row: dict[str, int] = {}
+        
+        # user_id -> (expires_at, normalized vector or None if unknown)
+        self._users: OrderedDict[str, tuple[float, Optional[np.ndarray]]] = OrderedDict()
+        
+        # Mapped snapshot the matrix comes from, in snapshot mode
+        self._snapshot: Optional[Snapshot] = None
+        
+        # Collection (or snapshot) version the matrix was loaded from
+        self._version: Optional[str] = None
+        self._version_checked_at = 0.0
+        
+        self._lock = threading.Lock()
+    
+    @property
+    def num_games(self) -> int:
+        return len(self._game_slugs)
+    
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        """L2-normalize rows (or a single vector)."""
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+    
+    def invalidate(self):
+        """Drop the game matrix and all cached users.
+        
+        Called after a training run publishes; the next request reloads.
+        """
+        with self._lock:
+            self._games = None
+            self._snapshot = None
+            self._version = None
+            self._users.clear()
+    
+    def load_games(
+        self,
+        game_slugs: list[str],
+        vectors: np.ndarray,
+        game_idx: Optional[np.ndarray] = None,
+        version: Optional[str] = None
+    ):
+        """Replace the game matrix and clear the user cache.
+        
+        Args:
+            game_slugs: Game slug of each row
+            vectors: Game embeddings [len(game_slugs), dim]
+            game_idx: Graph index of each row (defaults to the row number)
+            version: Collection version the embeddings come from
+        """
+        games = QuantizedMatrix.quantize(
+            self._normalize(np.asarray(vectors, dtype=np.float32)),
+            self.dtype
+        )
+        if game_idx is None or (game_idx < 0).any():
+            game_idx = np.arange(len(game_slugs), dtype=np.int64)
+        
+        with self._lock:
+            self._games = games
+            self._snapshot = None
+            self._game_slugs = list(game_slugs)
+            self._game_idx = game_idx
+            self._slug_to_row = {slug: row for row, slug in enumerate(self._game_slugs)}
+            self._version = version
+            self._version_checked_at = time.monotonic()
+            self._users.clear()
+        
+        logger.info(
+            "Serving index loaded",
+            num_games=len(game_slugs),
+            dtype=self.dtype,
+            nbytes=games.nbytes,
+            version=version
+        )
+    
+    def load_snapshot(self, snapshot: Snapshot):
+        """Serve from a mapped snapshot and clear the user cache.
+        
+        The snapshot's game matrix is used as is (already normalized and
+        quantized by the publisher), so nothing is copied per worker.
+        """
+        with self._lock:
+            self._games = snapshot.games
+            self._snapshot = snapshot
+            self._game_slugs = snapshot.game_slugs
+            self._game_idx = snapshot.game_idx
+            self._slug_to_row = {slug: row for row, slug in enumerate(self._game_slugs)}
+            self._version = snapshot.version
+            self._version_checked_at = time.monotonic()
+            self._users.clear()
+        
+        logger.info(
+            "Serving index mapped snapshot",
+            version=snapshot.version,
+            num_users=snapshot.num_users,
+            num_games=len(snapshot.game_slugs),
+            dtype=snapshot.games.dtype
+        )
+    
+    def _current_version(self) -> Optional[str]:
+        """Version to serve: the current snapshot, or the games collection."""
+        if self.use_snapshot:
+            version = current_version("lightgcn")
+            if version is not None:
+                return version
+        return self.embedding_service.get_collection_version(self.settings.lightgcn_games_collection)
+    
+    def _load(self):
+        """Load the game matrix from the snapshot or the games collection.
+        
+        In snapshot mode, Qdrant is used until a snapshot is published.
+        """
+        if self.use_snapshot:
+            snapshot = Snapshot.load("lightgcn")
+            if snapshot is not None:
+                self.load_snapshot(snapshot)
+                return
+        self._load_from_qdrant()
+    
+    def _load_from_qdrant(self):
+        """Load the game matrix from the current games collection."""
+        collection = self.settings.lightgcn_games_collection
+        version = self.embedding_service.get_collection_version(collection)
+        if version is None:
+            return
+        
+        game_slugs, vectors, game_idx = self.embedding_service.scroll_embeddings(
+            version, key_field="game_slug", index_field="game_idx"
+        )
+        self.load_games(game_slugs, vectors, game_idx, version=version)
+    
+    def _check_version(self):
+        """Reload if another process published a new version.
+        
+        The version is looked up at most once per serving_version_check_interval.
+        """
+        now = time.monotonic()
+        if now - self._version_checked_at < self.settings.serving_version_check_interval:
+            return
+        self._version_checked_at = now
+        
+        version = self._current_version()
+        if version != self._version:
+            logger.info("Embedding version changed, reloading serving index", version=version)
+            self._load()
+    
+    def ensure_loaded(self) -> bool:
+        """Load or refresh the game matrix as needed.
+        
+        Returns:
+            True if a game matrix is available
+        """
+        if self._games is None:
+            self._load()
+        else:
+            self._check_version()
+        return self._games is not None and self.num_games > 0
+    
+    def get_user_vector(self, user_id: str) -> Optional[np.ndarray]:
+        """Get a normalized user vector, from cache or Qdrant.
+        
+        Unknown users are cached too, so repeated misses don't hit Qdrant.
+        
+        Args:
+            user_id: User ID
+            
+        Returns:
+            User vector or None if the user has no embedding
+        """
+        snapshot = self._snapshot
+        if snapshot is not None:
+            vector = snapshot.user_vector(user_id)
+            if vector is not None:
+                return vector
+        
+        now = time.monotonic()
+        
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._users.move_to_end(user_id)
+                return entry[1]
+        
+        embedding = self.embedding_service.get_user_embedding(user_id)
+        vector = None
+        if embedding is not None:
+            vector = self._normalize(np.asarray(embedding, dtype=np.float32))
+        
+        self.put_user_vector(user_id, vector, now=now)
+        return vector
+    
+    def put_user_vector(
+        self,
+        user_id: str,
+        vector: Optional[np.ndarray],
+        now: Optional[float] = None
+    ):
+        """Cache a (normalized) user vector, evicting the least recently used."""
+        expires_at = (now or time.monotonic()) + self.settings.serving_user_cache_ttl
+        
+        with self._lock:
+            self._users[user_id] = (expires_at, vector)
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.settings.serving_user_cache_size:
+                self._users.popitem(last=False)
+    
+    def top_k(
+        self,
+        query: np.ndarray,
+        k: int,
+        exclude_games: Optional[list[str]] = None
+    ) -> list[dict]:
+        """Score all games against a normalized query vector.
+        
+        Args:
+            query: Normalized query vector [dim]
+            k: Number of results
+            exclude_games: Game slugs to leave out
+            
+        Returns:
+            List of {game_slug, score, game_idx}, best first
+        """
+        return self.top_k_batch(query[None, :], k, [exclude_games])[0]
+    
+    def top_k_batch(
+        self,
+        queries: np.ndarray,
+        k: int,
+        exclude_games: Optional[list[Optional[list[str]]]] = None
+    ) -> list[list[dict]]:
+        """Score all games against a batch of normalized query vectors.
+        
+        Args:
+            queries: Normalized query vectors [batch, dim]
+            k: Number of results per query
+            exclude_games: Game slugs to leave out, per query
+            
+        Returns:
+            List of {game_slug, score, game_idx} per query, best first
+        """
+        # One consistent view of the matrix and its mappings, in case a
+        # reload swaps them meanwhile
+        with self._lock:
+            games = self._games
+            game_slugs = self._game_slugs
+            game_idx = self._game_idx
+            slug_to_row = self._slug_to_row
+        scores = games.matmul_t(queries)
+        
+        if exclude_games and any(exclude_games):
+            cols = [slugs_to_indices(slugs, slug_to_row) if slugs else [] for slugs in exclude_games]
+            rows = np.repeat(np.arange(len(cols)), [len(row_cols) for row_cols in cols])
+            scores[rows, np.fromiter(chain.from_iterable(cols), dtype=np.int64, count=len(rows))] = -np.inf
+        
+        k = min(k, scores.shape[1])
+        if k <= 0:
+            return [[] for _ in range(len(queries))]
+        
+        if k < scores.shape[1]:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(k), scores.shape)
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        
+        return [
+            [
+                {
+                    "game_slug": game_slugs[col],
+                    "score": float(score),
+                    "game_idx": int(game_idx[col])
+                }
+                for col, score in zip(cols, row_scores)
+                if score != -np.inf
+            ]
+            for cols, row_scores in zip(top.tolist(), top_scores.tolist())
+        ]
+    
+    def recommend(
+        self,
+        user_id: str,
+        limit: int = 10,
+        exclude_games: Optional[list[str]] = None
+    ) -> Optional[list[dict]]:
+        """Get game recommendations for a user.
+        
+        Args:
+            user_id: User ID
+            limit: Number of recommendations
+            exclude_games: Games to exclude (e.g., already played)
+            
+        Returns:
+            Recommended games with scores, or None if the index has no
+            games to serve from (caller should fall back to Qdrant search)
+        """
+        if not self.ensure_loaded():
+            return None
+        
+        vector = self.get_user_vector(user_id)
+        if vector is None:
+            logger.info("No embedding found for user", user_id=user_id)
+            return []
+        
+        return self.top_k(vector, limit, exclude_games)
+    
+    def get_user_vectors(self, user_ids: list[str]) -> list[Optional[np.ndarray]]:
+        """Get normalized vectors for many users.
+        
+        Users are read from the snapshot when serving from one; cache
+        misses are fetched from Qdrant in a single request.
+        
+        Args:
+            user_ids: User IDs
+            
+        Returns:
+            User vector (or None if the user has no embedding) per user
+        """
+        now = time.monotonic()
+        vectors: list[Optional[np.ndarray]] = [None] * len(user_ids)
+        misses: dict[str, list[int]] = {}
+        
+        snapshot = self._snapshot
+        snapshot_rows = snapshot.user_rows(user_ids) if snapshot is not None else None
+        
+        with self._lock:
+            for row, user_id in enumerate(user_ids):
+                if snapshot_rows is not None and snapshot_rows[row] >= 0:
+                    vectors[row] = snapshot.users.rows(snapshot_rows[row])
+                    continue
+                
+                entry = self._users.get(user_id)
+                if entry is not None and entry[0] > now:
+                    self._users.move_to_end(user_id)
+                    vectors[row] = entry[1]
+                else:
+                    misses.setdefault(user_id, []).append(row)
+        
+        if misses:
+            embeddings = self.embedding_service.get_user_embeddings(list(misses))
+            for user_id, rows in misses.items():
+                vector = None
+                embedding = embeddings.get(user_id)
+                if embedding is not None:
+                    vector = self._normalize(np.asarray(embedding, dtype=np.float32))
+                
+                self.put_user_vector(user_id, vector, now=now)
+                for row in rows:
+                    vectors[row] = vector
+        
+        return vectors
+    
+    def recommend_batch(
+        self,
+        user_ids: list[str],
+        limit: int = 10,
+        exclude_games: Optional[list[Optional[list[str]]]] = None
+    ) -> Optional[list[list[dict]]]:
+        """Get game recommendations for many users with one matmul.
+        
+        Args:
+            user_ids: User IDs
+            limit: Number of recommendations per user
+            exclude_games: Games to exclude, per user
+            
+        Returns:
+            Recommended games per user (empty for users without an
+            embedding), or None if the index has no games to serve from
+        """
+        if not self.ensure_loaded():
+            return None
+        
+        results: list[list[dict]] = [[] for _ in user_ids]
+        exclude_games = exclude_games or [None] * len(user_ids)
+        
+        vectors = self.get_user_vectors(user_ids)
+        rows = [row for row, vector in enumerate(vectors) if vector is not None]
+        if not rows:
+            return results
+        
+        queries = np.stack([vectors[row] for row in rows])
+        recommendations = self.top_k_batch(queries, limit, [exclude_games[row] for row in rows])
+        
+        for row, recs in zip(rows, recommendations):
+            results[row] = recs
+        
+        return results
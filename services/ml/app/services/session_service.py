@@ -16,6 +16,8 @@ import structlog
 
 from app.config import get_settings
 from app.models.tgn import TGN, TGNInference
+from app.models.scoring import slugs_to_indices
+from app.services.interaction_queue import InteractionQueue, QueuedInteraction
 
 logger = structlog.get_logger()
 
@@ -104,23 +106,81 @@ class SessionService:
         # Lock for thread safety
         self._lock = threading.Lock()
         
+        # Serializes TGN memory writes (request or ingest thread) with the
+        # reads of recommendations and model swaps; never taken while
+        # holding _lock
+        self._memory_lock = threading.Lock()
+        
+        # Bumped by set_model; user/item indices are only valid within the
+        # generation they were looked up in
+        self._generation = 0
+        
         # Stats
         self.total_sessions = 0
         self.total_interactions = 0
+        
+        # Micro-batched TGN memory updates (None = update in the request)
+        self.ingest: Optional[InteractionQueue] = None
+        if self.settings.tgn_ingest_enabled:
+            self.ingest = InteractionQueue(
+                self._apply_interactions,
+                max_batch=self.settings.tgn_ingest_max_batch,
+                max_delay=self.settings.tgn_ingest_max_delay_ms / 1000
+            )
     
-    def set_tgn(self, tgn_inference: TGNInference):
-        """Set the TGN inference wrapper."""
-        self.tgn = tgn_inference
-    
-    def set_mappings(
+    def set_model(
         self,
+        tgn_inference: TGNInference,
         user_id_to_idx: Dict[str, int],
         game_slug_to_idx: Dict[str, int]
     ):
-        """Set ID mappings from training data."""
-        self.user_id_to_idx = user_id_to_idx
-        self.game_slug_to_idx = game_slug_to_idx
-        self.idx_to_game_slug = {v: k for k, v in game_slug_to_idx.items()}
+        """Swap in a TGN model together with its ID mappings.
+        
+        Model and mappings change in one step, so no interaction is indexed
+        with one model's mappings and applied to another. Active sessions
+        hold user indices of the previous model and start over; queued
+        events of the previous generation are dropped when applied.
+        """
+        if self.ingest is not None:
+            self.ingest.flush()
+        
+        with self._memory_lock, self._lock:
+            self.tgn = tgn_inference
+            self.user_id_to_idx = user_id_to_idx
+            self.game_slug_to_idx = game_slug_to_idx
+            self.idx_to_game_slug = {v: k for k, v in game_slug_to_idx.items()}
+            self.sessions.clear()
+            self._generation += 1
+    
+    def close(self):
+        """Apply queued interactions and stop the ingest thread."""
+        if self.ingest is not None:
+            self.ingest.close()
+    
+    def _apply_interactions(self, batch: List[QueuedInteraction]):
+        """Apply a batch of queued interactions to the TGN memory."""
+        with self._memory_lock:
+            tgn = self.tgn
+            if tgn is None:
+                return
+            
+            # Drop events indexed against another model (swapped meanwhile)
+            batch = [event for event in batch if event.generation == self._generation]
+            if not batch:
+                return
+            
+            tgn.update_memory(
+                user_indices=[event.user_idx for event in batch],
+                item_indices=[event.item_idx for event in batch],
+                timestamps=[event.timestamp for event in batch],
+                event_types=[event.event_type for event in batch],
+                weights=[event.weight for event in batch]
+            )
+    
+    @property
+    def queues_memory_updates(self) -> bool:
+        """Whether add_interaction queues TGN memory updates."""
+        return self.ingest is not None and not self.ingest.closed
     
     def get_or_create_session(self, user_id: str) -> UserSession:
         """Get existing session or create new one.
@@ -200,6 +260,11 @@ class SessionService:
     ) -> bool:
         """Add an interaction to user's session and update TGN.
         
+        With ingestion enabled the TGN memory update is queued and applied
+        within tgn_ingest_max_delay_ms (see app.services.interaction_queue);
+        the session history is updated right away. Once the queue is closed
+        (shutdown) the memory is updated in the request again.
+        
         Args:
             user_id: User ID
             game_slug: Game slug
@@ -214,6 +279,9 @@ class SessionService:
         if timestamp is None:
             timestamp = time.time()
         
+        # Read before any index lookup; a swap after this drops the event
+        generation = self._generation
+        
         # Get game index
         game_idx = self.game_slug_to_idx.get(game_slug, -1)
         if game_idx < 0:
@@ -244,14 +312,42 @@ class SessionService:
         # Update TGN memory if available
         if self.tgn and session.user_idx >= 0:
             event_type_idx = self.EVENT_TYPE_MAP.get(event_type, 0)
-            self.tgn.add_interaction(
-                user_id=user_id,
-                user_idx=session.user_idx,
-                item_idx=game_idx,
-                timestamp=timestamp,
-                event_type=event_type_idx,
-                weight=weight
-            )
+            
+            queued = False
+            if self.ingest is not None:
+                try:
+                    self.ingest.put(QueuedInteraction(
+                        user_idx=session.user_idx,
+                        item_idx=game_idx,
+                        timestamp=timestamp,
+                        event_type=event_type_idx,
+                        weight=weight,
+                        generation=generation
+                    ))
+                    queued = True
+                except RuntimeError:
+                    logger.warning(
+                        "Interaction queue closed, updating TGN memory in the request",
+                        user_id=user_id
+                    )
+            
+            if queued:
+                # Session history only; the memory lock may be held by a
+                # batch being applied, and this runs on the event loop
+                with self._lock:
+                    if generation == self._generation:
+                        self.tgn.record_interaction(user_id, game_idx, timestamp, weight)
+            else:
+                with self._memory_lock:
+                    if generation == self._generation:
+                        self.tgn.add_interaction(
+                            user_id=user_id,
+                            user_idx=session.user_idx,
+                            item_idx=game_idx,
+                            timestamp=timestamp,
+                            event_type=event_type_idx,
+                            weight=weight
+                        )
         
         logger.debug(
             "Added interaction",
@@ -267,7 +363,8 @@ class SessionService:
         self,
         user_id: str,
         limit: int = 10,
-        exclude_recent: bool = True
+        exclude_recent: bool = True,
+        exclude_played: bool = False
     ) -> List[Tuple[str, float]]:
         """Get session-aware recommendations using TGN.
         
@@ -275,6 +372,7 @@ class SessionService:
             user_id: User ID
             limit: Number of recommendations
             exclude_recent: Whether to exclude recently played games
+            exclude_played: Whether to exclude games from the training history
             
         Returns:
             List of (game_slug, score) tuples
@@ -291,13 +389,15 @@ class SessionService:
             exclude_items = set(i.game_idx for i in session.interactions[-5:])
         
         # Get TGN recommendations
-        recommendations = self.tgn.get_recommendations(
-            user_id=user_id,
-            user_idx=session.user_idx,
-            current_time=time.time(),
-            top_k=limit,
-            exclude_items=exclude_items
-        )
+        with self._memory_lock:
+            recommendations = self.tgn.get_recommendations(
+                user_id=user_id,
+                user_idx=session.user_idx,
+                current_time=time.time(),
+                top_k=limit,
+                exclude_items=exclude_items,
+                exclude_played=exclude_played
+            )
         
         # Convert indices to slugs
         result = []
@@ -308,6 +408,77 @@ class SessionService:
         
         return result
     
+    def get_session_recommendations_batch(
+        self,
+        user_ids: List[str],
+        limit: int = 10,
+        exclude_recent: bool = True,
+        exclude_games: Optional[List[Optional[List[str]]]] = None,
+        exclude_played: bool = False
+    ) -> List[List[Tuple[str, float]]]:
+        """Get session-aware recommendations for many users at once.
+        
+        Unlike get_session_recommendations, no sessions are created; users
+        without an active session are scored from their TGN memory.
+        
+        Args:
+            user_ids: User IDs
+            limit: Number of recommendations per user
+            exclude_recent: Whether to exclude recently played games
+            exclude_games: Additional games to exclude, per user
+            exclude_played: Whether to exclude games from the training history
+            
+        Returns:
+            List of (game_slug, score) tuples per user
+        """
+        results: List[List[Tuple[str, float]]] = [[] for _ in user_ids]
+        if self.tgn is None:
+            return results
+        
+        exclude_games = exclude_games or [None] * len(user_ids)
+        rows, batch_ids, user_indices, exclude_items = [], [], [], []
+        
+        for row, user_id in enumerate(user_ids):
+            session = self.sessions.get(user_id)
+            if session is not None and session.is_expired(self.session_timeout):
+                session = None
+            
+            user_idx = session.user_idx if session else self.user_id_to_idx.get(user_id, -1)
+            if user_idx < 0:
+                continue
+            
+            excluded = set()
+            if exclude_recent and session:
+                excluded.update(i.game_idx for i in session.interactions[-5:])
+            if exclude_games[row]:
+                excluded.update(slugs_to_indices(exclude_games[row], self.game_slug_to_idx))
+            
+            rows.append(row)
+            # Inactive sessions start over, so their TGN history is ignored
+            batch_ids.append(user_id if session else None)
+            user_indices.append(user_idx)
+            exclude_items.append(excluded)
+        
+        with self._memory_lock:
+            recommendations = self.tgn.get_recommendations_batch(
+                user_ids=batch_ids,
+                user_indices=user_indices,
+                current_time=time.time(),
+                top_k=limit,
+                exclude_items=exclude_items,
+                exclude_played=exclude_played
+            )
+        
+        # Convert indices to slugs
+        for row, recs in zip(rows, recommendations):
+            results[row] = [
+                (self.idx_to_game_slug[item_idx], score)
+                for item_idx, score in recs
+                if item_idx in self.idx_to_game_slug
+            ]
+        
+        return results
+    
     def get_session_context(self, user_id: str) -> dict:
         """Get session context for debugging/logging.
         
@@ -375,6 +546,7 @@ class SessionService:
             "total_interactions": self.total_interactions,
             "known_users": len(self.user_id_to_idx),
             "known_games": len(self.game_slug_to_idx),
-            "tgn_available": self.tgn is not None
+            "tgn_available": self.tgn is not None,
+            "queued_interactions": len(self.ingest) if self.ingest is not None else 0
         }
 
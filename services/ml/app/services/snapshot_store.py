@@ -0,0 +1,250 @@
+"""Memory-mapped embedding snapshots shared by serving workers.
+
+The trainer publishes the finished user and game matrices of a model as a
+versioned directory of .npy files and then points CURRENT at it. Serving
+workers map the arrays instead of reading them, so any number of uvicorn
+workers share one copy through the page cache, and swap to a new version
+when CURRENT changes:
+    
+    <snapshot_path>/<model>/CURRENT       Name of the live version
+    <snapshot_path>/<model>/<version>/
+        meta.json        model, version, num_users, num_games, dim, metric, dtype
+        user_ids.npy     Sorted, fixed-width user IDs (binary-searched in place)
+        users.npy        [num_users, dim] in user_ids order, as float32,
+                         float16 or int8
+        user_scales.npy  float32 [num_users] per-row scales (int8 only)
+        games.npy        [num_games, dim] as float32, float16 or int8
+        game_scales.npy  float32 [num_games] per-row scales (int8 only)
+        game_slugs.npy   Game slug of each game row
+        game_idx.npy     Graph index of each game row
+        
+Both matrices use the same dtype; the user matrix is the one that grows
+with the user base, and only the rows looked up are dequantized. For cosine
+models both are stored L2-normalized (before quantization). Old versions are
+deleted after a swap; workers still mapping one keep reading it until they
+swap, because unlinked files stay valid while mapped.
+"""
+
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+import structlog
+
+from app.config import get_settings
+from app.models.quantization import QuantizedMatrix
+
+logger = structlog.get_logger()
+
+CURRENT_FILE = "CURRENT"
+META_FILE = "meta.json"
+USER_IDS_FILE = "user_ids.npy"
+USERS_FILE = "users.npy"
+USER_SCALES_FILE = "user_scales.npy"
+GAMES_FILE = "games.npy"
+GAME_SCALES_FILE = "game_scales.npy"
+GAME_SLUGS_FILE = "game_slugs.npy"
+GAME_IDX_FILE = "game_idx.npy"
+
+
+def _model_dir(model: str, root: Optional[str] = None) -> Path:
+    return Path(root or get_settings().snapshot_path) / model
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+@dataclass
+class Snapshot:
+    """One mapped snapshot version of a model."""
+    
+    model: str
+    version: str
+    meta: dict
+    user_ids: np.ndarray
+    users: QuantizedMatrix
+    games: QuantizedMatrix
+    game_slugs: list[str]
+    game_idx: np.ndarray
+    
+    @classmethod
+    def load(cls, model: str, version: Optional[str] = None, root: Optional[str] = None) -> Optional["Snapshot"]:
+        """Map a snapshot version (the current one by default).
+        
+        Returns:
+            The snapshot, or None if none has been published
+        """
+        version = version or current_version(model, root)
+        if version is None:
+            return None
+        
+        path = _model_dir(model, root) / version
+        with open(path / META_FILE) as f:
+            meta = json.load(f)
+        
+        return cls(
+            model=model,
+            version=version,
+            meta=meta,
+            user_ids=np.load(path / USER_IDS_FILE, mmap_mode="r"),
+            users=_load_matrix(path / USERS_FILE, path / USER_SCALES_FILE),
+            games=_load_matrix(path / GAMES_FILE, path / GAME_SCALES_FILE),
+            game_slugs=np.load(path / GAME_SLUGS_FILE).tolist(),
+            game_idx=np.load(path / GAME_IDX_FILE)
+        )
+    
+    @property
+    def num_users(self) -> int:
+        return len(self.user_ids)
+    
+    def user_rows(self, user_ids: Sequence[str]) -> np.ndarray:
+        """Row of each user in the users matrix, -1 if not in the snapshot."""
+        if not len(user_ids) or not self.num_users:
+            return np.full(len(user_ids), -1, dtype=np.int64)
+        
+        keys = np.array(user_ids, dtype=str)
+        rows = np.minimum(np.searchsorted(self.user_ids, keys), self.num_users - 1)
+        return np.where(self.user_ids[rows] == keys, rows, -1)
+    
+    def user_vector(self, user_id: str) -> Optional[np.ndarray]:
+        """A user's float32 vector (a private copy), or None if not in the snapshot."""
+        row = self.user_rows([user_id])[0]
+        return self.users.rows(row) if row >= 0 else None
+
+
+def _load_matrix(data_path: Path, scales_path: Path) -> QuantizedMatrix:
+    """Map a stored matrix and its int8 scales, if any."""
+    # Copy-on-write mappings are writable, so torch.from_numpy accepts
+    # them, but pages stay shared because nothing writes to them
+    scales = np.load(scales_path, mmap_mode="c") if scales_path.exists() else None
+    return QuantizedMatrix(np.load(data_path, mmap_mode="c"), scales)
+
+
+def current_version(model: str, root: Optional[str] = None) -> Optional[str]:
+    """Version CURRENT points at, or None if nothing is published."""
+    try:
+        return (_model_dir(model, root) / CURRENT_FILE).read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def publish_snapshot(
+    model: str,
+    user_ids: Sequence[str],
+    user_vectors: np.ndarray,
+    game_slugs: Sequence[str],
+    game_vectors: np.ndarray,
+    game_idx: Optional[np.ndarray] = None,
+    metric: str = "cosine",
+    dtype: Optional[str] = None,
+    root: Optional[str] = None,
+    keep: Optional[int] = None
+) -> str:
+    """Write a new snapshot version and make it current.
+    
+    Args:
+        model: Model name ("lightgcn")
+        user_ids: User ID of each user row
+        user_vectors: User embeddings [len(user_ids), dim]
+        game_slugs: Game slug of each game row
+        game_vectors: Game embeddings [len(game_slugs), dim]
+        game_idx: Graph index of each game row (defaults to the row number)
+        metric: "cosine" (rows stored normalized) or "dot"
+        dtype: User and game matrix dtype (defaults to serving_index_dtype)
+        root: Snapshot directory (defaults to config)
+        keep: Versions kept, including the new one (defaults to config)
+        
+    Returns:
+        The new version
+    """
+    if metric not in ("cosine", "dot"):
+        raise ValueError(f"Unknown metric: {metric}")
+    
+    settings = get_settings()
+    dtype = dtype or settings.serving_index_dtype
+    keep = keep or settings.snapshot_keep
+    model_dir = _model_dir(model, root)
+    
+    start = time.time()
+    version = f"v{time.time_ns() // 1_000_000}"
+    work_dir = model_dir / f".{version}.tmp"
+    work_dir.mkdir(parents=True)
+    
+    users = np.asarray(user_vectors, dtype=np.float32)
+    games = np.asarray(game_vectors, dtype=np.float32)
+    if metric == "cosine":
+        users = _normalize(users)
+        games = _normalize(games)
+    if game_idx is None or (np.asarray(game_idx) < 0).any():
+        game_idx = np.arange(len(game_slugs), dtype=np.int64)
+    
+    # Sorted fixed-width IDs can be binary-searched straight from the mapping
+    ids = np.array(list(user_ids), dtype=str)
+    order = np.argsort(ids, kind="stable")
+    user_matrix = QuantizedMatrix.quantize(users[order], dtype)
+    matrix = QuantizedMatrix.quantize(games, dtype)
+    
+    np.save(work_dir / USER_IDS_FILE, ids[order])
+    np.save(work_dir / USERS_FILE, user_matrix.data)
+    if user_matrix.scales is not None:
+        np.save(work_dir / USER_SCALES_FILE, user_matrix.scales)
+    np.save(work_dir / GAMES_FILE, matrix.data)
+    if matrix.scales is not None:
+        np.save(work_dir / GAME_SCALES_FILE, matrix.scales)
+    np.save(work_dir / GAME_SLUGS_FILE, np.array(list(game_slugs), dtype=str))
+    np.save(work_dir / GAME_IDX_FILE, np.asarray(game_idx, dtype=np.int64))
+    
+    meta = {
+        "model": model,
+        "version": version,
+        "num_users": len(ids),
+        "num_games": len(game_slugs),
+        "dim": int(users.shape[1]) if users.ndim == 2 else 0,
+        "metric": metric,
+        "dtype": matrix.dtype,
+        "created_at": time.time()
+    }
+    with open(work_dir / META_FILE, "w") as f:
+        json.dump(meta, f)
+    
+    os.rename(work_dir, model_dir / version)
+    
+    # Atomic pointer swap; readers see either the old or the new version
+    pointer = model_dir / f".{CURRENT_FILE}.tmp"
+    pointer.write_text(version)
+    os.replace(pointer, model_dir / CURRENT_FILE)
+    
+    _remove_old_versions(model_dir, keep)
+    
+    logger.info(
+        "Published snapshot",
+        model=model,
+        version=version,
+        num_users=meta["num_users"],
+        num_games=meta["num_games"],
+        dtype=meta["dtype"],
+        seconds=round(time.time() - start, 2)
+    )
+    return version
+
+
+def _remove_old_versions(model_dir: Path, keep: int):
+    """Delete all but the newest `keep` versions."""
+    versions = sorted(
+        (path for path in model_dir.iterdir() if path.is_dir() and path.name.startswith("v")),
+        key=lambda path: int(path.name[1:])
+    )
+    stale = versions[:max(len(versions) - keep, 0)]
+    
+    current = current_version(model_dir.name, str(model_dir.parent))
+    for path in stale:
+        if path.name != current:
+            shutil.rmtree(path, ignore_errors=True)
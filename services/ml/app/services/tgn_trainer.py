@@ -1,23 +1,26 @@
 """Training pipeline for TGN (Temporal Graph Network) model."""
 
-import os
-import random
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, List, Tuple
+from typing import Callable, Iterator, Optional, List, Tuple
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 
 import torch
 import torch.optim as optim
 import torch.nn.functional as F
-from torch.utils.data import Dataset, DataLoader
+from torch.utils.data import Dataset
 import numpy as np
 import psycopg2
 import structlog
 
 from app.config import get_settings
 from app.models.tgn import TGN, TGNInference, TemporalInteraction
+from app.models.scoring import PlayedItems
 from app.services.graph_builder import GraphData
+from app.services.model_artifacts import (
+    IdTable, InferenceBundle, artifact_exists, load_checkpoint, save_artifact
+)
 
 logger = structlog.get_logger()
 
@@ -35,7 +38,11 @@ class TemporalEdge:
 class TemporalDataset(Dataset):
     """Dataset for temporal graph network training.
     
-    Returns temporal edges in chronological order for training.
+    Returns temporal edges in chronological order for training. Each
+    user's history is kept as a CSR index (items and timestamps sorted by
+    time) with the end of every edge's past precomputed, so an edge's last
+    N neighbors are a slice and a batch's neighbor windows are gathered
+    with one index op.
     """
     
     def __init__(
@@ -58,83 +65,196 @@ class TemporalDataset(Dataset):
         self.num_items = num_items
         self.num_neighbors = num_neighbors
         
-        # Build user history index for fast neighbor lookup
-        self.user_history: dict[int, List[Tuple[int, float]]] = {}
-        for i, edge in enumerate(edges):
-            if edge.user_idx not in self.user_history:
-                self.user_history[edge.user_idx] = []
-            self.user_history[edge.user_idx].append((edge.item_idx, edge.timestamp))
+        count = len(edges)
+        self.users = np.fromiter((e.user_idx for e in edges), dtype=np.int64, count=count)
+        self.items = np.fromiter((e.item_idx for e in edges), dtype=np.int64, count=count)
+        self.timestamps = np.fromiter((e.timestamp for e in edges), dtype=np.float64, count=count)
+        self.event_types = np.fromiter((e.event_type for e in edges), dtype=np.int64, count=count)
+        self.weights = np.fromiter((e.weight for e in edges), dtype=np.float32, count=count)
+        
+        # User histories sorted by time (ties keep edge order), as CSR
+        order = np.lexsort((self.timestamps, self.users))
+        self.indptr = np.concatenate([[0], np.cumsum(np.bincount(self.users, minlength=num_users))])
+        self.history_items = self.items[order]
+        self.history_times = self.timestamps[order]
+        
+        # End of each edge's strictly earlier history: (user, time rank)
+        # keys are sorted in history order, so it's one binary search
+        _, time_rank = np.unique(self.timestamps, return_inverse=True)
+        keys = self.users * (int(time_rank.max(initial=0)) + 1) + time_rank
+        self.past_end = np.searchsorted(keys[order], keys, side="left")
+        self.past_count = self.past_end - self.indptr[self.users]
+        
+        # Sorted (user, item) keys of all interactions, for negative sampling
+        self.played_keys = np.unique(self.users * num_items + self.items)
+        self.rng = np.random.default_rng()
+        
+        # Epoch tensors without the negatives, built on first use
+        self._edge_tensors: Optional[dict] = None
     
     def __len__(self) -> int:
         return len(self.edges)
     
-    def __getitem__(self, idx: int) -> dict:
-        """Get a training sample.
+    def _is_played(self, users: np.ndarray, items: np.ndarray) -> np.ndarray:
+        """Whether each user ever interacted with the paired item."""
+        keys = users * self.num_items + items
+        positions = np.minimum(np.searchsorted(self.played_keys, keys), len(self.played_keys) - 1)
+        return self.played_keys[positions] == keys
+    
+    def sample_negatives(self, users: np.ndarray, max_rounds: int = 50) -> np.ndarray:
+        """Draw an item per user from the items the user never interacted with.
+        
+        Rejected draws are redrawn together; after max_rounds (only reached
+        by users who played nearly every item) the last draw is kept.
+        """
+        negatives = self.rng.integers(0, self.num_items, len(users))
+        for _ in range(max_rounds):
+            rejected = self._is_played(users, negatives)
+            if not rejected.any():
+                break
+            negatives[rejected] = self.rng.integers(0, self.num_items, int(rejected.sum()))
+        return negatives
+    
+    def _edge_fields(self, index) -> dict:
+        """Tensors of every batch field except the negatives (see get_batch)."""
+        counts = np.minimum(self.past_count[index], self.num_neighbors)
+        
+        # [batch, num_neighbors] positions into the histories
+        slots = np.arange(self.num_neighbors)
+        mask = slots < counts[:, None]
+        positions = np.where(mask, (self.past_end[index] - counts)[:, None] + slots, 0)
+        
+        neighbor_items = np.where(mask, self.history_items[positions], 0)
+        neighbor_times = np.where(mask, self.history_times[positions], 0.0)
         
+        return {
+            'user_idx': torch.from_numpy(np.ascontiguousarray(self.users[index])),
+            'pos_item_idx': torch.from_numpy(np.ascontiguousarray(self.items[index])),
+            'timestamp': torch.from_numpy(self.timestamps[index].astype(np.float32)),
+            'event_type': torch.from_numpy(np.ascontiguousarray(self.event_types[index])),
+            'weight': torch.from_numpy(np.ascontiguousarray(self.weights[index])),
+            'neighbor_items': torch.from_numpy(neighbor_items),
+            'neighbor_times': torch.from_numpy(neighbor_times.astype(np.float32)),
+            'neighbor_mask': torch.from_numpy(mask.astype(np.int64))
+        }
+    
+    def get_batch(self, index) -> dict:
+        """Get a batch of training samples.
+        
+        Args:
+            index: Edge positions (slice or index array)
+            
         Returns:
-            Dictionary with:
+            Dictionary of tensors over the batch:
             - user_idx: User index
             - pos_item_idx: Positive item index
             - neg_item_idx: Negative item index
             - timestamp: Interaction timestamp
             - event_type: Event type index
             - weight: Interaction weight
-            - neighbor_items: Historical item indices
-            - neighbor_times: Historical timestamps
-            - neighbor_mask: Valid neighbor mask
+            - neighbor_items: Last num_neighbors earlier items, oldest first
+            - neighbor_times: Their timestamps
+            - neighbor_mask: Valid neighbor mask (padding comes last)
         """
-        edge = self.edges[idx]
-        
-        # Get historical neighbors (before this interaction)
-        user_hist = self.user_history.get(edge.user_idx, [])
+        batch = self._edge_fields(index)
+        batch['neg_item_idx'] = torch.from_numpy(self.sample_negatives(batch['user_idx'].numpy()))
+        return batch
+    
+    def epoch_tensors(self, pin_memory: bool = False) -> dict:
+        """All samples of an epoch as contiguous tensors (see get_batch).
         
-        # Filter to items before this timestamp
-        past_items = [(item, t) for item, t in user_hist if t < edge.timestamp]
+        Edge fields and neighbor windows don't change between epochs, so
+        they are built on the first call and reused; only the negatives
+        are redrawn.
         
-        # Take last N neighbors
-        past_items = past_items[-self.num_neighbors:]
+        Args:
+            pin_memory: Return page-locked tensors, for async copies to a GPU
+        """
+        if self._edge_tensors is None or (pin_memory and not self._edge_tensors['user_idx'].is_pinned()):
+            fields = self._edge_fields(slice(None))
+            self._edge_tensors = {
+                key: value.pin_memory() if pin_memory else value
+                for key, value in fields.items()
+            }
+        
+        negatives = torch.from_numpy(self.sample_negatives(self.users))
+        return {**self._edge_tensors, 'neg_item_idx': negatives.pin_memory() if pin_memory else negatives}
+    
+    def __getitem__(self, idx: int) -> dict:
+        """Get a training sample (see get_batch)."""
+        return {key: value[0] for key, value in self.get_batch([idx]).items()}
+
+
+class TemporalBatchLoader:
+    """Batches of a TemporalDataset as slices of per-epoch tensors.
+    
+    Each epoch is materialized once (TemporalDataset.epoch_tensors), so a
+    batch is a dict of zero-copy views, in temporal order. On a CUDA device
+    the tensors are pinned and the next batch is copied on a side stream
+    while the current one trains.
+    """
+    
+    def __init__(
+        self,
+        dataset: TemporalDataset,
+        batch_size: int,
+        device: Optional[torch.device] = None,
+        pin_memory: Optional[bool] = None,
+        prefetch: Optional[bool] = None
+    ):
+        """Initialize loader.
         
-        # Pad to num_neighbors
-        neighbor_items = [item for item, _ in past_items]
-        neighbor_times = [t for _, t in past_items]
+        Args:
+            dataset: Temporal dataset
+            batch_size: Edges per batch
+            device: Device batches are moved to (default: stay on CPU)
+            pin_memory: Pin the epoch tensors (default: on for CUDA)
+            prefetch: Copy the next batch asynchronously (default: on for CUDA)
+        """
+        self.dataset = dataset
+        self.batch_size = batch_size
+        self.device = device or torch.device("cpu")
         
-        n_valid = len(neighbor_items)
-        neighbor_items += [0] * (self.num_neighbors - n_valid)
-        neighbor_times += [0.0] * (self.num_neighbors - n_valid)
-        neighbor_mask = [1] * n_valid + [0] * (self.num_neighbors - n_valid)
+        cuda = self.device.type == "cuda"
+        self.pin_memory = cuda if pin_memory is None else pin_memory
+        self._stream = torch.cuda.Stream(self.device) if cuda and (prefetch is None or prefetch) else None
+    
+    def __len__(self) -> int:
+        return (len(self.dataset) + self.batch_size - 1) // self.batch_size
+    
+    def _to_device(self, batch: dict) -> dict:
+        if self._stream is None:
+            return {key: value.to(self.device, non_blocking=self.pin_memory) for key, value in batch.items()}
         
-        # Sample negative item
-        pos_items = set(item for item, _ in user_hist)
-        neg_item = random.randint(0, self.num_items - 1)
-        while neg_item in pos_items:
-            neg_item = random.randint(0, self.num_items - 1)
+        with torch.cuda.stream(self._stream):
+            return {key: value.to(self.device, non_blocking=True) for key, value in batch.items()}
+    
+    def _wait(self, batch: dict):
+        """Make the compute stream wait for a prefetched batch."""
+        if self._stream is not None:
+            current = torch.cuda.current_stream(self.device)
+            current.wait_stream(self._stream)
+            for value in batch.values():
+                value.record_stream(current)
+    
+    def __iter__(self) -> Iterator[dict]:
+        tensors = self.dataset.epoch_tensors(pin_memory=self.pin_memory)
+        slices = (
+            {key: value[start:start + self.batch_size] for key, value in tensors.items()}
+            for start in range(0, len(self.dataset), self.batch_size)
+        )
         
-        return {
-            'user_idx': edge.user_idx,
-            'pos_item_idx': edge.item_idx,
-            'neg_item_idx': neg_item,
-            'timestamp': edge.timestamp,
-            'event_type': edge.event_type,
-            'weight': edge.weight,
-            'neighbor_items': neighbor_items,
-            'neighbor_times': neighbor_times,
-            'neighbor_mask': neighbor_mask
-        }
-
-
-def collate_temporal(batch: List[dict]) -> dict:
-    """Collate function for temporal dataset."""
-    return {
-        'user_idx': torch.tensor([b['user_idx'] for b in batch]),
-        'pos_item_idx': torch.tensor([b['pos_item_idx'] for b in batch]),
-        'neg_item_idx': torch.tensor([b['neg_item_idx'] for b in batch]),
-        'timestamp': torch.tensor([b['timestamp'] for b in batch], dtype=torch.float32),
-        'event_type': torch.tensor([b['event_type'] for b in batch]),
-        'weight': torch.tensor([b['weight'] for b in batch], dtype=torch.float32),
-        'neighbor_items': torch.tensor([b['neighbor_items'] for b in batch]),
-        'neighbor_times': torch.tensor([b['neighbor_times'] for b in batch], dtype=torch.float32),
-        'neighbor_mask': torch.tensor([b['neighbor_mask'] for b in batch])
-    }
+        pending = None
+        for batch in slices:
+            batch = self._to_device(batch)
+            if pending is not None:
+                self._wait(pending)
+                yield pending
+            pending = batch
+        
+        if pending is not None:
+            self._wait(pending)
+            yield pending
 
 
 class TemporalGraphBuilder:
@@ -284,6 +404,25 @@ class TemporalGraphBuilder:
         return edges, user_id_to_idx, game_slug_to_idx
 
 
+@contextmanager
+def intra_op_threads(num_threads: int):
+    """Run torch ops on num_threads threads, restoring the count afterwards.
+    
+    Each batch is a handful of large ops (every user of a rank group is
+    stepped at once), so CPU training scales through intra-op threads.
+    
+    Args:
+        num_threads: Thread count, 0 to keep torch's default
+    """
+    previous = torch.get_num_threads()
+    if num_threads > 0:
+        torch.set_num_threads(num_threads)
+    try:
+        yield
+    finally:
+        torch.set_num_threads(previous)
+
+
 class TGNTrainer:
     """Trainer for TGN model."""
     
@@ -310,18 +449,20 @@ class TGNTrainer:
         
         logger.info(f"TGN Trainer using device: {self.device}")
         
-        # Initialize model
-        self.model = TGN(
-            num_users=num_users,
-            num_items=num_items,
-            embedding_dim=self.settings.embedding_dim,
-            memory_dim=self.settings.embedding_dim,
-            time_dim=64,
-            message_dim=256,
-            num_heads=8,
-            num_neighbors=10,
-            dropout=0.1
-        ).to(self.device)
+        # Initialize model (the config is saved with it)
+        self.model_config = {
+            "num_users": num_users,
+            "num_items": num_items,
+            "embedding_dim": self.settings.model_embedding_dim("tgn"),
+            "memory_dim": self.settings.model_embedding_dim("tgn"),
+            "time_dim": 64,
+            "message_dim": 256,
+            "num_heads": 8,
+            "num_neighbors": 10,
+            "dropout": 0.1,
+            "memory_aggregation": self.settings.tgn_memory_aggregation
+        }
+        self.model = TGN(**self.model_config).to(self.device)
         
         # Optimizer
         self.optimizer = optim.Adam(
@@ -336,7 +477,8 @@ class TGNTrainer:
         self,
         edges: List[TemporalEdge],
         num_epochs: Optional[int] = None,
-        batch_size: Optional[int] = None
+        batch_size: Optional[int] = None,
+        on_epoch: Optional[Callable[[int, float], None]] = None
     ) -> dict:
         """Train the TGN model.
         
@@ -344,6 +486,8 @@ class TGNTrainer:
             edges: List of temporal edges (sorted by timestamp)
             num_epochs: Number of training epochs
             batch_size: Batch size
+            on_epoch: Called with (epoch, loss) after each epoch; raising
+                from it stops training
             
         Returns:
             Training statistics
@@ -358,96 +502,34 @@ class TGNTrainer:
             num_edges=len(edges)
         )
         
-        # Create dataset and dataloader
+        # Create dataset and loader (temporal order, for memory updates)
         dataset = TemporalDataset(
             edges,
             self.num_users,
             self.num_items,
             num_neighbors=10
         )
-        
-        # Don't shuffle - maintain temporal order for memory updates
-        dataloader = DataLoader(
-            dataset,
-            batch_size=batch_size,
-            shuffle=False,  # Important for temporal order
-            collate_fn=collate_temporal,
-            num_workers=0
-        )
+        loader = TemporalBatchLoader(dataset, batch_size, device=self.device)
         
         best_loss = float('inf')
         
-        for epoch in range(num_epochs):
-            self.model.train()
-            
-            # Reset memory at start of each epoch
-            self.model.memory.reset_memory()
-            
-            total_loss = 0.0
-            num_batches = 0
-            
-            for batch in dataloader:
-                # Move to device
-                user_idx = batch['user_idx'].to(self.device)
-                pos_item_idx = batch['pos_item_idx'].to(self.device)
-                neg_item_idx = batch['neg_item_idx'].to(self.device)
-                timestamps = batch['timestamp'].to(self.device)
-                event_types = batch['event_type'].to(self.device)
-                weights = batch['weight'].to(self.device)
-                neighbor_items = batch['neighbor_items'].to(self.device)
-                neighbor_times = batch['neighbor_times'].to(self.device)
-                neighbor_mask = batch['neighbor_mask'].to(self.device)
-                
-                # Forward pass for positive items
-                self.optimizer.zero_grad()
-                
-                user_emb_pos, pos_emb = self.model(
-                    user_idx,
-                    pos_item_idx,
-                    timestamps,
-                    event_types,
-                    weights,
-                    neighbor_items,
-                    neighbor_times,
-                    neighbor_mask,
-                    update_memory=True
-                )
+        with intra_op_threads(self.settings.tgn_num_threads):
+            for epoch in range(num_epochs):
+                avg_loss = self._train_epoch(loader)
+                self.train_losses.append(avg_loss)
                 
-                # Get negative embeddings (no memory update)
-                neg_emb = self.model.item_embedding(neg_item_idx)
+                if avg_loss < best_loss:
+                    best_loss = avg_loss
                 
-                # Compute BPR loss
-                pos_scores = self.model.predict(user_emb_pos, pos_emb)
-                neg_scores = self.model.predict(user_emb_pos, neg_emb)
+                if on_epoch is not None:
+                    on_epoch(epoch + 1, avg_loss)
                 
-                loss = -F.logsigmoid(pos_scores - neg_scores).mean()
-                
-                # Backward
-                loss.backward()
-                
-                # Gradient clipping
-                torch.nn.utils.clip_grad_norm_(self.model.parameters(), 1.0)
-                
-                self.optimizer.step()
-                
-                # Detach memory for TBPTT
-                self.model.memory.detach_memory()
-                
-                total_loss += loss.item()
-                num_batches += 1
-            
-            avg_loss = total_loss / max(num_batches, 1)
-            self.train_losses.append(avg_loss)
-            
-            if avg_loss < best_loss:
-                best_loss = avg_loss
-            
-            if (epoch + 1) % 10 == 0:
-                logger.info(
-                    f"TGN Epoch {epoch + 1}/{num_epochs}",
-                    loss=f"{avg_loss:.4f}",
-                    best_loss=f"{best_loss:.4f}"
-                )
+                if (epoch + 1) % 10 == 0:
+                    logger.info(
+                        f"TGN Epoch {epoch + 1}/{num_epochs}",
+                        loss=f"{avg_loss:.4f}",
+                        best_loss=f"{best_loss:.4f}"
+                    )
         
         logger.info("TGN training completed", final_loss=f"{self.train_losses[-1]:.4f}")
         
@@ -458,44 +540,143 @@ class TGNTrainer:
             "train_losses": self.train_losses
         }
     
-    def save_model(self, path: Optional[str] = None):
-        """Save model checkpoint."""
+    def _train_epoch(self, loader: TemporalBatchLoader) -> float:
+        """Run one epoch over the loader's batches.
+        
+        Returns:
+            Average batch loss
+        """
+        self.model.train()
+        
+        # Reset memory at start of each epoch
+        self.model.memory.reset_memory()
+        
+        total_loss = 0.0
+        num_batches = 0
+        
+        # Batches arrive on the device, in temporal order
+        for batch in loader:
+            user_idx = batch['user_idx']
+            pos_item_idx = batch['pos_item_idx']
+            neg_item_idx = batch['neg_item_idx']
+            timestamps = batch['timestamp']
+            event_types = batch['event_type']
+            weights = batch['weight']
+            neighbor_items = batch['neighbor_items']
+            neighbor_times = batch['neighbor_times']
+            neighbor_mask = batch['neighbor_mask']
+            
+            # Forward pass for positive items
+            self.optimizer.zero_grad()
+            
+            user_emb_pos, pos_emb = self.model(
+                user_idx,
+                pos_item_idx,
+                timestamps,
+                event_types,
+                weights,
+                neighbor_items,
+                neighbor_times,
+                neighbor_mask,
+                update_memory=True
+            )
+            
+            # Get negative embeddings (no memory update)
+            neg_emb = self.model.item_embedding(neg_item_idx)
+            
+            # Compute BPR loss
+            pos_scores = self.model.predict(user_emb_pos, pos_emb)
+            neg_scores = self.model.predict(user_emb_pos, neg_emb)
+            
+            loss = -F.logsigmoid(pos_scores - neg_scores).mean()
+            
+            # Backward
+            loss.backward()
+            
+            # Gradient clipping
+            torch.nn.utils.clip_grad_norm_(self.model.parameters(), 1.0)
+            
+            self.optimizer.step()
+            
+            # Detach memory for TBPTT
+            self.model.memory.detach_memory()
+            
+            total_loss += loss.item()
+            num_batches += 1
+        
+        return total_loss / max(num_batches, 1)
+    
+    def save_model(
+        self,
+        path: Optional[str] = None,
+        user_id_to_idx: Optional[dict] = None,
+        game_slug_to_idx: Optional[dict] = None,
+        edges: Optional[List[TemporalEdge]] = None
+    ):
+        """Save the model artifact (see app.services.model_artifacts).
+        
+        With the ID mappings and training edges, the artifact can be
+        served by load_inference without rebuilding the temporal graph.
+        
+        Args:
+            path: Checkpoint path (defaults to config)
+            user_id_to_idx: User ID -> index mapping of the training data
+            game_slug_to_idx: Game slug -> index mapping of the training data
+            edges: Training edges (for the played-items index)
+        """
         if path is None:
             path = self.settings.model_path.replace('lightgcn', 'tgn')
         
         Path(path).parent.mkdir(parents=True, exist_ok=True)
         
-        checkpoint = {
-            "model_state_dict": self.model.state_dict(),
-            "optimizer_state_dict": self.optimizer.state_dict(),
-            "train_losses": self.train_losses,
-            "num_users": self.num_users,
-            "num_items": self.num_items,
-            "embedding_dim": self.settings.embedding_dim
-        }
-        
-        torch.save(checkpoint, path)
+        arrays = {}
+        if edges:
+            played = self.get_inference(edges).played
+            arrays = {"played_indptr": played.indptr, "played_indices": played.indices}
+        
+        id_tables = {}
+        if user_id_to_idx is not None and game_slug_to_idx is not None:
+            id_tables = {"users": user_id_to_idx, "games": game_slug_to_idx}
+        
+        save_artifact(
+            path,
+            "tgn",
+            self.model.state_dict(),
+            config=self.model_config,
+            stats={
+                "num_users": self.num_users,
+                "num_items": self.num_items,
+                "num_edges": len(edges) if edges else 0
+            },
+            arrays=arrays,
+            id_tables=id_tables,
+            training={
+                "optimizer_state_dict": self.optimizer.state_dict(),
+                "train_losses": self.train_losses
+            }
+        )
         logger.info("TGN model saved", path=path)
     
     def load_model(self, path: Optional[str] = None) -> bool:
-        """Load model checkpoint."""
+        """Load the model artifact (or a legacy checkpoint) to resume training."""
         if path is None:
             path = self.settings.model_path.replace('lightgcn', 'tgn')
         
-        if not os.path.exists(path):
-            return False
-        
         try:
-            checkpoint = torch.load(path, map_location=self.device)
+            checkpoint = load_checkpoint(path, map_location=self.device)
+            if checkpoint is None:
+                return False
             
-            if (checkpoint["num_users"] != self.num_users or
-                checkpoint["num_items"] != self.num_items):
+            state_dict, config, training = checkpoint
+            if (config["num_users"] != self.num_users or
+                config["num_items"] != self.num_items):
                 logger.warning("Model dimensions don't match, cannot load")
                 return False
             
-            self.model.load_state_dict(checkpoint["model_state_dict"])
-            self.optimizer.load_state_dict(checkpoint["optimizer_state_dict"])
-            self.train_losses = checkpoint.get("train_losses", [])
+            self.model.load_state_dict(state_dict)
+            if training:
+                self.optimizer.load_state_dict(training["optimizer_state_dict"])
+                self.train_losses = training.get("train_losses", [])
             
             logger.info("TGN model loaded", path=path)
             return True
@@ -504,7 +685,73 @@ class TGNTrainer:
             logger.error("Failed to load TGN model", error=str(e))
             return False
     
-    def get_inference(self) -> TGNInference:
-        """Get inference wrapper."""
-        return TGNInference(self.model, self.device)
+    def get_inference(self, edges: Optional[List[TemporalEdge]] = None) -> TGNInference:
+        """Get inference wrapper.
+        
+        Args:
+            edges: Training edges; when given, the wrapper can exclude
+                each user's already played items
+        """
+        inference = TGNInference(self.model, self.device)
+        
+        if edges:
+            inference.played = PlayedItems(
+                np.fromiter((e.user_idx for e in edges), dtype=np.int64, count=len(edges)),
+                np.fromiter((e.item_idx for e in edges), dtype=np.int64, count=len(edges)),
+                self.num_users,
+                self.num_items
+            )
+        
+        return inference
 
+
+def load_inference(
+    path: Optional[str] = None,
+    device: Optional[torch.device] = None
+) -> Optional[Tuple[TGNInference, IdTable, IdTable]]:
+    """Load a saved TGN model for serving, without rebuilding its edges.
+    
+    Like the LightGCN loader, the model is assigned the mapped arrays
+    instead of copying them. Memory updates from live sessions write to
+    private copy-on-write pages, never to the artifact.
+    
+    Args:
+        path: Checkpoint path (defaults to config)
+        device: PyTorch device (CPU keeps the arrays mapped)
+        
+    Returns:
+        (inference, user_id_to_idx, game_slug_to_idx), or None if no
+        artifact with ID mappings has been saved
+        
+    Raises:
+        ArtifactError: If the artifact has another format version
+    """
+    path = path or get_settings().model_path.replace('lightgcn', 'tgn')
+    device = device or torch.device("cpu")
+    
+    if not artifact_exists(path):
+        return None
+    
+    bundle = InferenceBundle.load(path)
+    
+    if "ids.users.keys" not in bundle.arrays:
+        logger.warning("TGN artifact has no ID mappings, cannot serve it", path=str(bundle.path))
+        return None
+    
+    config = bundle.config
+    with torch.device("meta"):
+        model = TGN(**config)
+    model.load_state_dict(bundle.state_dict(), assign=True)
+    model.to(device)
+    
+    inference = TGNInference(model, device)
+    if "played_indptr" in bundle.arrays:
+        inference.played = PlayedItems.from_csr(
+            bundle.tensor("played_indptr"),
+            bundle.tensor("played_indices"),
+            config["num_users"],
+            config["num_items"]
+        )
+    
+    logger.info("TGN inference loaded", path=str(bundle.path), checksum=bundle.checksum[:12])
+    return inference, bundle.id_table("users"), bundle.id_table("games")
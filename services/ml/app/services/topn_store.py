@@ -0,0 +1,180 @@
+"""Precomputed top-N recommendation tables.
+
+A table is a directory holding memory-mapped arrays, so serving a cached
+recommendation is a binary search plus one row read, with no model in
+memory and nothing built per user on load:
+    
+    meta.json        num_users, num_games, top_n, metric, model, created_at
+    user_ids.npy     User IDs, sorted
+    user_rows.npy    int64 row of each sorted user ID
+    game_slugs.npy   Game slug of each game index
+    items.i32        int32 [num_users, top_n] game indices, best first
+    scores.f16       float16 [num_users, top_n] scores
+"""
+
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import structlog
+
+from app.config import get_settings
+from app.services.model_artifacts import IdTable
+
+logger = structlog.get_logger()
+
+META_FILE = "meta.json"
+USER_IDS_FILE = "user_ids.npy"
+USER_ROWS_FILE = "user_rows.npy"
+GAME_SLUGS_FILE = "game_slugs.npy"
+ITEMS_FILE = "items.i32"
+SCORES_FILE = "scores.f16"
+
+
+@dataclass
+class TopNTable:
+    """One loaded top-N table."""
+    
+    meta: dict
+    user_to_row: IdTable
+    game_slugs: np.ndarray
+    items: np.ndarray
+    scores: np.ndarray
+    mtime: float
+    
+    @classmethod
+    def load(cls, path: str) -> "TopNTable":
+        """Open a table directory (arrays are memory-mapped, not read)."""
+        meta_path = os.path.join(path, META_FILE)
+        mtime = os.path.getmtime(meta_path)
+        with open(meta_path) as f:
+            meta = json.load(f)
+        
+        shape = (meta["num_users"], meta["top_n"])
+        user_ids = np.load(os.path.join(path, USER_IDS_FILE), mmap_mode="r")
+        rows_path = os.path.join(path, USER_ROWS_FILE)
+        if os.path.exists(rows_path):
+            user_to_row = IdTable(user_ids, np.load(rows_path, mmap_mode="r"))
+        else:
+            # Tables written before user_rows.npy list IDs in row order
+            order = np.argsort(user_ids, kind="stable")
+            user_to_row = IdTable(user_ids[order], order)
+        
+        return cls(
+            meta=meta,
+            user_to_row=user_to_row,
+            game_slugs=np.load(os.path.join(path, GAME_SLUGS_FILE)),
+            items=np.memmap(os.path.join(path, ITEMS_FILE), dtype=np.int32, mode="r", shape=shape),
+            scores=np.memmap(os.path.join(path, SCORES_FILE), dtype=np.float16, mode="r", shape=shape),
+            mtime=mtime
+        )
+    
+    def lookup(
+        self,
+        user_id: str,
+        limit: int = 10,
+        exclude_games: Optional[list[str]] = None
+    ) -> Optional[list[dict]]:
+        """Get a user's precomputed recommendations.
+        
+        Args:
+            user_id: User ID
+            limit: Number of recommendations
+            exclude_games: Games to drop from the stored ranking
+            
+        Returns:
+            List of {game_slug, score, game_idx}, or None if the user
+            is not in the table
+        """
+        row = self.user_to_row.lookup([user_id])[0]
+        if row < 0:
+            return None
+        
+        exclude = set(exclude_games) if exclude_games else ()
+        results = []
+        
+        for game_idx, score in zip(self.items[row].tolist(), self.scores[row].tolist()):
+            game_slug = str(self.game_slugs[game_idx])
+            if game_slug in exclude:
+                continue
+            
+            results.append({"game_slug": game_slug, "score": score, "game_idx": game_idx})
+            if len(results) >= limit:
+                break
+        
+        return results
+
+
+class TopNStore:
+    """Serves recommendations from precomputed top-N tables."""
+    
+    def __init__(self, path: Optional[str] = None):
+        """Initialize store.
+        
+        Args:
+            path: Directory holding one table per model (defaults to config)
+        """
+        self.settings = get_settings()
+        self.path = path or self.settings.topn_path
+        self._tables: dict[str, TopNTable] = {}
+        self._checked_at: dict[str, float] = {}
+    
+    def get_table(self, model: str) -> Optional[TopNTable]:
+        """Get the table of a model, reloading it if it was rewritten.
+        
+        The table's meta.json is checked at most once per
+        serving_version_check_interval.
+        """
+        now = time.monotonic()
+        table = self._tables.get(model)
+        
+        if table is not None and now - self._checked_at.get(model, 0.0) < self.settings.serving_version_check_interval:
+            return table
+        self._checked_at[model] = now
+        
+        table_path = os.path.join(self.path, model)
+        try:
+            mtime = os.path.getmtime(os.path.join(table_path, META_FILE))
+            if table is None or mtime != table.mtime:
+                table = TopNTable.load(table_path)
+                self._tables[model] = table
+                logger.info(
+                    "Loaded top-N table",
+                    model=model,
+                    num_users=table.meta["num_users"],
+                    top_n=table.meta["top_n"]
+                )
+        except FileNotFoundError:
+            # Not computed yet, or being replaced right now
+            pass
+        except Exception as e:
+            logger.error("Failed to load top-N table", model=model, error=str(e))
+        
+        return table
+    
+    def lookup(
+        self,
+        model: str,
+        user_id: str,
+        limit: int = 10,
+        exclude_games: Optional[list[str]] = None
+    ) -> Optional[list[dict]]:
+        """Get a user's precomputed recommendations for a model.
+        
+        Returns:
+            List of {game_slug, score, game_idx}, or None if there is no
+            table for the model or the user is not in it
+        """
+        table = self.get_table(model)
+        if table is None:
+            return None
+        return table.lookup(user_id, limit, exclude_games)
+
+
+def table_path(model: str, root: Optional[str] = None) -> str:
+    """Directory of a model's top-N table."""
+    return str(Path(root or get_settings().topn_path) / model)
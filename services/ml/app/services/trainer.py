@@ -1,102 +1,40 @@
 """Training pipeline for LightGCN model."""
 
-import os
-import random
 from pathlib import Path
-from typing import Optional, List, Tuple, Dict
+from typing import Callable, Optional, List, Tuple, Dict
 
 import torch
 import torch.optim as optim
 import torch.nn.functional as F
-from torch.utils.data import Dataset, DataLoader
 import structlog
 
 from app.config import get_settings
 from app.models.lightgcn import LightGCN, LightGCNInference
+from app.models.scoring import PlayedItems
 from app.services.graph_builder import GraphData
+from app.services.model_artifacts import (
+    IdTable, InferenceBundle, artifact_exists, load_checkpoint, save_artifact
+)
+from app.services.sampling import BPRSampler
 
 logger = structlog.get_logger()
 
 
-class BPRDataset(Dataset):
-    """Dataset for LightGCN training using BPR loss.
-    
-    Generates (user, positive_game, negative_game) triplets.
-    """
-    
-    def __init__(
-        self,
-        graph_data: GraphData,
-        num_negatives: int = 1
-    ):
-        """Initialize dataset.
-        
-        Args:
-            graph_data: User-game graph data
-            num_negatives: Negative samples per positive
-        """
-        self.graph_data = graph_data
-        self.num_negatives = num_negatives
-        
-        # Build user -> positive games mapping from edges
-        self.user_positive_games: Dict[int, set] = {}
-        
-        edge_index = graph_data.edge_index
-        for i in range(edge_index.shape[1]):
-            src = edge_index[0, i].item()
-            dst = edge_index[1, i].item()
-            
-            # src is user (0 to num_users-1)
-            # dst is game (num_users to num_users+num_games-1)
-            if src < graph_data.num_users:
-                user_idx = src
-                game_idx = dst - graph_data.num_users
-                
-                if user_idx not in self.user_positive_games:
-                    self.user_positive_games[user_idx] = set()
-                self.user_positive_games[user_idx].add(game_idx)
-        
-        # Build training triplets
-        self.triplets = []
-        for user_idx, pos_games in self.user_positive_games.items():
-            for pos_game in pos_games:
-                self.triplets.append((user_idx, pos_game))
-        
-        self.all_games = set(range(graph_data.num_games))
-    
-    def __len__(self) -> int:
-        return len(self.triplets) * self.num_negatives
-    
-    def __getitem__(self, idx: int) -> Tuple[int, int, int]:
-        """Get a training triplet."""
-        triplet_idx = idx // self.num_negatives
-        user_idx, pos_game_idx = self.triplets[triplet_idx]
-        
-        # Sample negative game
-        pos_games = self.user_positive_games.get(user_idx, set())
-        neg_candidates = list(self.all_games - pos_games)
-        
-        if not neg_candidates:
-            neg_game_idx = random.randint(0, self.graph_data.num_games - 1)
-        else:
-            neg_game_idx = random.choice(neg_candidates)
-        
-        return user_idx, pos_game_idx, neg_game_idx
-
-
 class LightGCNTrainer:
     """Trainer for LightGCN model."""
     
     def __init__(
         self,
         graph_data: GraphData,
-        device: Optional[torch.device] = None
+        device: Optional[torch.device] = None,
+        embedding_dim: Optional[int] = None
     ):
         """Initialize trainer.
         
         Args:
             graph_data: User-game graph data
             device: PyTorch device
+            embedding_dim: Embedding dimension (defaults to config)
         """
         self.settings = get_settings()
         self.graph_data = graph_data
@@ -111,7 +49,7 @@ class LightGCNTrainer:
         self.model = LightGCN(
             num_users=graph_data.num_users,
             num_items=graph_data.num_games,
-            embedding_dim=self.settings.embedding_dim,
+            embedding_dim=embedding_dim or self.settings.model_embedding_dim("lightgcn"),
             num_layers=self.settings.num_layers
         ).to(self.device)
         
@@ -121,6 +59,9 @@ class LightGCNTrainer:
         if graph_data.edge_weight is not None:
             self.edge_weight = graph_data.edge_weight.to(self.device)
         
+        # Normalized adjacency, built once per graph
+        self.adj = graph_data.get_norm_adj().to(self.device)
+        
         # Optimizer
         self.optimizer = optim.Adam(
             self.model.parameters(),
@@ -133,19 +74,28 @@ class LightGCNTrainer:
     def train(
         self,
         num_epochs: Optional[int] = None,
-        batch_size: Optional[int] = None
+        batch_size: Optional[int] = None,
+        train_mode: Optional[str] = None,
+        on_epoch: Optional[Callable[[int, float], None]] = None
     ) -> dict:
         """Train the LightGCN model.
         
         Args:
             num_epochs: Number of training epochs
             batch_size: Batch size
+            train_mode: "minibatch" or "full_batch" (defaults to config)
+            on_epoch: Called with (epoch, loss) after each epoch; raising
+                from it stops training
             
         Returns:
             Training statistics
         """
         num_epochs = num_epochs or self.settings.num_epochs
         batch_size = batch_size or self.settings.batch_size
+        train_mode = train_mode or self.settings.lightgcn_train_mode
+        
+        if train_mode not in ("minibatch", "full_batch"):
+            raise ValueError(f"Unknown LightGCN train mode: {train_mode}")
         
         logger.info(
             "Starting LightGCN training",
@@ -153,13 +103,14 @@ class LightGCNTrainer:
             batch_size=batch_size,
             num_users=self.graph_data.num_users,
             num_games=self.graph_data.num_games,
-            num_edges=self.graph_data.num_edges
+            num_edges=self.graph_data.num_edges,
+            train_mode=train_mode
         )
         
-        # Create dataset
-        dataset = BPRDataset(self.graph_data)
+        # Create sampler
+        sampler = BPRSampler.from_graph_data(self.graph_data)
         
-        if len(dataset) == 0:
+        if len(sampler) == 0:
             logger.warning("No training data for LightGCN")
             return {
                 "final_loss": 0.0,
@@ -167,51 +118,29 @@ class LightGCNTrainer:
                 "train_losses": []
             }
         
-        dataloader = DataLoader(
-            dataset,
-            batch_size=batch_size,
-            shuffle=True,
-            num_workers=0
-        )
+        if train_mode == "full_batch":
+            run_epoch = self._train_epoch_full_batch
+            learning_rate = self.settings.full_batch_learning_rate
+        else:
+            run_epoch = self._train_epoch_minibatch
+            learning_rate = self.settings.learning_rate
+        
+        for param_group in self.optimizer.param_groups:
+            param_group["lr"] = learning_rate
         
         best_loss = float('inf')
         
         for epoch in range(num_epochs):
             self.model.train()
-            total_loss = 0.0
-            num_batches = 0
-            
-            for batch in dataloader:
-                user_idx, pos_game_idx, neg_game_idx = batch
-                user_idx = user_idx.to(self.device)
-                pos_game_idx = pos_game_idx.to(self.device)
-                neg_game_idx = neg_game_idx.to(self.device)
-                
-                self.optimizer.zero_grad()
-                
-                # Forward pass
-                user_emb, item_emb = self.model(self.edge_index, self.edge_weight)
-                
-                # Compute BPR loss
-                loss = self.model.bpr_loss(
-                    user_idx, pos_game_idx, neg_game_idx,
-                    user_emb, item_emb
-                )
-                
-                # Backward
-                loss.backward()
-                torch.nn.utils.clip_grad_norm_(self.model.parameters(), 1.0)
-                self.optimizer.step()
-                
-                total_loss += loss.item()
-                num_batches += 1
-            
-            avg_loss = total_loss / max(num_batches, 1)
+            avg_loss = run_epoch(sampler, batch_size)
             self.train_losses.append(avg_loss)
             
             if avg_loss < best_loss:
                 best_loss = avg_loss
             
+            if on_epoch is not None:
+                on_epoch(epoch + 1, avg_loss)
+            
             if (epoch + 1) % 10 == 0:
                 logger.info(
                     f"LightGCN Epoch {epoch + 1}/{num_epochs}",
@@ -227,41 +156,154 @@ class LightGCNTrainer:
             "train_losses": self.train_losses
         }
     
-    def save_model(self, path: Optional[str] = None):
-        """Save model checkpoint."""
+    def _train_epoch_minibatch(self, sampler: BPRSampler, batch_size: int) -> float:
+        """Run one epoch with a full propagation and optimizer step per batch.
+        
+        Returns:
+            Average BPR loss over the epoch's batches
+        """
+        total_loss = 0.0
+        num_batches = 0
+        
+        for batch in sampler.batches(batch_size):
+            user_idx, pos_game_idx, neg_game_idx = batch
+            user_idx = user_idx.to(self.device)
+            pos_game_idx = pos_game_idx.to(self.device)
+            neg_game_idx = neg_game_idx.to(self.device)
+            
+            self.optimizer.zero_grad()
+            
+            # Forward pass
+            user_emb, item_emb = self.model(self.edge_index, self.edge_weight, self.adj)
+            
+            # Compute BPR loss
+            loss = self.model.bpr_loss(
+                user_idx, pos_game_idx, neg_game_idx,
+                user_emb, item_emb
+            )
+            
+            # Backward
+            loss.backward()
+            torch.nn.utils.clip_grad_norm_(self.model.parameters(), 1.0)
+            self.optimizer.step()
+            
+            total_loss += loss.item()
+            num_batches += 1
+        
+        return total_loss / max(num_batches, 1)
+    
+    def _train_epoch_full_batch(self, sampler: BPRSampler, batch_size: int) -> float:
+        """Run one epoch with a single propagation and optimizer step.
+        
+        The propagated embeddings are detached into leaf tensors, the BPR
+        loss of every batch is backpropagated into them (cheap, no graph
+        work), and the accumulated gradient is pushed through the K-layer
+        propagation once at the end. The step minimizes the mean loss over
+        all triplets of the epoch.
+        
+        Returns:
+            Average BPR loss over the epoch's batches
+        """
+        self.optimizer.zero_grad()
+        
+        # Forward pass (once per epoch)
+        user_emb, item_emb = self.model(self.edge_index, self.edge_weight, self.adj)
+        user_leaf = user_emb.detach().requires_grad_()
+        item_leaf = item_emb.detach().requires_grad_()
+        
+        num_batches = -(-len(sampler) // batch_size)
+        total_loss = 0.0
+        
+        for batch in sampler.batches(batch_size):
+            user_idx, pos_game_idx, neg_game_idx = batch
+            user_idx = user_idx.to(self.device)
+            pos_game_idx = pos_game_idx.to(self.device)
+            neg_game_idx = neg_game_idx.to(self.device)
+            
+            # Scale so gradients add up to those of the epoch mean
+            loss = self.model.bpr_loss(
+                user_idx, pos_game_idx, neg_game_idx,
+                user_leaf, item_leaf
+            )
+            (loss / num_batches).backward()
+            
+            total_loss += loss.item()
+        
+        # Backward through the propagation (once per epoch)
+        torch.autograd.backward(
+            [user_emb, item_emb],
+            [user_leaf.grad, item_leaf.grad]
+        )
+        torch.nn.utils.clip_grad_norm_(self.model.parameters(), 1.0)
+        self.optimizer.step()
+        
+        return total_loss / max(num_batches, 1)
+    
+    def save_model(self, path: Optional[str] = None, inference: Optional[LightGCNInference] = None):
+        """Save the model artifact (see app.services.model_artifacts).
+        
+        The inference bundle holds the final embeddings and played-items
+        index too, so serving needs neither the graph nor a forward pass.
+        
+        Args:
+            path: Checkpoint path (defaults to config)
+            inference: Inference wrapper of the current weights, if already
+                computed
+        """
         if path is None:
             path = self.settings.model_path
         
         Path(path).parent.mkdir(parents=True, exist_ok=True)
         
-        checkpoint = {
-            "model_state_dict": self.model.state_dict(),
-            "optimizer_state_dict": self.optimizer.state_dict(),
-            "train_losses": self.train_losses,
-            "num_users": self.graph_data.num_users,
-            "num_games": self.graph_data.num_games,
-            "embedding_dim": self.settings.embedding_dim,
-            "num_layers": self.settings.num_layers,
-            "user_id_to_idx": self.graph_data.user_id_to_idx,
-            "game_slug_to_idx": self.graph_data.game_slug_to_idx,
-        }
+        inference = inference or self.get_inference()
         
-        torch.save(checkpoint, path)
+        save_artifact(
+            path,
+            "lightgcn",
+            self.model.state_dict(),
+            config={
+                "num_users": self.graph_data.num_users,
+                "num_items": self.graph_data.num_games,
+                "embedding_dim": self.model.embedding_dim,
+                "num_layers": self.model.num_layers
+            },
+            stats={
+                "num_users": self.graph_data.num_users,
+                "num_games": self.graph_data.num_games,
+                "num_edges": self.graph_data.num_edges
+            },
+            arrays={
+                "user_embeddings": inference.get_all_user_embeddings(),
+                "item_embeddings": inference.get_all_item_embeddings(),
+                "played_indptr": inference.played.indptr,
+                "played_indices": inference.played.indices
+            },
+            id_tables={
+                "users": self.graph_data.user_id_to_idx,
+                "games": self.graph_data.game_slug_to_idx
+            },
+            training={
+                "optimizer_state_dict": self.optimizer.state_dict(),
+                "train_losses": self.train_losses
+            }
+        )
         logger.info("LightGCN model saved", path=path)
     
     def load_model(self, path: Optional[str] = None) -> bool:
-        """Load model checkpoint."""
+        """Load the model artifact (or a legacy checkpoint) to resume training."""
         if path is None:
             path = self.settings.model_path
         
-        if not os.path.exists(path):
-            return False
-        
         try:
-            checkpoint = torch.load(path, map_location=self.device)
-            self.model.load_state_dict(checkpoint["model_state_dict"])
-            self.optimizer.load_state_dict(checkpoint["optimizer_state_dict"])
-            self.train_losses = checkpoint.get("train_losses", [])
+            checkpoint = load_checkpoint(path, map_location=self.device)
+            if checkpoint is None:
+                return False
+            
+            state_dict, _, training = checkpoint
+            self.model.load_state_dict(state_dict)
+            if training:
+                self.optimizer.load_state_dict(training["optimizer_state_dict"])
+                self.train_losses = training.get("train_losses", [])
             
             logger.info("LightGCN model loaded", path=path)
             return True
@@ -273,6 +315,59 @@ class LightGCNTrainer:
     def get_inference(self) -> LightGCNInference:
         """Get inference wrapper."""
         inference = LightGCNInference(self.model, self.device)
-        inference.compute_embeddings(self.edge_index, self.edge_weight)
+        inference.compute_embeddings(self.edge_index, self.edge_weight, self.adj)
         return inference
 
+
+def load_inference(
+    path: Optional[str] = None,
+    device: Optional[torch.device] = None
+) -> Optional[Tuple[LightGCNInference, IdTable, IdTable]]:
+    """Load a saved LightGCN model for serving, without its graph.
+    
+    The model is built on the meta device and assigned the mapped
+    arrays, so nothing is allocated or copied: loading takes milliseconds
+    and workers share the weights through the page cache.
+    
+    Args:
+        path: Checkpoint path (defaults to config)
+        device: PyTorch device (CPU keeps the arrays mapped)
+        
+    Returns:
+        (inference, user_id_to_idx, game_slug_to_idx), or None if no
+        artifact has been saved
+        
+    Raises:
+        ArtifactError: If the artifact has another format version
+    """
+    path = path or get_settings().model_path
+    device = device or torch.device("cpu")
+    
+    if not artifact_exists(path):
+        return None
+    
+    bundle = InferenceBundle.load(path)
+    
+    config = bundle.config
+    with torch.device("meta"):
+        model = LightGCN(
+            num_users=config["num_users"],
+            num_items=config["num_items"],
+            embedding_dim=config["embedding_dim"],
+            num_layers=config["num_layers"]
+        )
+    model.load_state_dict(bundle.state_dict(), assign=True)
+    model.to(device).eval()
+    
+    inference = LightGCNInference(model, device)
+    inference.user_embeddings = bundle.tensor("user_embeddings").to(device)
+    inference.item_embeddings = bundle.tensor("item_embeddings").to(device)
+    inference.played = PlayedItems.from_csr(
+        bundle.tensor("played_indptr"),
+        bundle.tensor("played_indices"),
+        config["num_users"],
+        config["num_items"]
+    )
+    
+    logger.info("LightGCN inference loaded", path=str(bundle.path), checksum=bundle.checksum[:12])
+    return inference, bundle.id_table("users"), bundle.id_table("games")
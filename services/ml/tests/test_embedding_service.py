@@ -0,0 +1,94 @@
+"""Versioned publishing when a step fails part-way."""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services.embedding_service import EmbeddingService
+
+
+class FakeQdrant:
+    """Collections and aliases of a Qdrant server, failing on request."""
+    
+    def __init__(self, collections=(), fail_alias_for=None, fail_delete=False):
+        self.collections = set(collections)
+        self.aliases: dict[str, str] = {}
+        self.fail_alias_for = fail_alias_for
+        self.fail_delete = fail_delete
+    
+    def get_collections(self):
+        return SimpleNamespace(collections=[SimpleNamespace(name=n) for n in self.collections])
+    
+    def get_aliases(self):
+        return SimpleNamespace(aliases=[
+            SimpleNamespace(alias_name=a, collection_name=c) for a, c in self.aliases.items()
+        ])
+    
+    def create_collection(self, collection_name, **kwargs):
+        self.collections.add(collection_name)
+    
+    def delete_collection(self, collection_name):
+        if self.fail_delete and "_v" in collection_name:
+            raise ConnectionError("delete failed")
+        self.collections.discard(collection_name)
+    
+    def update_collection_aliases(self, change_aliases_operations):
+        for op in change_aliases_operations:
+            create = getattr(op, "create_alias", None)
+            if create is not None and create.alias_name == self.fail_alias_for:
+                raise ConnectionError("alias update failed")
+        for op in change_aliases_operations:
+            if getattr(op, "delete_alias", None) is not None:
+                del self.aliases[op.delete_alias.alias_name]
+            else:
+                assert op.create_alias.alias_name not in self.collections
+                self.aliases[op.create_alias.alias_name] = op.create_alias.collection_name
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = EmbeddingService()
+    monkeypatch.setattr(service, "publish_embeddings", lambda *args, **kwargs: None)
+    monkeypatch.setattr(service, "_finish_indexing", lambda *args: None)
+    return service
+
+
+def _uploads():
+    return {
+        alias: {"keys": ["a", "b"], "vectors": np.zeros((2, 4)), "key_field": "id", "source": "test"}
+        for alias in ("users", "games")
+    }
+
+
+def test_failed_legacy_swap_keeps_aliased_versions(service):
+    service._client = FakeQdrant(["users", "games"], fail_alias_for="games")
+    
+    with pytest.raises(ConnectionError, match="alias update failed"):
+        service.publish_versioned(_uploads())
+    
+    client = service._client
+    # users was migrated and keeps its data; games lost its legacy
+    # collection, so its new version is kept rather than deleted
+    assert client.aliases["users"] in client.collections
+    assert "users" not in client.collections
+    assert sum(name.startswith("games_v") for name in client.collections) == 1
+
+
+def test_failed_swap_deletes_unaliased_versions(service):
+    service._client = FakeQdrant(["users_v1", "games_v1"], fail_alias_for="games")
+    service._client.aliases = {"users": "users_v1", "games": "games_v1"}
+    
+    with pytest.raises(ConnectionError):
+        service.publish_versioned(_uploads())
+    
+    client = service._client
+    assert client.aliases == {"users": "users_v1", "games": "games_v1"}
+    assert client.collections == {"users_v1", "games_v1"}
+
+
+def test_cleanup_failure_does_not_hide_the_error(service):
+    service._client = FakeQdrant(fail_alias_for="games", fail_delete=True)
+    
+    with pytest.raises(ConnectionError, match="alias update failed"):
+        service.publish_versioned(_uploads())
@@ -0,0 +1,161 @@
+"""Parity of the vectorized GraphBuilder.build_graph with the per-row loop."""
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+
+from app.services.graph_builder import GraphBuilder
+
+NOW = datetime.now(timezone.utc)
+
+
+def _ago(days: float) -> datetime:
+    return NOW - timedelta(days=days)
+
+
+EVENTS = [
+    # user_id, game_slug, event_type, duration_seconds, created_at
+    ("u1", "slots-a", "impression", None, _ago(1)),
+    ("u1", "slots-a", "click", None, _ago(2)),
+    ("u1", "slots-b", "game_time", 600, _ago(3)),
+    ("u2", "slots-a", "play_end", 30, _ago(0.5)),
+    ("u2", "slots-c", "play_start", 900, _ago(4)),  # no duration bonus
+    ("u3", "slots-b", "game_time", None, _ago(6)),
+    ("u3", "slots-d", "unknown", 100, _ago(1)),  # zero weight, dropped
+    ("u4", "slots-c", "impression", None, _ago(10)),
+    ("u2", "slots-a", "click", None, _ago(1.5)),
+    ("u5", "slots-e", "game_time", 0, _ago(2)),
+]
+
+REVIEWS = [
+    # user_id, game_slug, rating, sentiment_score, updated_at
+    ("u1", "slots-b", 5, 0.8, _ago(5)),
+    ("u4", "slots-c", 1, -0.9, _ago(3)),  # makes the pair's sum negative
+    ("u5", "slots-f", 4, None, _ago(20)),
+    ("u6", "slots-a", 3, 0.1, _ago(1)),
+]
+
+RATINGS = [
+    # user_id, game_slug, rating, updated_at
+    ("u1", "slots-b", 1, _ago(2)),  # shadowed by the review
+    ("u4", "slots-c", 5, _ago(1)),  # shadowed by the review
+    ("u6", "slots-a", 5, _ago(1)),  # shadowed by the review
+    ("u2", "slots-b", 4, _ago(8)),
+    ("u3", "slots-d", 1, _ago(1)),  # only a negative weight, dropped
+    ("u7", "slots-a", 4, _ago(40)),
+    ("u5", "slots-e", 3, _ago(2)),
+]
+
+
+def reference_graph(builder: GraphBuilder) -> dict[tuple[str, str], float]:
+    """Positive pair weights as computed by the original per-row loop."""
+    interactions: dict[tuple[str, str], float] = {}
+    
+    for user_id, game_slug, event_type, duration_seconds, created_at in EVENTS:
+        weight = builder._calculate_event_weight(event_type, duration_seconds)
+        decay = builder._calculate_time_decay(created_at, builder.settings.behavior_half_life_days)
+        interactions[(user_id, game_slug)] = interactions.get((user_id, game_slug), 0.0) + weight * decay
+    
+    reviewed_games: set[tuple[str, str]] = set()
+    for user_id, game_slug, rating, sentiment_score, updated_at in REVIEWS:
+        weight = builder._calculate_rating_weight(rating)
+        if sentiment_score is not None:
+            weight *= 1.0 + (float(sentiment_score) * 0.5)
+        decay = builder._calculate_time_decay(updated_at, builder.settings.rating_half_life_days)
+        reviewed_games.add((user_id, game_slug))
+        interactions[(user_id, game_slug)] = interactions.get((user_id, game_slug), 0.0) + weight * decay
+    
+    for user_id, game_slug, rating, updated_at in RATINGS:
+        if (user_id, game_slug) in reviewed_games:
+            continue
+        weight = builder._calculate_rating_weight(rating)
+        decay = builder._calculate_time_decay(updated_at, builder.settings.rating_half_life_days)
+        interactions[(user_id, game_slug)] = interactions.get((user_id, game_slug), 0.0) + weight * decay
+    
+    return {key: value for key, value in interactions.items() if value > 0}
+
+
+def _rows_for(name: str) -> list[tuple]:
+    """Rows as the streaming queries return them (epoch times, not datetimes)."""
+    if name == "graph_user_events":
+        return [
+            (u, g, t, d, int(created.timestamp() * 1_000_000))
+            for u, g, t, d, created in EVENTS
+        ]
+    if name == "graph_user_reviews":
+        return [(u, g, r, s, updated.timestamp()) for u, g, r, s, updated in REVIEWS]
+    if name == "graph_user_ratings":
+        return [(u, g, r, updated.timestamp()) for u, g, r, updated in RATINGS]
+    raise AssertionError(f"Unexpected query {name}")
+
+
+@pytest.fixture
+def builder(monkeypatch) -> GraphBuilder:
+    """GraphBuilder reading the fixture rows in chunks of 3, without a database."""
+    builder = GraphBuilder(pushdown=False)
+    
+    def fake_fetch_frames(name, query, columns, params=()):
+        rows = _rows_for(name)
+        for start in range(0, len(rows), 3):
+            yield pd.DataFrame.from_records(rows[start:start + 3], columns=columns)
+    
+    monkeypatch.setattr(builder, "_fetch_frames", fake_fetch_frames)
+    return builder
+
+
+def test_build_graph_matches_per_row_loop(builder):
+    expected = reference_graph(builder)
+    graph = builder.build_graph(lookback_days=30)
+    
+    # Mappings are sorted IDs, like sorted(set(...)) in the loop
+    assert list(graph.user_id_to_idx) == sorted({user for user, _ in expected})
+    assert list(graph.game_slug_to_idx) == sorted({game for _, game in expected})
+    assert graph.idx_to_user_id == {idx: uid for uid, idx in graph.user_id_to_idx.items()}
+    assert graph.idx_to_game_slug == {idx: slug for slug, idx in graph.game_slug_to_idx.items()}
+    
+    # Same edges in both directions, with the same weights
+    src, dst = graph.edge_index.tolist()
+    actual = {}
+    for s, d, w in zip(src, dst, graph.edge_weight.tolist()):
+        if s < graph.num_users:
+            actual[(graph.idx_to_user_id[s], graph.idx_to_game_slug[d - graph.num_users])] = w
+        else:
+            assert (d, s) in set(zip(src, dst))
+    
+    assert set(actual) == set(expected)
+    keys = sorted(expected)
+    np.testing.assert_allclose(
+        [actual[key] for key in keys],
+        [expected[key] for key in keys],
+        rtol=1e-5
+    )
+    assert graph.num_edges == 2 * len(expected)
+    assert graph.edge_index.dtype == torch.long
+    assert graph.edge_weight.dtype == torch.float32
+
+
+def test_precedence_and_filtering(builder):
+    expected = reference_graph(builder)
+    graph = builder.build_graph(lookback_days=30)
+    
+    # The review's negative sentiment keeps (u4, slots-c) out despite the 5-star rating
+    assert ("u4", "slots-c") not in expected
+    assert "u4" not in graph.user_id_to_idx
+    
+    # Non-positive sums are dropped
+    assert ("u3", "slots-d") not in expected
+    assert "slots-d" not in graph.game_slug_to_idx
+    
+    # play_start gets the base weight only, whatever its duration
+    u2 = graph.user_id_to_idx["u2"]
+    c = graph.game_slug_to_idx["slots-c"] + graph.num_users
+    src, dst = graph.edge_index.tolist()
+    weight = graph.edge_weight.tolist()[list(zip(src, dst)).index((u2, c))]
+    settings = builder.settings
+    assert weight == pytest.approx(
+        settings.game_time_base_weight * 0.5 ** (4 / settings.behavior_half_life_days),
+        rel=1e-5
+    )
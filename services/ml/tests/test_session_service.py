@@ -0,0 +1,78 @@
+"""Queued TGN memory updates across model swaps."""
+
+import threading
+import time
+
+import pytest
+import torch
+
+from app.config import get_settings
+from app.models.tgn import TGN, TGNInference
+from app.services.interaction_queue import QueuedInteraction
+from app.services.session_service import SessionService
+
+NUM_USERS = 10
+NUM_GAMES = 20
+
+
+def _inference() -> TGNInference:
+    torch.manual_seed(0)
+    model = TGN(NUM_USERS, NUM_GAMES, embedding_dim=32, memory_dim=32, time_dim=16, message_dim=32, num_heads=4)
+    return TGNInference(model.eval(), torch.device("cpu"))
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(get_settings(), "tgn_ingest_enabled", True)
+    service = SessionService()
+    yield service
+    service.close()
+
+
+def _games() -> dict[str, int]:
+    return {f"g{i}": i for i in range(NUM_GAMES)}
+
+
+def test_events_of_a_previous_model_are_dropped(service):
+    service.set_model(_inference(), {f"u{i}": i for i in range(NUM_USERS)}, _games())
+    stale = service._generation
+    
+    # Same IDs, reversed user indices
+    tgn = _inference()
+    service.set_model(tgn, {f"u{i}": NUM_USERS - 1 - i for i in range(NUM_USERS)}, _games())
+    
+    service.ingest.put(QueuedInteraction(
+        user_idx=1, item_idx=2, timestamp=time.time(), event_type=1, weight=1.0, generation=stale
+    ))
+    service.ingest.flush()
+    assert not tgn.model.memory.memory.any()
+    
+    assert service.add_interaction("u1", "g2", "click")
+    service.ingest.flush()
+    updated = tgn.model.memory.memory.abs().sum(dim=1) > 0
+    assert updated.nonzero().flatten().tolist() == [NUM_USERS - 2]
+
+
+def test_queued_interaction_does_not_wait_for_the_memory_lock(service):
+    service.set_model(_inference(), {f"u{i}": i for i in range(NUM_USERS)}, _games())
+    
+    # Stands in for a long batch being applied by the ingest thread
+    held = threading.Event()
+    
+    def hold_lock():
+        with service._memory_lock:
+            held.set()
+            time.sleep(2.0)
+    
+    holder = threading.Thread(target=hold_lock)
+    holder.start()
+    held.wait()
+    
+    start = time.monotonic()
+    assert service.add_interaction("u1", "g2", "click")
+    assert time.monotonic() - start < 1.0
+    holder.join()
+    
+    assert service.queues_memory_updates
+    service.ingest.flush()
+    assert service.tgn.model.memory.memory[1].any()
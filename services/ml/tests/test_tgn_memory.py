@@ -0,0 +1,130 @@
+"""Batched TGN memory updates against one event at a time."""
+
+import pytest
+import torch
+
+from app.models.tgn import TGN
+
+NUM_USERS = 12
+NUM_ITEMS = 20
+NUM_EVENTS = 200
+
+
+def _model(aggregation: str) -> TGN:
+    torch.manual_seed(0)
+    model = TGN(
+        NUM_USERS,
+        NUM_ITEMS,
+        embedding_dim=32,
+        memory_dim=32,
+        time_dim=16,
+        message_dim=32,
+        num_heads=4,
+        memory_aggregation=aggregation
+    )
+    return model.eval()
+
+
+def _events(seed: int = 0) -> dict[str, torch.Tensor]:
+    """A stream where users repeat and timestamps aren't globally sorted.
+    
+    Each user's own events are in time order, so applying the stream one
+    event at a time replays every user's history in order.
+    """
+    generator = torch.Generator().manual_seed(seed)
+    # The last two users never interact
+    users = torch.randint(0, NUM_USERS - 2, (NUM_EVENTS,), generator=generator)
+    
+    # Per-user clocks starting at random offsets interleave out of order
+    clocks = torch.rand(NUM_USERS, generator=generator) * 1000.0
+    timestamps = torch.empty(NUM_EVENTS)
+    for i, user in enumerate(users.tolist()):
+        clocks[user] += 1.0 + torch.rand(1, generator=generator).item() * 10.0
+        timestamps[i] = clocks[user]
+    
+    return {
+        "users": users,
+        "items": torch.randint(0, NUM_ITEMS, (NUM_EVENTS,), generator=generator),
+        "timestamps": timestamps,
+        "event_types": torch.randint(0, 5, (NUM_EVENTS,), generator=generator),
+        "weights": torch.rand(NUM_EVENTS, generator=generator)
+    }
+
+
+def _apply(model: TGN, events: dict[str, torch.Tensor], positions: torch.Tensor):
+    with torch.no_grad():
+        model.apply_memory_updates(
+            events["users"][positions],
+            model.item_embedding(events["items"][positions]),
+            events["timestamps"][positions],
+            events["event_types"][positions],
+            events["weights"][positions]
+        )
+
+
+def test_stream_is_not_sorted_in_time():
+    timestamps = _events()["timestamps"]
+    assert not bool((timestamps[1:] >= timestamps[:-1]).all())
+
+
+@pytest.mark.parametrize("batch_size", [7, 64, 200])
+def test_sequential_updates_do_not_depend_on_batch_size(batch_size):
+    events = _events()
+    
+    single = _model("sequential")
+    for i in range(NUM_EVENTS):
+        _apply(single, events, torch.tensor([i]))
+    
+    # Shuffle within each batch, so its users' events arrive out of time order
+    batched = _model("sequential")
+    generator = torch.Generator().manual_seed(1)
+    for start in range(0, NUM_EVENTS, batch_size):
+        positions = torch.arange(start, min(start + batch_size, NUM_EVENTS))
+        _apply(batched, events, positions[torch.randperm(len(positions), generator=generator)])
+    
+    assert torch.allclose(batched.memory.memory, single.memory.memory, atol=1e-6)
+    assert torch.equal(batched.memory.last_update, single.memory.last_update)
+
+
+@pytest.mark.parametrize("aggregation", ["last", "mean"])
+def test_aggregated_updates_step_each_user_once(aggregation):
+    events = _events()
+    model = _model(aggregation)
+    
+    steps = []
+    model.memory.memory_updater.register_forward_hook(
+        lambda module, inputs, output: steps.append(len(output))
+    )
+    _apply(model, events, torch.arange(NUM_EVENTS))
+    
+    users = torch.unique(events["users"])
+    assert len(users) < NUM_EVENTS
+    assert steps == [len(users)]
+    
+    latest = torch.zeros(NUM_USERS).scatter_reduce(
+        0, events["users"], events["timestamps"], reduce="amax"
+    )
+    assert torch.equal(model.memory.last_update[users], latest[users])
+    
+    untouched = torch.ones(NUM_USERS, dtype=torch.bool)
+    untouched[users] = False
+    assert not model.memory.memory[untouched].any()
+
+
+def test_last_aggregation_keeps_each_users_latest_event():
+    events = _events()
+    
+    model = _model("last")
+    _apply(model, events, torch.arange(NUM_EVENTS))
+    
+    # Only the latest event of each user, applied on its own
+    latest = {}
+    for i, (user, timestamp) in enumerate(zip(events["users"].tolist(), events["timestamps"].tolist())):
+        if user not in latest or timestamp > events["timestamps"][latest[user]]:
+            latest[user] = i
+    
+    expected = _model("last")
+    _apply(expected, events, torch.tensor(sorted(latest.values())))
+    
+    assert torch.allclose(model.memory.memory, expected.memory.memory, atol=1e-6)
+    assert torch.equal(model.memory.last_update, expected.memory.last_update)
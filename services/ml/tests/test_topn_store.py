@@ -0,0 +1,53 @@
+"""Top-N tables written by the precompute job and read back."""
+
+import os
+
+import numpy as np
+
+from app.jobs.precompute_topn import precompute_topn
+from app.services.topn_store import TopNTable, USER_ROWS_FILE
+
+
+def _table(tmp_path) -> str:
+    rng = np.random.default_rng(0)
+    path = str(tmp_path / "lightgcn")
+    precompute_topn(
+        ["u3", "u1", "u2", "u0"],
+        rng.normal(size=(4, 8)),
+        [f"g{i}" for i in range(6)],
+        rng.normal(size=(6, 8)),
+        model="lightgcn",
+        top_n=3,
+        workers=1,
+        output_dir=path
+    )
+    return path
+
+
+def _expected(path: str, user_id: str) -> list[str]:
+    # Row order is the order the users were passed in
+    row = ["u3", "u1", "u2", "u0"].index(user_id)
+    items = np.memmap(os.path.join(path, "items.i32"), dtype=np.int32, mode="r", shape=(4, 3))
+    return [f"g{i}" for i in items[row]]
+
+
+def test_lookup_by_sorted_ids(tmp_path):
+    path = _table(tmp_path)
+    table = TopNTable.load(path)
+    
+    for user_id in ("u0", "u1", "u2", "u3"):
+        recs = table.lookup(user_id, limit=3)
+        assert [r["game_slug"] for r in recs] == _expected(path, user_id)
+    assert table.lookup("unknown") is None
+
+
+def test_lookup_in_tables_without_user_rows(tmp_path):
+    path = _table(tmp_path)
+    
+    # Older layout: user IDs in row order, no row file
+    os.remove(os.path.join(path, USER_ROWS_FILE))
+    np.save(os.path.join(path, "user_ids.npy"), np.array(["u3", "u1", "u2", "u0"]))
+    
+    table = TopNTable.load(path)
+    for user_id in ("u0", "u1", "u2", "u3"):
+        assert [r["game_slug"] for r in table.lookup(user_id, limit=3)] == _expected(path, user_id)